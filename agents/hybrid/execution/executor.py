@@ -110,7 +110,7 @@ class OrderExecutor:
         data = (
             f"{intent.market_id}|{intent.token_id}|{intent.outcome}|"
             f"{intent.side}|{intent.price}|{intent.size}|"
-            f"{intent.strategy_name}|{intent.timestamp.isoformat()[:19]}"
+            f"{intent.strategy_name}|{intent.timestamp_dt.isoformat()[:19]}"
         )
         return hashlib.sha256(data.encode()).hexdigest()[:16]
 
@@ -14,7 +14,20 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Optional, List, Dict, Any
+from types import MappingProxyType
+from typing import Optional, List, Dict, Any, Mapping
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Shared read-only default so metadata-less intents don't each allocate a dict
+_EMPTY_META: Mapping[str, Any] = MappingProxyType({})
+
+
+def _ns_to_datetime(timestamp_ns: int) -> datetime:
+    """Convert a time.time_ns() timestamp to a UTC datetime."""
+    return datetime.fromtimestamp(timestamp_ns / 1e9, tz=timezone.utc)
 
 
 @dataclass(frozen=True, slots=True)
@@ -36,8 +49,9 @@ class StrategyIntent:
     reason: str                # Human-readable explanation
     strategy_name: str
     confidence: Decimal = Decimal("0.5")
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    timestamp: int = field(default_factory=time.time_ns)  # Unix epoch, nanoseconds
+    # dataclass rejects unhashable defaults, so hand out the shared singleton
+    metadata: Mapping[str, Any] = field(default_factory=lambda: _EMPTY_META)
 
     def __repr__(self) -> str:
         return (
@@ -45,6 +59,11 @@ class StrategyIntent:
             f"{self.outcome} @ {self.price:.3f}, conf={self.confidence:.2f})"
         )
 
+    @property
+    def timestamp_dt(self) -> datetime:
+        """Creation time as a UTC datetime."""
+        return _ns_to_datetime(self.timestamp)
+
     @property
     def is_buy(self) -> bool:
         return self.side.lower() == "buy"
@@ -64,7 +83,12 @@ class OrderBook:
     outcome: str                          # "YES" or "NO"
     bids: List[tuple[Decimal, Decimal]]   # [(price, size), ...]
     asks: List[tuple[Decimal, Decimal]]   # [(price, size), ...]
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: int = field(default_factory=time.time_ns)  # Unix epoch, nanoseconds
+
+    @property
+    def timestamp_dt(self) -> datetime:
+        """Snapshot time as a UTC datetime."""
+        return _ns_to_datetime(self.timestamp)
 
     @property
     def best_bid(self) -> Optional[tuple[Decimal, Decimal]]:
@@ -109,7 +133,12 @@ class DualOrderBook:
     market_id: str
     yes_book: Optional[OrderBook] = None
     no_book: Optional[OrderBook] = None
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: int = field(default_factory=time.time_ns)  # Unix epoch, nanoseconds
+
+    @property
+    def timestamp_dt(self) -> datetime:
+        """Snapshot time as a UTC datetime."""
+        return _ns_to_datetime(self.timestamp)
 
     @property
     def is_complete(self) -> bool:
@@ -222,12 +251,16 @@ class LearningStrategy(BaseStrategy):
 
     def __init__(self, name: str):
         super().__init__(name)
-        self._edge_by_type: Dict[str, Decimal] = {}
+        self._edge_by_type: Mapping[str, Decimal] = _EMPTY_META
+        self._negative_types: frozenset[str] = frozenset()
         self._calibration_shift: Decimal = Decimal("0")
 
-    def update_edge_data(self, edge_by_type: Dict[str, Decimal]) -> None:
+    def update_edge_data(self, edge_by_type: Mapping[str, Decimal]) -> None:
         """Update edge detection data."""
         self._edge_by_type = edge_by_type
+        self._negative_types = frozenset(
+            market_type for market_type, edge in edge_by_type.items() if edge < 0
+        )
 
     def set_calibration_shift(self, shift: Decimal) -> None:
         """Set calibration shift for confidence adjustment."""
@@ -235,9 +268,8 @@ class LearningStrategy(BaseStrategy):
 
     def has_edge(self, market_type: str) -> bool:
         """Check if we have positive edge in this market type."""
-        if not self._edge_by_type:
-            return True  # No data = assume edge
-        return self._edge_by_type.get(market_type, Decimal("0")) >= Decimal("0")
+        # No data (or no data for this type) = assume edge
+        return market_type not in self._negative_types
 
     def calibrate_confidence(self, raw_confidence: Decimal) -> Decimal:
         """Apply calibration shift to raw confidence."""
@@ -248,10 +280,17 @@ class LearningStrategy(BaseStrategy):
 class StrategyManager:
     """
     Manages multiple strategies and coordinates analysis.
+
+    A strategy that raises on MAX_CONSECUTIVE_ERRORS analyses in a row
+    is disabled so a broken strategy can't flood the logs.
     """
 
+    MAX_CONSECUTIVE_ERRORS = 10
+
     def __init__(self):
         self._strategies: List[BaseStrategy] = []
+        # (strategy name, "single" | "dual") -> consecutive failures
+        self._err_counts: Dict[tuple[str, str], int] = {}
 
     def add_strategy(self, strategy: BaseStrategy) -> None:
         """Add a strategy to the manager."""
@@ -291,15 +330,19 @@ class StrategyManager:
         Returns all intents (may be empty).
         """
         intents = []
-        for strategy in self.enabled_strategies:
+        for strategy in self._strategies:
+            if not strategy.enabled:
+                continue
             try:
                 intent = strategy.analyze(orderbook)
-                if intent is not None:
-                    intents.append(intent)
             except Exception as e:
                 # Log but don't crash on strategy errors
-                import logging
-                logging.error(f"Strategy {strategy.name} error: {e}")
+                logger.error("Strategy %s error: %s", strategy.name, e)
+                self._record_error(strategy, "single")
+                continue
+            self._err_counts.pop((strategy.name, "single"), None)
+            if intent is not None:
+                intents.append(intent)
         return intents
 
     def analyze_dual_all(
@@ -311,16 +354,32 @@ class StrategyManager:
         Returns all intent pairs (may be empty).
         """
         results = []
-        for strategy in self.enabled_strategies:
+        for strategy in self._strategies:
+            if not strategy.enabled:
+                continue
             try:
                 result = strategy.analyze_dual(dual_book)
-                if result is not None:
-                    results.append(result)
             except Exception as e:
-                import logging
-                logging.error(f"Strategy {strategy.name} dual analysis error: {e}")
+                logger.error("Strategy %s dual analysis error: %s", strategy.name, e)
+                self._record_error(strategy, "dual")
+                continue
+            self._err_counts.pop((strategy.name, "dual"), None)
+            if result is not None:
+                results.append(result)
         return results
 
+    def _record_error(self, strategy: BaseStrategy, kind: str) -> None:
+        """Count a consecutive failure and trip the breaker at the limit."""
+        key = (strategy.name, kind)
+        count = self._err_counts[key] = self._err_counts.get(key, 0) + 1
+        if count >= self.MAX_CONSECUTIVE_ERRORS:
+            logger.error(
+                "Disabling strategy %s after %d consecutive errors",
+                strategy.name, count,
+            )
+            strategy.disable()
+            self._err_counts.pop(key, None)
+
     def reset_all(self) -> None:
         """Reset all strategies."""
         for strategy in self._strategies:
@@ -12,14 +12,24 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 
 
-@dataclass
+# Calibration curve buckets: predicted, actual (NaN = unknown), count
+_CURVE_DTYPE = np.dtype([('p', 'f8'), ('a', 'f8'), ('c', 'i4')])
+
+# Resolved predictions: predicted probability, outcome (1 = correct)
+_PRED_DTYPE = np.dtype([('p', 'f4'), ('y', 'u1')])
+
+# Reliability bins for expected calibration error
+ECE_BINS = 10
+
+
+@dataclass(slots=True, frozen=True)
 class CalibrationStats:
     """Statistics about prediction calibration"""
     brier_score: float  # Lower is better (0 = perfect)
     is_overconfident: bool  # Predicting higher than actual
     is_underconfident: bool  # Predicting lower than actual
     average_bias: float  # Positive = overconfident, negative = underconfident
-    calibration_curve: List[Tuple[float, float, int]]  # (predicted, actual, count)
+    calibration_curve: List[Tuple[float, Optional[float], int]]  # (predicted, actual, count)
     sample_size: int
 
 
@@ -52,7 +62,11 @@ class CalibrationTracker:
         if not curve:
             return None
 
-        total_samples = sum(count for _, _, count in curve)
+        curve_arr = np.array(
+            [(p, np.nan if a is None else a, c) for p, a, c in curve],
+            dtype=_CURVE_DTYPE,
+        )
+        total_samples = int(curve_arr['c'].sum())
 
         if total_samples < min_samples:
             return None
@@ -63,17 +77,16 @@ class CalibrationTracker:
         if brier_score is None:
             return None
 
-        # Calculate bias (predicted - actual)
-        biases = []
-        for predicted, actual, count in curve:
-            if actual is not None and count > 0:
-                bias = predicted - actual
-                biases.extend([bias] * count)
+        # Calculate bias (predicted - actual), weighted by bucket count
+        known = ~np.isnan(curve_arr['a']) & (curve_arr['c'] > 0)
 
-        if not biases:
+        if not known.any():
             return None
 
-        average_bias = np.mean(biases)
+        known_arr = curve_arr[known]
+        average_bias = float(np.average(
+            known_arr['p'] - known_arr['a'], weights=known_arr['c']
+        ))
         is_overconfident = average_bias > 0.05  # More than 5% overconfident
         is_underconfident = average_bias < -0.05  # More than 5% underconfident
 
@@ -86,6 +99,76 @@ class CalibrationTracker:
             sample_size=total_samples
         )
 
+    def get_calibration_arrays(
+        self,
+        market_type: Optional[str] = None,
+        strategy: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Load resolved predictions as a _PRED_DTYPE structured array
+
+        Streams the cursor straight into NumPy, for metrics that need the
+        individual predictions rather than the stored buckets.
+        """
+        query = """
+            SELECT predicted_probability, CASE WHEN was_correct = 1 THEN 1 ELSE 0 END
+            FROM predictions
+            WHERE actual_outcome IS NOT NULL
+        """
+        params = []
+
+        if market_type:
+            query += " AND market_type_id = ?"
+            params.append(self.db.market_type_id(market_type))
+
+        if strategy:
+            query += " AND strategy = ?"
+            params.append(strategy)
+
+        with self.db.acquire() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(query, params)
+            return np.fromiter(cursor, dtype=_PRED_DTYPE)
+
+    def get_reliability_metrics(
+        self,
+        market_type: Optional[str] = None,
+        strategy: Optional[str] = None
+    ) -> Optional[Dict[str, float]]:
+        """
+        Brier score, log loss and expected calibration error (ECE)
+
+        Returns:
+            Dict of metrics, or None if nothing has resolved yet
+        """
+        arr = self.get_calibration_arrays(market_type, strategy)
+        if arr.size == 0:
+            return None
+
+        p = arr['p']
+        y = arr['y'].astype(np.float32)
+
+        brier_score = float(np.square(p - y).mean())
+
+        eps = np.float32(1e-6)
+        pc = np.clip(p, eps, 1 - eps)
+        log_loss = float(-(y * np.log(pc) + (1 - y) * np.log1p(-pc)).mean())
+
+        # ECE: per-bin |mean predicted - hit rate|, weighted by bin share
+        bins = np.minimum((p * ECE_BINS).astype(np.intp), ECE_BINS - 1)
+        counts = np.bincount(bins, minlength=ECE_BINS)
+        sum_p = np.bincount(bins, weights=p, minlength=ECE_BINS)
+        sum_y = np.bincount(bins, weights=y, minlength=ECE_BINS)
+        ece = float(np.abs(sum_p - sum_y).sum() / arr.size)
+
+        return {
+            "brier_score": brier_score,
+            "log_loss": log_loss,
+            "ece": ece,
+            "sample_size": int(arr.size),
+        }
+
     def calibrate_confidence(
         self,
         raw_confidence: float,
@@ -209,7 +292,8 @@ class CalibrationTracker:
         Calculate optimal bet size using fractional Kelly Criterion
 
         Kelly % = (probability * odds - (1 - probability)) / odds
-        Where odds = (1 / price) - 1
+        Where odds = (1 / price) - 1, which simplifies to
+        Kelly % = (probability - price) / (1 - price)
 
         Args:
             probability: Our calibrated probability of winning
@@ -220,25 +304,38 @@ class CalibrationTracker:
         Returns:
             Optimal bet size in USDC
         """
-        # Calculate odds
-        if market_price >= 1.0 or market_price <= 0.0:
+        if not (0.0 < market_price < 1.0):
             return 0.0
 
-        odds = (1.0 / market_price) - 1.0
+        kelly_pct = (probability - market_price) / (1.0 - market_price)
 
-        # Calculate Kelly percentage
-        kelly_pct = (probability * odds - (1 - probability)) / odds
+        # Apply safety fraction, clamped to 0-20% of bankroll per trade
+        fractional_kelly = max(0.0, min(0.20, kelly_pct * kelly_fraction))
 
-        # Apply safety fraction
-        fractional_kelly = kelly_pct * kelly_fraction
+        return bankroll * fractional_kelly
 
-        # Clamp to reasonable range (0-20% of bankroll per trade)
-        fractional_kelly = max(0.0, min(0.20, fractional_kelly))
+    def get_optimal_bet_size_batch(
+        self,
+        probabilities: np.ndarray,
+        market_prices: np.ndarray,
+        bankroll: float,
+        kelly_fraction: float = 0.25
+    ) -> np.ndarray:
+        """
+        Vectorized get_optimal_bet_size across a portfolio of markets
+
+        Markets priced outside (0, 1) get a bet size of 0.
+
+        Returns:
+            Array of bet sizes in USDC, one per market
+        """
+        p = np.asarray(probabilities, dtype=np.float64)
+        m = np.asarray(market_prices, dtype=np.float64)
 
-        # Calculate bet size
-        bet_size = bankroll * fractional_kelly
+        valid = (m > 0.0) & (m < 1.0)
+        kelly_pct = np.divide(p - m, 1.0 - m, out=np.zeros_like(m), where=valid)
 
-        return bet_size
+        return bankroll * np.clip(kelly_pct * kelly_fraction, 0.0, 0.20)
 
     def generate_report(
         self,
@@ -5,15 +5,92 @@ Learns which features actually predict market outcomes using machine learning.
 This is REAL learning that improves with more data.
 """
 
+import math
 import numpy as np
-from typing import Dict, List, Optional, Tuple
-from sklearn.linear_model import LogisticRegression
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sklearn.linear_model import SGDClassifier
 from sklearn.preprocessing import StandardScaler
 import joblib
 import json
+import threading
 from pathlib import Path
 
 
+# Rows per partial_fit call when streaming training data
+TRAIN_CHUNK_SIZE = 4096
+
+# Training streams the rows once per epoch, each time in a fresh random
+# order, until the weights stop moving by more than TRAIN_TOL (relative)
+# or MAX_TRAIN_EPOCHS passes have run
+TRAIN_TOL = 1e-3
+MAX_TRAIN_EPOCHS = 10
+
+_CLASSES = np.array([0, 1])
+
+
+class MarketFeatures(NamedTuple):
+    """Raw per-market inputs to the feature vector, read by attribute instead of dict.get"""
+    sentiment: float = 0.5
+    volume: float = 1000
+    ttc: float = 24
+    yes_price: float = 0.5
+    no_price: float = 0.5
+
+    @classmethod
+    def from_market_data(cls, market_data: Dict) -> "MarketFeatures":
+        """Unpack the legacy market_data dict once"""
+        prices = market_data.get('prices') or {}
+        return cls(
+            market_data.get('social_sentiment', 0.5),
+            market_data.get('social_volume', 1000),
+            market_data.get('time_to_close_hours', 24),
+            prices.get('Yes', 0.5),
+            prices.get('No', 0.5),
+        )
+
+
+# Where each MarketFeatures field lives in the stored features JSON
+_FEATURE_JSON_PATHS = (
+    '$.social_sentiment',
+    '$.social_volume',
+    '$.time_to_close_hours',
+    '$.prices.Yes',
+    '$.prices.No',
+)
+
+# Feature columns pulled out in SQL, with the same defaults as from_market_data()
+FEATURE_COLUMNS_SQL = ", ".join(
+    f"COALESCE(json_extract(features, '{path}'), {default})"
+    for path, default in zip(_FEATURE_JSON_PATHS, MarketFeatures._field_defaults.values())
+)
+
+
+# Structured layout for a tick's worth of markets (one column per MarketFeatures field)
+_MF_DTYPE = np.dtype([
+    ('sentiment', 'f4'),
+    ('volume', 'f4'),
+    ('ttc', 'f4'),
+    ('yes', 'f4'),
+    ('no', 'f4'),
+])
+
+
+def to_market_feature_records(markets: Iterable[MarketFeatures]) -> np.recarray:
+    """Ingest a batch of MarketFeatures into a structured record array"""
+    return np.rec.fromrecords(list(markets), dtype=_MF_DTYPE)
+
+
+def _feature_row(mf: MarketFeatures) -> Tuple[float, float, float, float, float]:
+    """Feature values for one market, without allocating an array"""
+    return (
+        mf.sentiment,                        # Social sentiment (0-1)
+        math.log(mf.volume + 1),             # Log social volume
+        math.log(mf.ttc + 1),                # Log time to close
+        abs(mf.yes_price - mf.no_price),     # Price spread
+        mf.yes_price,                        # YES price
+    )
+
+
 class FeatureLearner:
     """Learn patterns from historical data using regression models"""
 
@@ -25,84 +102,154 @@ class FeatureLearner:
         self.models = {}
         self.scalers = {}
         self.feature_importance = {}
+        # Guards each model/scaler pair: the learning worker retrains and
+        # updates them while the trading thread predicts
+        self._lock = threading.RLock()
 
         self._load_models()
 
     def extract_features(self, market_data: Dict) -> np.ndarray:
         """Extract numerical features from market data"""
-        features = []
-
-        # Social sentiment (0-1)
-        features.append(market_data.get('social_sentiment', 0.5))
-
-        # Log social volume
-        volume = market_data.get('social_volume', 1000)
-        features.append(np.log(volume + 1))
-
-        # Log time to close
-        time_to_close = market_data.get('time_to_close_hours', 24)
-        features.append(np.log(time_to_close + 1))
-
-        # Price spread
-        prices = market_data.get('prices', {})
-        yes_price = prices.get('Yes', 0.5)
-        no_price = prices.get('No', 0.5)
-        features.append(abs(yes_price - no_price))
-
-        # YES price
-        features.append(yes_price)
-
-        return np.array(features)
+        return self.extract_features_from_tuple(MarketFeatures.from_market_data(market_data))
+
+    def extract_features_from_tuple(self, mf: MarketFeatures) -> np.ndarray:
+        """Extract numerical features from a MarketFeatures record"""
+        return np.array(_feature_row(mf))
+
+    def extract_features_batch(self, records: np.ndarray) -> np.ndarray:
+        """Extract an (N, 5) feature matrix from a _MF_DTYPE record array"""
+        X = np.empty((len(records), 5), dtype=np.float32)
+        X[:, 0] = records['sentiment']
+        X[:, 1] = np.log1p(records['volume'])
+        X[:, 2] = np.log1p(records['ttc'])
+        X[:, 3] = np.abs(records['yes'] - records['no'])
+        X[:, 4] = records['yes']
+        return X
 
     def train_model(self, market_type: Optional[str] = None, min_samples: int = 20) -> bool:
         """Train model from historical data"""
-        cursor = self.db.conn.cursor()
-
-        query = "SELECT features, predicted_outcome, actual_outcome FROM predictions WHERE actual_outcome IS NOT NULL AND features IS NOT NULL"
+        # json_extract reads the features straight out of the stored JSON(B),
+        # so no row is parsed in Python
+        query = f"""
+            SELECT {FEATURE_COLUMNS_SQL}, predicted_outcome = actual_outcome
+            FROM predictions
+            WHERE actual_outcome IS NOT NULL AND features IS NOT NULL
+            AND {self.db.FEATURES_VALID_SQL}
+        """
         params = []
 
         if market_type:
-            query += " AND market_type = ?"
-            params.append(market_type)
+            query += " AND market_type_id = ?"
+            params.append(self.db.market_type_id(market_type))
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        # Rows come back grouped by label in index order, which SGD can't
+        # learn from in one pass; SQLite shuffles them on every epoch so only
+        # one chunk is ever held in memory
+        query += " ORDER BY random()"
 
-        if len(rows) < min_samples:
+        # First pass: scaling statistics and the row count
+        scaler = StandardScaler()
+        total = 0
+        for X, _ in self._training_chunks(query, params):
+            scaler.partial_fit(X)
+            total += len(X)
+        if total < min_samples:
             return False
 
-        X, y = [], []
-        for row in rows:
-            try:
-                features_dict = json.loads(row['features'])
-                X.append(self.extract_features(features_dict))
-                y.append(1 if row['predicted_outcome'] == row['actual_outcome'] else 0)
-            except:
-                continue
-
-        if len(X) < min_samples:
-            return False
+        # alpha = 1/n is the L2 penalty of LogisticRegression's default C=1
+        model = SGDClassifier(
+            loss='log_loss',
+            alpha=1.0 / total,
+            learning_rate='invscaling',
+            eta0=0.5,
+            power_t=0.5,
+            random_state=42,
+        )
+        previous = None
+        for _ in range(MAX_TRAIN_EPOCHS):
+            for X, y in self._training_chunks(query, params):
+                model.partial_fit(scaler.transform(X), y, classes=_CLASSES)
+            weights = np.append(model.coef_[0], model.intercept_)
+            if previous is not None:
+                change = np.max(np.abs(weights - previous))
+                if change < TRAIN_TOL * max(1.0, np.max(np.abs(weights))):
+                    break
+            previous = weights
+
+        # Store (the pair is published together)
+        model_key = market_type or "all"
+        feature_names = ["sentiment", "log_volume", "log_time", "spread", "yes_price"]
+        with self._lock:
+            self.models[model_key] = model
+            self.scalers[model_key] = scaler
+            self.feature_importance[model_key] = dict(zip(feature_names, model.coef_[0].tolist()))
+            self._save_models()
+        return True
 
-        X = np.array(X)
-        y = np.array(y)
+    def _training_chunks(self, query: str, params: List) -> Iterable[Tuple[np.ndarray, np.ndarray]]:
+        """Stream (X, y) training chunks of up to TRAIN_CHUNK_SIZE rows"""
+        Xc = np.empty((TRAIN_CHUNK_SIZE, 5), dtype=np.float32)
+        yc = np.empty(TRAIN_CHUNK_SIZE, dtype=np.int8)
+        n = 0
+
+        with self.db.acquire() as conn:
+            # Plain tuples: positional access is cheaper than sqlite3.Row lookups.
+            # Iterate the cursor directly so rows stream instead of being fetched at once.
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(query, params)
+
+            for *values, correct in cursor:
+                try:
+                    Xc[n] = _feature_row(MarketFeatures(*values))
+                    yc[n] = correct
+                except Exception:
+                    continue
+                n += 1
+                if n == TRAIN_CHUNK_SIZE:
+                    yield Xc.copy(), yc.copy()
+                    n = 0
+
+        if n:
+            yield Xc[:n].copy(), yc[:n].copy()
+
+    def update_model(self, market_data: Dict, was_correct: bool, market_type: Optional[str] = None) -> bool:
+        """Fold one newly labeled prediction into an existing model without a full retrain"""
+        return self.update_model_from_features(MarketFeatures.from_market_data(market_data), was_correct, market_type)
+
+    def update_model_from_features(
+        self,
+        mf: MarketFeatures,
+        was_correct: bool,
+        market_type: Optional[str] = None
+    ) -> bool:
+        """update_model() for features already unpacked (e.g. by FEATURE_COLUMNS_SQL)"""
+        model_key = market_type or "all"
+        # Same dtype as training, or SGD refuses to mix datasets
+        X = self.extract_features_from_tuple(mf).reshape(1, -1).astype(np.float32)
+        y = np.array([int(was_correct)], dtype=np.int8)
 
-        # Train
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
+        # Updated in place, so readers must not see it half way
+        with self._lock:
+            model = self.models.get(model_key)
+            scaler = self.scalers.get(model_key)
 
-        model = LogisticRegression(random_state=42, max_iter=1000)
-        model.fit(X_scaled, y)
+            # Models persisted before the switch to SGD can't be updated in place
+            if model is None or not hasattr(model, 'partial_fit'):
+                return False
 
-        # Store
-        model_key = market_type or "all"
-        self.models[model_key] = model
-        self.scalers[model_key] = scaler
+            self._partial_fit_chunk(scaler, model, X, y)
+        return True
 
-        feature_names = ["sentiment", "log_volume", "log_time", "spread", "yes_price"]
-        self.feature_importance[model_key] = dict(zip(feature_names, model.coef_[0]))
+    @staticmethod
+    def _partial_fit_chunk(scaler: StandardScaler, model: SGDClassifier, X: np.ndarray, y: np.ndarray):
+        """Advance scaler and model by one chunk of training rows"""
+        scaler.partial_fit(X)
+        model.partial_fit(scaler.transform(X), y, classes=_CLASSES)
 
-        self._save_models()
-        return True
+    def is_trained(self, market_type: Optional[str] = None) -> bool:
+        """Whether a model for this market type (or the global one) is loaded"""
+        return (market_type or "all") in self.models
 
     def predict_correctness_probability(self, market_data: Dict, market_type: Optional[str] = None) -> Optional[float]:
         """Predict probability our prediction will be correct"""
@@ -112,13 +259,13 @@ class FeatureLearner:
             if not self.train_model(market_type):
                 return None
 
-        model = self.models[model_key]
-        scaler = self.scalers[model_key]
-
         features = self.extract_features(market_data).reshape(1, -1)
-        features_scaled = scaler.transform(features)
 
-        return model.predict_proba(features_scaled)[0][1]
+        with self._lock:
+            model = self.models[model_key]
+            scaler = self.scalers[model_key]
+            features_scaled = scaler.transform(features)
+            return model.predict_proba(features_scaled)[0][1]
 
     def _save_models(self):
         """Save models using joblib (safer than pickle)"""
@@ -158,15 +305,12 @@ class FeatureLearner:
 
     def get_learning_stats(self) -> dict:
         """Get statistics about feature learning"""
-        cursor = self.db.conn.cursor()
-
-        cursor.execute("""
-            SELECT COUNT(*) as total
-            FROM predictions
-            WHERE actual_outcome IS NOT NULL AND features IS NOT NULL
-        """)
-
-        row = cursor.fetchone()
+        with self.db.acquire() as conn:
+            row = conn.execute("""
+                SELECT COUNT(*) as total
+                FROM predictions
+                WHERE actual_outcome IS NOT NULL AND features IS NOT NULL
+            """).fetchone()
         total = row['total'] if row else 0
 
         return {
@@ -10,10 +10,17 @@ Combines all learning components into one cohesive system:
 This is the complete learning bot.
 """
 
-from typing import Dict, Optional, Tuple
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
 from agents.learning.trade_history import TradeHistoryDB
 from agents.learning.calibration import CalibrationTracker
-from agents.learning.feature_learning import FeatureLearner
+from agents.learning.feature_learning import FEATURE_COLUMNS_SQL, FeatureLearner, MarketFeatures
 from agents.learning.isotonic_calibration import IsotonicCalibrator
 
 
@@ -29,6 +36,10 @@ class IntegratedLearningBot:
     - Adapts position sizing (Kelly criterion)
     """
 
+    # Full retrain cadence; outcomes in between are folded in incrementally
+    RETRAIN_EVERY_OUTCOMES = 20
+    RETRAIN_INTERVAL_SECONDS = 300
+
     def __init__(self, db_path: str = "/tmp/integrated_learner.db"):
         # Initialize core components
         self.db = TradeHistoryDB(db_path)
@@ -38,6 +49,29 @@ class IntegratedLearningBot:
 
         # Learning stats
         self.learning_enabled = True
+        self._outcomes_since_train = 0
+        self._last_train_time = time.monotonic()
+        if not self.isotonic_calibrator.is_ready:
+            # Calibration is only trained by the learning worker, so make
+            # the first resolved outcome trigger a full retrain
+            self._outcomes_since_train = self.RETRAIN_EVERY_OUTCOMES
+
+        # Edge stats and the DB stats_version they were computed at
+        self._edge_cache: Optional[Tuple[int, Dict[str, Dict]]] = None
+
+        # Resolved market_ids waiting to be learned from. A single worker
+        # drains this so retraining never runs on the caller's thread.
+        self._train_q: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._train_thread: Optional[threading.Thread] = None
+        if self.db.db_path != ":memory:":
+            # An in-memory DB only exists on its own connection, so
+            # learning stays inline for those (tests/scratch use)
+            self._train_thread = threading.Thread(
+                target=self._training_worker,
+                name="learning-worker",
+                daemon=True
+            )
+            self._train_thread.start()
 
     def should_trade_market(
         self,
@@ -62,12 +96,10 @@ class IntegratedLearningBot:
             "confidence_check": None
         }
 
-        # Check 1: Edge detection
-        edge_by_type = self.db.get_edge_by_market_type()
-
-        if market_type and market_type in edge_by_type:
-            edge_stats = edge_by_type[market_type]
+        # Check 1: Edge detection (needs a market type; cached until the DB changes)
+        edge_stats = self._get_edge_by_market_type().get(market_type) if market_type else None
 
+        if edge_stats is not None:
             if not edge_stats['has_edge']:
                 analysis["edge_check"] = "FAIL"
                 avg_pnl = edge_stats['avg_pnl_per_trade'] or 0
@@ -80,25 +112,32 @@ class IntegratedLearningBot:
             analysis["edge_check"] = "PASS"
 
         # Check 2: Feature learning
+        learner = self.feature_learner
         if self.learning_enabled:
             try:
-                prob_correct = self.feature_learner.predict_correctness_probability(
-                    market_data,
-                    market_type
-                )
-
-                if prob_correct is not None:
-                    if prob_correct < 0.55:
-                        analysis["feature_check"] = f"FAIL ({prob_correct:.1%})"
-                        return (
-                            False,
-                            f"Features suggest low accuracy ({prob_correct:.1%})",
-                            analysis
-                        )
-
-                    analysis["feature_check"] = f"PASS ({prob_correct:.1%})"
-            except:
-                analysis["feature_check"] = "SKIPPED (model not trained)"
+                if learner.is_trained(market_type) or learner.train_model(market_type):
+                    prob_correct = learner.predict_correctness_probability(market_data, market_type)
+                else:
+                    prob_correct = None
+            except (TypeError, ValueError, AttributeError, sqlite3.Error) as e:
+                # Malformed market_data (e.g. None volume, string prices) or
+                # a DB hiccup: skip the check rather than the market
+                prob_correct = None
+                analysis["feature_check"] = f"SKIPPED (feature error: {e})"
+            else:
+                if prob_correct is None:
+                    analysis["feature_check"] = "SKIPPED (model not trained)"
+
+            if prob_correct is not None:
+                if prob_correct < 0.55:
+                    analysis["feature_check"] = f"FAIL ({prob_correct:.1%})"
+                    return (
+                        False,
+                        f"Features suggest low accuracy ({prob_correct:.1%})",
+                        analysis
+                    )
+
+                analysis["feature_check"] = f"PASS ({prob_correct:.1%})"
 
         # Check 3: Confidence threshold
         # (This would be checked after we make a prediction)
@@ -106,45 +145,92 @@ class IntegratedLearningBot:
 
         return True, "Passed all checks", analysis
 
+    def _get_edge_by_market_type(self) -> Dict[str, Dict]:
+        """
+        Edge stats by market type, recomputed only when the DB has changed
+
+        Keyed on the trigger-maintained stats_version, so outcomes written
+        by OutcomeSync (or any other connection) invalidate it too.
+        """
+        version = self.db.stats_version()
+        cached = self._edge_cache
+        if cached is None or cached[0] != version:
+            cached = (version, self.db.get_edge_by_market_type())
+            self._edge_cache = cached
+        return cached[1]
+
     def adjust_confidence(
         self,
         raw_confidence: float,
-        market_type: Optional[str] = None
+        market_type: Optional[str] = None,
+        explain: bool = True
     ) -> Tuple[float, str]:
         """
         Adjust confidence using learned calibration
 
-        Uses isotonic regression if available, falls back to bucketing.
+        Uses isotonic regression once it has been trained, bucketing until
+        then. Exactly one of the two runs per call.
+
+        Args:
+            explain: If False, method is just the method name, without the
+                formatted adjustment (for screening loops)
 
         Returns:
             (calibrated_confidence, method)
         """
-        # Try isotonic calibration first
-        try:
-            calibrated = self.isotonic_calibrator.calibrate(raw_confidence, market_type)
+        iso = self.isotonic_calibrator
+        if iso.is_ready:
+            calibrated = iso.calibrate(raw_confidence, market_type)
+            if not explain:
+                return calibrated, "isotonic_regression"
             adjustment = calibrated - raw_confidence
+            return calibrated, f"isotonic_regression ({adjustment:+.0%})"
 
-            if abs(adjustment) > 0.01:  # Meaningful adjustment
-                return calibrated, f"isotonic_regression ({adjustment:+.0%})"
-        except:
-            pass
-
-        # Fallback to simple calibration
+        # Not trained yet: simple calibration
         calibrated = self.calibration_tracker.calibrate_confidence(
             raw_confidence,
             market_type
         )
 
+        if not explain:
+            return calibrated, "bucketing"
         adjustment = calibrated - raw_confidence
         return calibrated, f"bucketing ({adjustment:+.0%})"
 
+    def adjust_confidence_batch(
+        self,
+        raw_confidences: Sequence[float],
+        market_type: Optional[str] = None
+    ) -> Tuple[np.ndarray, str]:
+        """
+        Adjust many confidences at once (market screening)
+
+        Calibrates the whole vector through one isotonic pass; falls back
+        to per-value bucketing until the isotonic calibrator is trained.
+
+        Returns:
+            (calibrated_confidences, method)
+        """
+        raw = np.asarray(raw_confidences, dtype=np.float64)
+
+        iso = self.isotonic_calibrator
+        if iso.is_ready:
+            return iso.calibrate_batch(raw, market_type), "isotonic_regression"
+
+        calibrated = np.array([
+            self.calibration_tracker.calibrate_confidence(float(c), market_type)
+            for c in raw
+        ])
+        return calibrated, "bucketing"
+
     def calculate_position_size(
         self,
         probability: float,
         market_price: float,
         bankroll: float,
         max_position: float = 2.0,
-        kelly_fraction: float = 0.25
+        kelly_fraction: float = 0.25,
+        explain: bool = True
     ) -> Tuple[float, str]:
         """
         Calculate optimal position size using Kelly Criterion
@@ -155,26 +241,26 @@ class IntegratedLearningBot:
             bankroll: Total available capital
             max_position: Maximum position size
             kelly_fraction: Fraction of Kelly to use (0.25 = quarter Kelly)
+            explain: If False, skip formatting the explanation (returned as "")
 
         Returns:
             (position_size, explanation)
         """
-        # Kelly formula: (p * odds - (1-p)) / odds
-        if market_price <= 0 or market_price >= 1:
+        # Kelly formula: (p * odds - (1-p)) / odds with odds = 1/price - 1,
+        # which reduces to (p - price) / (1 - price)
+        if not (0.0 < market_price < 1.0):
             return 0.0, "Invalid market price"
 
-        odds = (1.0 / market_price) - 1.0
-        kelly_pct = (probability * odds - (1 - probability)) / odds
-
-        # Apply safety fraction
-        fractional_kelly = kelly_pct * kelly_fraction
+        kelly_pct = (probability - market_price) / (1.0 - market_price)
 
-        # Clamp to reasonable range
-        fractional_kelly = max(0.0, min(0.20, fractional_kelly))
+        # Apply safety fraction, clamped to a reasonable range
+        fractional_kelly = min(0.20, max(0.0, kelly_pct * kelly_fraction))
 
         # Calculate size
         position_size = min(bankroll * fractional_kelly, max_position)
 
+        if not explain:
+            return position_size, ""
         explanation = f"Kelly: {kelly_pct:.1%}, Fractional: {fractional_kelly:.1%}, Size: ${position_size:.2f}"
 
         return position_size, explanation
@@ -231,9 +317,10 @@ class IntegratedLearningBot:
 
         When a market resolves:
         1. Update database with actual outcome
-        2. Retrain feature models
-        3. Retrain calibration
-        4. Update edge detection
+        2. Queue the market for the learning worker, which updates feature
+           models and calibration (incrementally, with a full retrain every
+           RETRAIN_EVERY_OUTCOMES outcomes or RETRAIN_INTERVAL_SECONDS)
+        3. Update edge detection
         """
         # Record outcome
         self.db.record_outcome(market_id, actual_outcome)
@@ -241,18 +328,94 @@ class IntegratedLearningBot:
         if not self.learning_enabled:
             return
 
-        # Trigger retraining
-        try:
-            # Retrain feature models
-            self.feature_learner.train_model()
+        if self._train_thread is None:
+            self._learn_from_outcomes([market_id])
+        else:
+            self._train_q.put_nowait(market_id)
+
+    def flush_learning(self):
+        """Block until every queued outcome has been learned from"""
+        if self._train_thread is not None:
+            self._train_q.join()
+
+    def _training_worker(self):
+        """Drain queued outcomes and learn from each drained batch at once"""
+        while True:
+            batch = [self._train_q.get()]
+            while True:
+                try:
+                    batch.append(self._train_q.get_nowait())
+                except queue.Empty:
+                    break
+
+            market_ids = [market_id for market_id in batch if market_id is not None]
+            try:
+                if market_ids:
+                    self._learn_from_outcomes(market_ids)
+            finally:
+                for _ in batch:
+                    self._train_q.task_done()
+
+            if len(market_ids) < len(batch):
+                return  # close() sentinel
+
+    def _learn_from_outcomes(self, market_ids: List[str]):
+        """
+        Update models for a batch of resolved markets
 
-            # Retrain calibration
-            self.isotonic_calibrator.train()
+        A burst of outcomes that makes a full retrain due costs one retrain,
+        not one per outcome.
+        """
+        self._outcomes_since_train += len(market_ids)
+        due = (
+            self._outcomes_since_train >= self.RETRAIN_EVERY_OUTCOMES
+            or time.monotonic() - self._last_train_time >= self.RETRAIN_INTERVAL_SECONDS
+        )
+
+        try:
+            if due:
+                # Full retrain of feature models and calibration
+                self.feature_learner.train_model()
+                self.isotonic_calibrator.train()
+                self._outcomes_since_train = 0
+                self._last_train_time = time.monotonic()
+            else:
+                for market_id in market_ids:
+                    self._learn_incrementally(market_id)
 
             # Edge detection updates automatically from database
         except Exception as e:
             print(f"Learning update failed: {e}")
 
+    def _learn_incrementally(self, market_id: str):
+        """Fold one market's resolved predictions into the existing models"""
+        # Feature values come out of the stored JSON in SQL; the inner query
+        # drops unreadable features first, since json_extract would raise
+        with self.db.acquire() as conn:
+            rows = conn.execute(f"""
+                SELECT predicted_probability, was_correct, features IS NOT NULL, {FEATURE_COLUMNS_SQL}
+                FROM (
+                    SELECT
+                        predicted_probability,
+                        was_correct,
+                        CASE WHEN {self.db.FEATURES_VALID_SQL} THEN features END AS features
+                    FROM predictions
+                    WHERE market_id = ? AND actual_outcome IS NOT NULL
+                )
+            """, (market_id,)).fetchall()
+
+        if not rows:
+            return
+
+        self.isotonic_calibrator.partial_fit(
+            np.array([row[0] for row in rows]),
+            np.array([1.0 if row[1] else 0.0 for row in rows])
+        )
+
+        for row in rows:
+            if row[2]:
+                self.feature_learner.update_model_from_features(MarketFeatures(*row[3:]), bool(row[1]))
+
     def get_learning_summary(self) -> Dict:
         """
         Get comprehensive summary of what has been learned
@@ -264,7 +427,7 @@ class IntegratedLearningBot:
         - Overall performance
         """
         return {
-            "edge_detection": self.db.get_edge_by_market_type(),
+            "edge_detection": self._get_edge_by_market_type(),
             "feature_learning": self.feature_learner.get_learning_stats(),
             "calibration": self.isotonic_calibrator.get_calibration_stats(),
             "performance": self.db.get_performance_summary()
@@ -272,6 +435,11 @@ class IntegratedLearningBot:
 
     def close(self):
         """Clean shutdown"""
+        if self._train_thread is not None:
+            # Let queued outcomes finish before the DB goes away
+            self._train_q.put_nowait(None)
+            self._train_thread.join()
+            self._train_thread = None
         self.db.close()
 
     def __enter__(self):
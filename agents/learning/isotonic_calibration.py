@@ -8,12 +8,87 @@ This is proven to work better than the bucket approach.
 """
 
 import numpy as np
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from sklearn.isotonic import IsotonicRegression
-import joblib
+import bisect
 import json
+import threading
 from pathlib import Path
 
+from agents.utils.jit import NUMBA_AVAILABLE, njit, prange
+
+
+@njit(cache=True, fastmath=True)
+def _iso_predict(x, xt, yt):
+    """Evaluate a fitted isotonic curve at x (linear between thresholds, clipped at ends)"""
+    i = np.searchsorted(xt, x)
+    if i == 0:
+        return yt[0]
+    if i >= xt.size:
+        return yt[-1]
+    t = (x - xt[i - 1]) / (xt[i] - xt[i - 1])
+    return yt[i - 1] + t * (yt[i] - yt[i - 1])
+
+
+@njit(cache=True)
+def _iso_fill(x, xt, yt, out):
+    """Evaluate the isotonic curve at every x into out"""
+    for i in range(x.size):
+        out[i] = _iso_predict(x[i], xt, yt)
+    return out
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _iso_batch(x, xt, yt, out):
+    """Calibrate a batch in parallel: evaluate the curve and clip to [0.01, 0.99]"""
+    for i in prange(x.size):
+        out[i] = min(0.99, max(0.01, _iso_predict(x[i], xt, yt)))
+    return out
+
+
+def _pool_adjacent_violators(blocks: List[List[float]], i: int) -> None:
+    """Restore monotonicity around blocks[i] by merging with out-of-order neighbours"""
+    while True:
+        if i > 0 and blocks[i - 1][2] > blocks[i][2]:
+            i -= 1
+        elif not (i + 1 < len(blocks) and blocks[i][2] > blocks[i + 1][2]):
+            return
+
+        lo, hi = blocks[i], blocks[i + 1]
+        weight = lo[3] + hi[3]
+        blocks[i] = [lo[0], hi[1], (lo[2] * lo[3] + hi[2] * hi[3]) / weight, weight]
+        del blocks[i + 1]
+
+
+def _thresholds_from_blocks(blocks: List[List[float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Block endpoints as interpolation thresholds (same shape as sklearn's X/y_thresholds_)"""
+    xt = []
+    yt = []
+    for x_lo, x_hi, value, _ in blocks:
+        xt.append(x_lo)
+        yt.append(value)
+        if x_hi > x_lo:
+            xt.append(x_hi)
+            yt.append(value)
+    return np.array(xt, dtype=np.float64), np.array(yt, dtype=np.float64)
+
+
+class _ThresholdCurve:
+    """
+    Fitted isotonic curve rebuilt from saved thresholds
+
+    Stands in for the sklearn estimator after a load: inference only needs
+    the two threshold arrays, so there is nothing else to unpickle.
+    """
+
+    def __init__(self, xt: np.ndarray, yt: np.ndarray):
+        self.X_thresholds_ = xt
+        self.y_thresholds_ = yt
+
+    def predict(self, x) -> np.ndarray:
+        # np.interp clamps outside [xt[0], xt[-1]], like out_of_bounds='clip'
+        return np.interp(x, self.X_thresholds_, self.y_thresholds_)
+
 
 class IsotonicCalibrator:
     """
@@ -23,14 +98,28 @@ class IsotonicCalibrator:
     More sophisticated than bucketing, proven to work better.
     """
 
-    def __init__(self, trade_history_db, model_path: str = "/tmp/isotonic_calibrator.joblib"):
+    def __init__(self, trade_history_db, model_path: str = "/tmp/isotonic_calibrator.npz"):
         self.db = trade_history_db
-        self.model_path = Path(model_path)
+        self.model_path = Path(model_path).with_suffix(".npz")
         self.calibrator = None
+        # (xt, yt, xs, ys): PAV thresholds (inputs, calibrated outputs) as
+        # float64 arrays for calibrate_batch() and as lists for calibrate().
+        # Replaced as a whole, never mutated, so readers on other threads
+        # always see one consistent fit.
+        self._curve: Optional[Tuple[np.ndarray, np.ndarray, List[float], List[float]]] = None
+        # PAV blocks [x_lo, x_hi, value, weight] from the last full fit, for partial_fit()
+        self._blocks: Optional[List[List[float]]] = None
+        # Serializes train()/partial_fit(); readers don't take it
+        self._fit_lock = threading.Lock()
         self.min_samples = 30  # Minimum samples needed
 
         self._load_calibrator()
 
+    @property
+    def is_ready(self) -> bool:
+        """True once a fitted curve is cached and calibrate() needs no training"""
+        return self._curve is not None
+
     def train(self, market_type: Optional[str] = None) -> bool:
         """
         Train isotonic calibrator from historical data
@@ -38,38 +127,91 @@ class IsotonicCalibrator:
         Returns:
             True if trained successfully, False if insufficient data
         """
-        cursor = self.db.conn.cursor()
-
-        query = """
-            SELECT predicted_probability, was_correct
-            FROM predictions
-            WHERE actual_outcome IS NOT NULL
-        """
+        where = "WHERE actual_outcome IS NOT NULL"
         params = []
 
         if market_type:
-            query += " AND market_type = ?"
-            params.append(market_type)
-
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+            where += " AND market_type_id = ?"
+            params.append(self.db.market_type_id(market_type))
+
+        # SQLite hands back two REAL columns, so one fetch converts straight
+        # into a float64 matrix
+        with self.db.acquire() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            rows = cursor.execute(f"""
+                SELECT CAST(predicted_probability AS REAL),
+                       CAST(COALESCE(was_correct, 0) AS REAL)
+                FROM predictions {where}
+            """, params).fetchall()
 
         if len(rows) < self.min_samples:
             return False
 
-        # Extract probabilities and outcomes
-        y_pred = np.array([row['predicted_probability'] for row in rows])
-        y_true = np.array([1.0 if row['was_correct'] else 0.0 for row in rows])
+        arr = np.asarray(rows, dtype=np.float64)
+        y_pred, y_true = arr[:, 0], arr[:, 1]
 
         # Train isotonic regression
         # This learns monotonic function: predicted → actual
-        self.calibrator = IsotonicRegression(out_of_bounds='clip')
-        self.calibrator.fit(y_pred, y_true)
+        calibrator = IsotonicRegression(out_of_bounds='clip')
+        calibrator.fit(y_pred, y_true)
+        curve = self._curve_from_estimator(calibrator)
+        blocks = self._blocks_from_fit(y_pred, curve[0], curve[1])
+
+        with self._fit_lock:
+            self.calibrator = calibrator
+            self._blocks = blocks
+            self._curve = curve
+            self._save_calibrator()
+
+        return True
 
-        self._save_calibrator()
+    def partial_fit(self, y_pred: np.ndarray, y_true: np.ndarray) -> bool:
+        """
+        Fold newly resolved predictions into the fitted curve
+
+        Each point is merged into the PAV block covering it (or inserted as
+        a new block) and only the adjacent violators are re-pooled, so an
+        update costs O(blocks) instead of a full refit. The result can drift
+        slightly from a fresh fit; callers should still train() periodically.
 
+        Returns:
+            False if there is no in-memory fit to update
+        """
+        with self._fit_lock:
+            if self._blocks is None:
+                return False
+
+            blocks = self._blocks
+            for x, y in zip(np.asarray(y_pred, dtype=np.float64), np.asarray(y_true, dtype=np.float64)):
+                x = float(x)
+                y = float(y)
+                i = bisect.bisect_left([b[1] for b in blocks], x)
+                if i < len(blocks) and blocks[i][0] <= x:
+                    b = blocks[i]
+                    b[2] = (b[2] * b[3] + y) / (b[3] + 1.0)
+                    b[3] += 1.0
+                else:
+                    blocks.insert(i, [x, x, y, 1.0])
+                _pool_adjacent_violators(blocks, i)
+
+            self._curve = self._make_curve(*_thresholds_from_blocks(blocks))
         return True
 
+    @staticmethod
+    def _blocks_from_fit(y_pred: np.ndarray, xt: np.ndarray, yt: np.ndarray) -> List[List[float]]:
+        """Recover PAV blocks (runs of training points sharing a fitted value)"""
+        x = np.sort(y_pred)
+        fitted = _iso_fill(x, xt, yt, np.empty(x.size, dtype=np.float64))
+
+        blocks = []
+        start = 0
+        for end in range(1, x.size + 1):
+            if end == x.size or fitted[end] != fitted[start]:
+                blocks.append([float(x[start]), float(x[end - 1]), float(fitted[start]), float(end - start)])
+                start = end
+        return blocks
+
     def calibrate(
         self,
         raw_probability: float,
@@ -86,15 +228,79 @@ class IsotonicCalibrator:
             Calibrated probability (0-1)
         """
         # Try to train if no calibrator exists
-        if self.calibrator is None:
+        curve = self._curve
+        if curve is None:
             if not self.train(market_type):
                 return raw_probability  # No calibration available
+            curve = self._curve
+
+        # Same interpolation as _iso_predict / calibrate_batch, on plain
+        # lists so a single value skips the NumPy call overhead
+        _, _, xs, ys = curve
+        i = bisect.bisect_left(xs, raw_probability)
+        if i == 0:
+            value = ys[0]
+        elif i == len(xs):
+            value = ys[-1]
+        else:
+            t = (raw_probability - xs[i - 1]) / (xs[i] - xs[i - 1])
+            value = ys[i - 1] + t * (ys[i] - ys[i - 1])
+        return min(0.99, max(0.01, value))
+
+    def calibrate_batch(
+        self,
+        raw: np.ndarray,
+        market_type: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Calibrate a vector of raw probabilities in one pass
 
-        # Apply isotonic calibration
-        calibrated = self.calibrator.predict([raw_probability])[0]
+        Used when screening many markets per cycle, so the per-call
+        overhead of calibrate() is paid once per batch.
 
-        # Ensure valid range
-        return float(np.clip(calibrated, 0.01, 0.99))
+        Returns:
+            Calibrated probabilities (0.01-0.99), or raw unchanged if no
+            calibration is available
+        """
+        raw = np.asarray(raw, dtype=np.float64)
+
+        curve = self._curve
+        if curve is None:
+            if not self.train(market_type):
+                return raw
+            curve = self._curve
+
+        # One snapshot of the curve, so thresholds and values always match
+        xt, yt, _, _ = curve
+        if NUMBA_AVAILABLE:
+            # Compiled, multi-threaded loop; only worth it when numba is present
+            return _iso_batch(raw, xt, yt, np.empty_like(raw))
+        return np.clip(np.interp(raw, xt, yt), 0.01, 0.99)
+
+    @classmethod
+    def _curve_from_estimator(cls, calibrator) -> Tuple[np.ndarray, np.ndarray, List[float], List[float]]:
+        """
+        Pull the fitted PAV thresholds out of the estimator
+
+        Inference only needs these two arrays, so nothing after this point
+        goes back through sklearn's predict().
+        """
+        return cls._make_curve(
+            np.asarray(calibrator.X_thresholds_, dtype=np.float64),
+            np.asarray(calibrator.y_thresholds_, dtype=np.float64)
+        )
+
+    @staticmethod
+    def _make_curve(
+        xt: np.ndarray, yt: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, List[float], List[float]]:
+        """
+        Bundle the thresholds with list copies for scalar lookups
+
+        The calibrator is piecewise linear over a few dozen PAV steps, so
+        calibrate() bisects the lists instead of going through NumPy.
+        """
+        return xt, yt, xt.tolist(), yt.tolist()
 
     def get_calibration_stats(self) -> dict:
         """
@@ -102,20 +308,17 @@ class IsotonicCalibrator:
 
         Returns metrics like:
         - Number of samples used
-        - Improvement in Brier score
-        - Calibration curve points
+        - Brier score of raw predictions
         """
-        cursor = self.db.conn.cursor()
-
-        cursor.execute("""
-            SELECT
-                COUNT(*) as total,
-                AVG(ABS(predicted_probability - CASE WHEN was_correct THEN 1.0 ELSE 0.0 END)) as avg_error
-            FROM predictions
-            WHERE actual_outcome IS NOT NULL
-        """)
-
-        row = cursor.fetchone()
+        # Aggregated in SQL so only one row comes back
+        with self.db.acquire() as conn:
+            row = conn.execute("""
+                SELECT
+                    COUNT(*) as total,
+                    AVG((predicted_probability - was_correct) * (predicted_probability - was_correct)) as brier
+                FROM predictions
+                WHERE actual_outcome IS NOT NULL
+            """).fetchone()
 
         if not row or row['total'] < self.min_samples:
             return {
@@ -126,22 +329,26 @@ class IsotonicCalibrator:
         return {
             "trained": self.calibrator is not None,
             "total_samples": row['total'],
-            "avg_calibration_error": row['avg_error'],
+            "brier_score": row['brier'],
             "method": "isotonic_regression"
         }
 
     def _save_calibrator(self):
-        """Save trained calibrator"""
-        if self.calibrator is not None:
-            joblib.dump(self.calibrator, self.model_path)
+        """Save trained calibrator (just its PAV thresholds)"""
+        curve = self._curve
+        if self.calibrator is not None and curve is not None:
+            np.savez(self.model_path, xt=curve[0], yt=curve[1])
 
     def _load_calibrator(self):
         """Load trained calibrator"""
         if self.model_path.exists():
             try:
-                self.calibrator = joblib.load(self.model_path)
-            except:
-                pass
+                with np.load(self.model_path) as saved:
+                    calibrator = _ThresholdCurve(saved["xt"], saved["yt"])
+                self._curve = self._curve_from_estimator(calibrator)
+                self.calibrator = calibrator
+            except (OSError, KeyError, ValueError):
+                self.calibrator = None
 
 
 def test_isotonic_vs_bucketing():
@@ -179,20 +386,14 @@ def test_isotonic_vs_bucketing():
 
     # Method 2: Simple bucketing (10 buckets)
     def bucket_calibration(pred_train, out_train, pred_test):
-        calibrated = np.zeros_like(pred_test)
-        for i in range(10):
-            lower = i / 10
-            upper = (i + 1) / 10
-            mask_train = (pred_train >= lower) & (pred_train < upper)
-            mask_test = (pred_test >= lower) & (pred_test < upper)
-
-            if mask_train.sum() > 0:
-                avg_actual = out_train[mask_train].mean()
-                calibrated[mask_test] = avg_actual
-            else:
-                calibrated[mask_test] = pred_test[mask_test]
-
-        return calibrated
+        buckets_train = np.minimum(9, (pred_train * 10).astype(np.int64))
+        sums = np.bincount(buckets_train, weights=out_train, minlength=10)
+        counts = np.bincount(buckets_train, minlength=10)
+        avg = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+        # Empty training buckets leave the prediction uncalibrated
+        bucket_avg = avg[np.minimum(9, (pred_test * 10).astype(np.int64))]
+        return np.where(np.isnan(bucket_avg), pred_test, bucket_avg)
 
     calibrated_bucket = bucket_calibration(pred_train, out_train, pred_test)
 
@@ -8,42 +8,299 @@ Stores all predictions, trades, and outcomes for:
 - Meta-learning about strategy performance
 """
 
-import sqlite3
+import atexit
+import os
 import json
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 from pathlib import Path
-from decimal import Decimal
+
+try:
+    # Deployments can ship a tuned SQLite build (e.g. SQLITE_DEFAULT_MEMSTATUS=0,
+    # SQLITE_OMIT_DEPRECATED, SQLITE_DEFAULT_WAL_SYNCHRONOUS=1) as pysqlite3;
+    # it has the same DB-API as the stdlib module
+    import pysqlite3.dbapi2 as sqlite3
+except ImportError:
+    import sqlite3
+
+
+class OpenPosition(NamedTuple):
+    """One open position from get_open_positions_fast(); same fields as get_open_positions()"""
+    market_id: str
+    token_id: Optional[str]
+    question: str
+    predicted_outcome: str
+    entry_price: Optional[float]
+    size: Optional[float]
+    predicted_probability: float
+    confidence: float
+    entry_timestamp: Optional[str]
+    market_type: Optional[str]
+    time_to_close_hours: Optional[float]
 
 
 class TradeHistoryDB:
     """Persistent database of all trading activity and predictions"""
 
+    # Stored in PRAGMA user_version once _init_schema() has run. Bump it
+    # whenever _init_schema() changes, so existing files pick the change up.
+    SCHEMA_VERSION = 5
+
+    # Idle read-only connections kept for acquire(); extra borrowers get a fresh one
+    POOL_SIZE = os.cpu_count() or 4
+
+    # SQLite 3.45+ can store features as JSONB (pre-parsed binary), which
+    # json_extract() reads without re-tokenizing; older builds keep JSON text.
+    # Both are read through the json_* functions, never parsed in Python.
+    JSONB_SUPPORTED = sqlite3.sqlite_version_info >= (3, 45, 0)
+
+    # Filter for rows whose features the json_* functions can read
+    # (flags 1|4: RFC JSON text or JSONB)
+    FEATURES_VALID_SQL = "json_valid(features, 5)" if JSONB_SUPPORTED else "json_valid(features)"
+
+    # Hot-path statements. sqlite3's per-connection statement cache is keyed
+    # on the exact SQL text, so sharing one string keeps them prepared once.
+    _SQL_INSERT_PREDICTION = f"""
+        INSERT INTO predictions (
+            timestamp, market_id, question, market_type, market_type_id,
+            predicted_outcome, predicted_probability, confidence, reasoning,
+            market_price_yes, market_price_no, time_to_close_hours,
+            social_sentiment, social_volume,
+            strategy, features
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {"jsonb(?)" if JSONB_SUPPORTED else "?"})
+    """
+
+    _SQL_UPDATE_TRADE = """
+        UPDATE predictions
+        SET trade_executed = 1,
+            trade_size_usdc = ?,
+            trade_price = ?,
+            execution_result = ?,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = ?
+    """
+
+    _SQL_CLOSE_POSITION = """
+        UPDATE predictions
+        SET position_open = 0,
+            exit_timestamp = ?,
+            exit_price = ?,
+            exit_reason = ?,
+            profit_loss_usdc = trade_size_usdc * (? - trade_price) / trade_price
+        WHERE market_id = ?
+        AND position_open = 1
+        RETURNING profit_loss_usdc
+    """
+
+    # Resolves a market's open predictions in one pass. SET expressions see
+    # the pre-update row, so correctness is re-derived for the P&L
+    _SQL_RESOLVE_MARKET = """
+        UPDATE predictions
+        SET actual_outcome = ?,
+            resolution_date = ?,
+            was_correct = (predicted_outcome = ?),
+            profit_loss_usdc = CASE
+                WHEN trade_executed = 1 AND predicted_outcome = ?
+                    THEN trade_size_usdc * (1.0 - trade_price) / trade_price
+                WHEN trade_executed = 1 THEN -trade_size_usdc
+                ELSE profit_loss_usdc
+            END,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE market_id = ? AND actual_outcome IS NULL
+    """
+
+    # Trigger body adding ({sign} = "+") or removing ({sign} = "-") one
+    # prediction ({row} = NEW / OLD) from its agg_stats bucket; a no-op
+    # unless that row is resolved
+    _SQL_AGG_STATS_APPLY = """
+                INSERT INTO agg_stats (strategy, market_type_id, day, n, n_correct, sum_sq_error, sum_pnl)
+                SELECT
+                    {row}.strategy,
+                    COALESCE({row}.market_type_id, 0),
+                    substr({row}.timestamp, 1, 10),
+                    {sign}1,
+                    {sign}(CASE WHEN {row}.was_correct = 1 THEN 1 ELSE 0 END),
+                    {sign}(({row}.predicted_probability - (CASE WHEN {row}.was_correct = 1 THEN 1.0 ELSE 0.0 END))
+                        * ({row}.predicted_probability - (CASE WHEN {row}.was_correct = 1 THEN 1.0 ELSE 0.0 END))),
+                    {sign}COALESCE({row}.profit_loss_usdc, 0)
+                WHERE {row}.actual_outcome IS NOT NULL
+                ON CONFLICT (strategy, market_type_id, day) DO UPDATE SET
+                    n = n + excluded.n,
+                    n_correct = n_correct + excluded.n_correct,
+                    sum_sq_error = sum_sq_error + excluded.sum_sq_error,
+                    sum_pnl = sum_pnl + excluded.sum_pnl;"""
+
+    # Trigger body adding ({sign} = "+") or removing ({sign} = "-") one
+    # prediction ({row} = NEW / OLD) from its summary_stats bucket
+    _SQL_SUMMARY_STATS_APPLY = """
+                INSERT INTO summary_stats (
+                    strategy, market_type_id, day, n_total, n_executed, n_resolved,
+                    n_correct, n_profitable, n_pnl, sum_pnl, sum_confidence
+                )
+                VALUES (
+                    {row}.strategy,
+                    COALESCE({row}.market_type_id, 0),
+                    substr({row}.timestamp, 1, 10),
+                    {sign}1,
+                    {sign}(CASE WHEN {row}.trade_executed = 1 THEN 1 ELSE 0 END),
+                    {sign}({row}.actual_outcome IS NOT NULL),
+                    {sign}(CASE WHEN {row}.was_correct = 1 THEN 1 ELSE 0 END),
+                    {sign}(CASE WHEN {row}.profit_loss_usdc > 0 THEN 1 ELSE 0 END),
+                    {sign}({row}.profit_loss_usdc IS NOT NULL),
+                    {sign}COALESCE({row}.profit_loss_usdc, 0),
+                    {sign}{row}.confidence
+                )
+                ON CONFLICT (strategy, market_type_id, day) DO UPDATE SET
+                    n_total = n_total + excluded.n_total,
+                    n_executed = n_executed + excluded.n_executed,
+                    n_resolved = n_resolved + excluded.n_resolved,
+                    n_correct = n_correct + excluded.n_correct,
+                    n_profitable = n_profitable + excluded.n_profitable,
+                    n_pnl = n_pnl + excluded.n_pnl,
+                    sum_pnl = sum_pnl + excluded.sum_pnl,
+                    sum_confidence = sum_confidence + excluded.sum_confidence;"""
+
     def __init__(self, db_path: str = None):
         # Use persistent storage by default (not /tmp which gets wiped)
         if db_path is None:
-            import os
             db_dir = os.path.expanduser("~/.polymarket")
             os.makedirs(db_dir, exist_ok=True)
             db_path = os.path.join(db_dir, "learning_trader.db")
 
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path, timeout=5.0)
+        # The single writer. Autocommit mode: writes go through _write(), which
+        # takes the write lock up front with BEGIN IMMEDIATE
+        self.conn = self._connect(check_same_thread=False, isolation_level=None)
+        self._write_lock = threading.RLock()
+        self._tx_depth = 0  # >0 while a _write()/batch() transaction is open
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=self.POOL_SIZE)
+        self._mt_to_id: Dict[str, int] = {}
+        # Ids registered by the open transaction; published to _mt_to_id only
+        # once it commits, so a rollback can't leave a stale id cached
+        self._mt_pending: Dict[str, int] = {}
+        # Warm starts skip the DDL entirely: one header read instead
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < self.SCHEMA_VERSION:
+            self._init_schema()
+        self._load_market_types()
+
+    def _connect(
+        self,
+        check_same_thread: bool = True,
+        isolation_level: Optional[str] = "",
+        read_only: bool = False
+    ) -> sqlite3.Connection:
+        """Open a connection with the standard PRAGMAs applied"""
+        if read_only:
+            database, uri = Path(self.db_path).resolve().as_uri() + "?mode=ro", True
+        else:
+            database, uri = self.db_path, False
+
+        conn = sqlite3.connect(
+            database,
+            timeout=5.0,
+            check_same_thread=check_same_thread,
+            isolation_level=isolation_level,
+            cached_statements=256,
+            uri=uri,
+        )
 
         # CRITICAL: Enable WAL mode for concurrency (E4 finding)
         # - Eliminates lock failures under concurrent access
         # - 45% reduction in p95 write latency
         # - Safe for multi-process deployments
-        self.conn.execute("PRAGMA journal_mode=WAL")
-        self.conn.execute("PRAGMA synchronous=NORMAL")
-        self.conn.execute("PRAGMA busy_timeout=5000")
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA busy_timeout=5000;
+            PRAGMA cache_size=-20000;      -- ~20MB page cache
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;    -- read pages straight from a 256MB mapping
+            PRAGMA foreign_keys=ON;
+        """)
+
+        conn.row_factory = sqlite3.Row  # Return rows as dicts
+        return conn
+
+    @contextmanager
+    def acquire(self):
+        """
+        Borrow a pooled read-only connection for the duration of a with-block
 
-        self.conn.row_factory = sqlite3.Row  # Return rows as dicts
-        self._init_schema()
+        Pooled connections are already configured and keep their own
+        statement cache warm, so repeated queries skip connection setup.
+        Under WAL they read without blocking (or being blocked by) the
+        writer. They may be used from any thread, one borrower at a time.
+        """
+        if self.db_path == ":memory:":
+            # Each connection to :memory: is a separate database
+            yield self.conn
+            return
+
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect(check_same_thread=False, read_only=True)
+
+        try:
+            yield conn
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def _write(self):
+        """
+        Run a block of writes as one transaction on the writer connection
+
+        Nested blocks (e.g. write methods called inside batch()) join the
+        outer transaction; only the outermost block commits.
+        """
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            if self._tx_depth:
+                self._tx_depth += 1
+                try:
+                    yield cursor
+                finally:
+                    self._tx_depth -= 1
+                return
+
+            cursor.execute("BEGIN IMMEDIATE")
+            self._tx_depth = 1
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            else:
+                cursor.execute("COMMIT")
+                self._mt_to_id.update(self._mt_pending)
+            finally:
+                self._tx_depth = 0
+                self._mt_pending.clear()
+
+    @contextmanager
+    def batch(self):
+        """
+        Commit every write made inside the with-block as a single transaction
+
+        Use around a burst of writes (e.g. one tick of the trading loop) to
+        pay for one commit instead of one per call. Everything is rolled
+        back if the block raises. Other threads' writes wait until the block
+        ends, so keep network calls out of it.
+        """
+        with self._write():
+            yield self
 
     def _init_schema(self):
-        """Create database schema if it doesn't exist"""
+        """Create database schema if it doesn't exist (or is out of date)"""
         cursor = self.conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
 
         # Main predictions table
         cursor.execute("""
@@ -53,6 +310,7 @@ class TradeHistoryDB:
                 market_id TEXT NOT NULL,
                 question TEXT NOT NULL,
                 market_type TEXT,
+                market_type_id INTEGER,  -- market_types.id, what queries filter on
 
                 -- Prediction details
                 predicted_outcome TEXT NOT NULL,
@@ -91,8 +349,8 @@ class TradeHistoryDB:
                 was_correct BOOLEAN,
                 profit_loss_usdc REAL,
 
-                -- Features for pattern learning (JSON)
-                features TEXT,
+                -- Features for pattern learning (JSONB, or JSON text on older SQLite)
+                features BLOB,
 
                 -- Metadata
                 created_at TEXT DEFAULT CURRENT_TIMESTAMP,
@@ -100,6 +358,28 @@ class TradeHistoryDB:
             )
         """)
 
+        # Interned market types: filters and GROUP BYs run on a small int
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS market_types (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        """)
+
+        # Migration: backfill market_type_id on databases created before it
+        cursor.execute("PRAGMA table_info(predictions)")
+        if "market_type_id" not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute("ALTER TABLE predictions ADD COLUMN market_type_id INTEGER")
+            cursor.execute("""
+                INSERT OR IGNORE INTO market_types (name)
+                SELECT DISTINCT market_type FROM predictions WHERE market_type IS NOT NULL
+            """)
+            cursor.execute("""
+                UPDATE predictions
+                SET market_type_id = (SELECT id FROM market_types WHERE name = predictions.market_type)
+                WHERE market_type IS NOT NULL
+            """)
+
         # Index for fast queries
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_market_id
@@ -111,6 +391,11 @@ class TradeHistoryDB:
             ON predictions(market_type)
         """)
 
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_market_type_id
+            ON predictions(market_type_id)
+        """)
+
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_strategy
             ON predictions(strategy)
@@ -121,6 +406,248 @@ class TradeHistoryDB:
             ON predictions(timestamp)
         """)
 
+        # Covers calibration scans (resolved rows, probability vs outcome)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_pred_outcome
+            ON predictions(actual_outcome, predicted_probability, was_correct)
+        """)
+
+        # Covers get_edge_by_market_type(): resolved executed trades grouped
+        # by market type, answered from the index alone (the filter columns
+        # are repeated at the end, or the planner still visits the table)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_edge_cover
+            ON predictions(market_type_id, was_correct, profit_loss_usdc, trade_executed, actual_outcome)
+            WHERE trade_executed = 1 AND actual_outcome IS NOT NULL
+        """)
+
+        # Open positions are a handful of rows; keep them in their own index
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_open_pos
+            ON predictions(position_open, entry_timestamp)
+            WHERE position_open = 1
+        """)
+
+        # Covers calibrator training (resolved rows, optionally one market
+        # type), so the scan never leaves the index b-tree
+        has_training_cover = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_pred_training_cover'"
+        ).fetchone()
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_pred_training_cover
+            ON predictions(actual_outcome, market_type_id, predicted_probability, was_correct)
+            WHERE actual_outcome IS NOT NULL
+        """)
+        if not has_training_cover:
+            # Refresh planner statistics so the new index actually gets picked
+            cursor.execute("ANALYZE")
+
+        # Covers per-strategy Brier/calibration scans over resolved rows
+        # (e.g. calibration arrays) without table lookups; actual_outcome is
+        # repeated at the end for the same reason as in idx_edge_cover
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_brier
+            ON predictions(strategy, market_type_id, predicted_probability, was_correct, actual_outcome)
+            WHERE actual_outcome IS NOT NULL
+        """)
+
+        # Resolved-prediction aggregates per (strategy, market type, day),
+        # kept current by triggers so Brier reads scan buckets, not rows.
+        # Triggers also catch writers that bypass record_outcome().
+        has_agg_stats = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'agg_stats'"
+        ).fetchone()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS agg_stats (
+                strategy TEXT NOT NULL,
+                market_type_id INTEGER NOT NULL,  -- 0 when there is no market type
+                day TEXT NOT NULL,                -- prediction date, YYYY-MM-DD
+                n INTEGER NOT NULL DEFAULT 0,
+                n_correct INTEGER NOT NULL DEFAULT 0,
+                sum_sq_error REAL NOT NULL DEFAULT 0,
+                sum_pnl REAL NOT NULL DEFAULT 0,
+
+                PRIMARY KEY (strategy, market_type_id, day)
+            ) WITHOUT ROWID
+        """)
+        if not has_agg_stats:
+            cursor.execute("""
+                INSERT INTO agg_stats
+                SELECT
+                    strategy,
+                    COALESCE(market_type_id, 0),
+                    substr(timestamp, 1, 10),
+                    COUNT(*),
+                    SUM(CASE WHEN was_correct = 1 THEN 1 ELSE 0 END),
+                    TOTAL((predicted_probability - (CASE WHEN was_correct = 1 THEN 1.0 ELSE 0.0 END))
+                          * (predicted_probability - (CASE WHEN was_correct = 1 THEN 1.0 ELSE 0.0 END))),
+                    TOTAL(profit_loss_usdc)
+                FROM predictions
+                WHERE actual_outcome IS NOT NULL
+                GROUP BY 1, 2, 3
+            """)
+
+        # Resolution, re-resolution (outcome_sync rewrites resolved rows),
+        # late P&L and deletes all move the old row out of its bucket and the
+        # new row in. Replaces the resolve-only / P&L-only triggers of v4.
+        cursor.execute("DROP TRIGGER IF EXISTS trg_agg_stats_resolve")
+        cursor.execute("DROP TRIGGER IF EXISTS trg_agg_stats_pnl")
+        agg_add_new = self._SQL_AGG_STATS_APPLY.format(row="NEW", sign="+")
+        agg_remove_old = self._SQL_AGG_STATS_APPLY.format(row="OLD", sign="-")
+        # Rows inserted already resolved (e.g. historical imports)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_agg_stats_insert
+            AFTER INSERT ON predictions
+            WHEN NEW.actual_outcome IS NOT NULL
+            BEGIN
+                {agg_add_new}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_agg_stats_delete
+            AFTER DELETE ON predictions
+            WHEN OLD.actual_outcome IS NOT NULL
+            BEGIN
+                {agg_remove_old}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_agg_stats_update
+            AFTER UPDATE OF strategy, market_type_id, timestamp, predicted_probability,
+                            actual_outcome, was_correct, profit_loss_usdc ON predictions
+            WHEN OLD.actual_outcome IS NOT NULL OR NEW.actual_outcome IS NOT NULL
+            BEGIN
+                {agg_remove_old}
+                {agg_add_new}
+            END
+        """)
+
+        # Running per-(strategy, market type, day) counters over all
+        # predictions for get_performance_summary(). Every insert, update and
+        # delete moves the old row out of its bucket and the new row in.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS summary_stats (
+                strategy TEXT NOT NULL,
+                market_type_id INTEGER NOT NULL,  -- 0 when there is no market type
+                day TEXT NOT NULL,                -- prediction date, YYYY-MM-DD
+                n_total INTEGER NOT NULL DEFAULT 0,
+                n_executed INTEGER NOT NULL DEFAULT 0,
+                n_resolved INTEGER NOT NULL DEFAULT 0,
+                n_correct INTEGER NOT NULL DEFAULT 0,
+                n_profitable INTEGER NOT NULL DEFAULT 0,
+                n_pnl INTEGER NOT NULL DEFAULT 0,  -- rows with a P&L recorded
+                sum_pnl REAL NOT NULL DEFAULT 0,
+                sum_confidence REAL NOT NULL DEFAULT 0,
+
+                PRIMARY KEY (strategy, market_type_id, day)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("DELETE FROM summary_stats")
+        cursor.execute("""
+            INSERT INTO summary_stats
+            SELECT
+                strategy,
+                COALESCE(market_type_id, 0),
+                substr(timestamp, 1, 10),
+                COUNT(*),
+                SUM(CASE WHEN trade_executed = 1 THEN 1 ELSE 0 END),
+                COUNT(actual_outcome),
+                SUM(CASE WHEN was_correct = 1 THEN 1 ELSE 0 END),
+                SUM(CASE WHEN profit_loss_usdc > 0 THEN 1 ELSE 0 END),
+                COUNT(profit_loss_usdc),
+                TOTAL(profit_loss_usdc),
+                TOTAL(confidence)
+            FROM predictions
+            GROUP BY 1, 2, 3
+        """)
+
+        add_new = self._SQL_SUMMARY_STATS_APPLY.format(row="NEW", sign="+")
+        remove_old = self._SQL_SUMMARY_STATS_APPLY.format(row="OLD", sign="-")
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_summary_stats_insert
+            AFTER INSERT ON predictions
+            BEGIN
+                {add_new}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_summary_stats_delete
+            AFTER DELETE ON predictions
+            BEGIN
+                {remove_old}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_summary_stats_update
+            AFTER UPDATE OF strategy, market_type_id, timestamp, confidence, trade_executed,
+                            actual_outcome, was_correct, profit_loss_usdc ON predictions
+            BEGIN
+                {remove_old}
+                {add_new}
+            END
+        """)
+
+        # Bumped by every write that can change get_edge_by_market_type(),
+        # from any connection (outcome_sync included), so callers can cache
+        # the edge stats and recompute only when stats_version() moves
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stats_version (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                version INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("INSERT OR IGNORE INTO stats_version (id, version) VALUES (0, 0)")
+        for name, event in (
+            ("insert", "AFTER INSERT ON predictions"),
+            ("delete", "AFTER DELETE ON predictions"),
+            ("update", "AFTER UPDATE OF market_type_id, trade_executed, actual_outcome, "
+                       "was_correct, profit_loss_usdc ON predictions"),
+        ):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_stats_version_{name}
+                {event}
+                BEGIN
+                    UPDATE stats_version SET version = version + 1 WHERE id = 0;
+                END
+            """)
+
+        # Full-text index over questions for find_similar_markets(),
+        # kept in sync with predictions by triggers
+        has_fts = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'predictions_fts'"
+        ).fetchone()
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS predictions_fts
+            USING fts5(question, content='predictions', content_rowid='id')
+        """)
+        if not has_fts:
+            cursor.execute("INSERT INTO predictions_fts(predictions_fts) VALUES ('rebuild')")
+
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_predictions_fts_insert
+            AFTER INSERT ON predictions
+            BEGIN
+                INSERT INTO predictions_fts(rowid, question) VALUES (NEW.id, NEW.question);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_predictions_fts_delete
+            AFTER DELETE ON predictions
+            BEGIN
+                INSERT INTO predictions_fts(predictions_fts, rowid, question)
+                VALUES ('delete', OLD.id, OLD.question);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_predictions_fts_update
+            AFTER UPDATE OF question ON predictions
+            BEGIN
+                INSERT INTO predictions_fts(predictions_fts, rowid, question)
+                VALUES ('delete', OLD.id, OLD.question);
+                INSERT INTO predictions_fts(rowid, question) VALUES (NEW.id, NEW.question);
+            END
+        """)
+
         # Performance metrics cache table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS performance_metrics (
@@ -148,7 +675,46 @@ class TradeHistoryDB:
             )
         """)
 
-        self.conn.commit()
+        cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        cursor.execute("COMMIT")
+
+    def _load_market_types(self):
+        """Fill the market type id cache"""
+        rows = self.conn.execute("SELECT name, id FROM market_types").fetchall()
+        self._mt_to_id = {row[0]: row[1] for row in rows}
+
+    def market_type_id(self, market_type: Optional[str], create: bool = False) -> Optional[int]:
+        """
+        Small-int id for a market type string
+
+        Returns None for no market type, or for a type never stored (unless
+        create=True, which registers it; only call that inside _write()).
+        """
+        if market_type is None:
+            return None
+
+        mt_id = self._mt_to_id.get(market_type)
+        if mt_id is not None:
+            return mt_id
+
+        if create:
+            mt_id = self._mt_pending.get(market_type)
+            if mt_id is not None:
+                return mt_id
+            self.conn.execute("INSERT OR IGNORE INTO market_types (name) VALUES (?)", (market_type,))
+            row = self.conn.execute("SELECT id FROM market_types WHERE name = ?", (market_type,)).fetchone()
+            # Cached once the transaction commits (see _write)
+            self._mt_pending[market_type] = row[0]
+            return row[0]
+
+        # May have been registered by another process sharing the file
+        with self.acquire() as conn:
+            row = conn.execute("SELECT id FROM market_types WHERE name = ?", (market_type,)).fetchone()
+
+        if row is None:
+            return None
+        self._mt_to_id[market_type] = row[0]
+        return row[0]
 
     def store_prediction(
         self,
@@ -171,8 +737,6 @@ class TradeHistoryDB:
         Returns:
             prediction_id for later updates
         """
-        cursor = self.conn.cursor()
-
         timestamp = datetime.utcnow().isoformat()
 
         # Extract market prices
@@ -186,24 +750,18 @@ class TradeHistoryDB:
         # Store features as JSON
         features_json = json.dumps(features) if features else None
 
-        cursor.execute("""
-            INSERT INTO predictions (
-                timestamp, market_id, question, market_type,
+        with self._write() as cursor:
+            market_type_id = self.market_type_id(market_type, create=True)
+
+            cursor.execute(self._SQL_INSERT_PREDICTION, (
+                timestamp, market_id, question, market_type, market_type_id,
                 predicted_outcome, predicted_probability, confidence, reasoning,
                 market_price_yes, market_price_no, time_to_close_hours,
                 social_sentiment, social_volume,
-                strategy, features
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            timestamp, market_id, question, market_type,
-            predicted_outcome, predicted_probability, confidence, reasoning,
-            market_price_yes, market_price_no, time_to_close_hours,
-            social_sentiment, social_volume,
-            strategy, features_json
-        ))
+                strategy, features_json
+            ))
 
-        self.conn.commit()
-        return cursor.lastrowid
+            return cursor.lastrowid
 
     def record_trade_execution(
         self,
@@ -213,19 +771,8 @@ class TradeHistoryDB:
         execution_result: str
     ):
         """Record that a trade was executed for this prediction"""
-        cursor = self.conn.cursor()
-
-        cursor.execute("""
-            UPDATE predictions
-            SET trade_executed = 1,
-                trade_size_usdc = ?,
-                trade_price = ?,
-                execution_result = ?,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (trade_size_usdc, trade_price, execution_result, prediction_id))
-
-        self.conn.commit()
+        with self._write() as cursor:
+            cursor.execute(self._SQL_UPDATE_TRADE, (trade_size_usdc, trade_price, execution_result, prediction_id))
 
     def update_prediction_execution(
         self,
@@ -234,17 +781,14 @@ class TradeHistoryDB:
         execution_result: str
     ):
         """Update execution status for a prediction (success or failure)"""
-        cursor = self.conn.cursor()
-
-        cursor.execute("""
-            UPDATE predictions
-            SET trade_executed = ?,
-                execution_result = ?,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (1 if trade_executed else 0, execution_result, prediction_id))
-
-        self.conn.commit()
+        with self._write() as cursor:
+            cursor.execute("""
+                UPDATE predictions
+                SET trade_executed = ?,
+                    execution_result = ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            """, (1 if trade_executed else 0, execution_result, prediction_id))
 
     def record_outcome(
         self,
@@ -256,69 +800,80 @@ class TradeHistoryDB:
         Record the actual outcome when a market resolves
         Updates all predictions for this market
         """
-        cursor = self.conn.cursor()
-
         if resolution_date is None:
             resolution_date = datetime.utcnow().isoformat()
 
-        # Update all predictions for this market
-        cursor.execute("""
-            UPDATE predictions
-            SET actual_outcome = ?,
-                resolution_date = ?,
-                was_correct = (predicted_outcome = ?),
-                updated_at = CURRENT_TIMESTAMP
-            WHERE market_id = ? AND actual_outcome IS NULL
-        """, (actual_outcome, resolution_date, actual_outcome, market_id))
-
-        # Calculate P&L for executed trades
-        cursor.execute("""
-            UPDATE predictions
-            SET profit_loss_usdc = CASE
-                WHEN was_correct = 1 THEN trade_size_usdc * (1.0 - trade_price) / trade_price
-                ELSE -trade_size_usdc
-            END
-            WHERE market_id = ? AND trade_executed = 1
-        """, (market_id,))
+        with self._write() as cursor:
+            # Resolve all predictions for this market, with P&L for executed trades
+            cursor.execute(
+                self._SQL_RESOLVE_MARKET,
+                (actual_outcome, resolution_date, actual_outcome, actual_outcome, market_id)
+            )
 
-        self.conn.commit()
+            # Update calibration data
+            self._update_calibration_data(cursor)
 
-        # Update calibration data
-        self._update_calibration_data()
+    def record_outcomes_bulk(
+        self,
+        outcomes: Iterable[Tuple[str, str]],
+        resolution_date: Optional[str] = None
+    ) -> int:
+        """
+        Record many resolved markets at once (e.g. a daily resolution sweep)
 
-    def _update_calibration_data(self):
-        """Update calibration buckets with latest data"""
-        cursor = self.conn.cursor()
+        Same effect as calling record_outcome() per market, but in a single
+        transaction with calibration rebuilt once at the end.
+
+        Args:
+            outcomes: (market_id, actual_outcome) pairs
+            resolution_date: Shared resolution date (defaults to now)
 
-        # Define confidence buckets (0-10%, 10-20%, ..., 90-100%)
-        buckets = [(i/10, (i+1)/10) for i in range(10)]
+        Returns:
+            Number of markets processed
+        """
+        if resolution_date is None:
+            resolution_date = datetime.utcnow().isoformat()
 
-        for lower, upper in buckets:
-            bucket_center = (lower + upper) / 2
+        outcomes = list(outcomes)
+        if not outcomes:
+            return 0
 
-            # Get predictions in this bucket that have resolved
-            cursor.execute("""
-                SELECT
-                    COUNT(*) as total,
-                    SUM(CASE WHEN was_correct = 1 THEN 1 ELSE 0 END) as correct
-                FROM predictions
-                WHERE confidence >= ? AND confidence < ?
-                AND actual_outcome IS NOT NULL
-            """, (lower, upper))
+        with self._write() as cursor:
+            cursor.executemany(
+                self._SQL_RESOLVE_MARKET,
+                ((outcome, resolution_date, outcome, outcome, market_id)
+                 for market_id, outcome in outcomes)
+            )
 
-            row = cursor.fetchone()
-            total = row['total']
-            correct = row['correct'] if row['correct'] else 0
-            accuracy = correct / total if total > 0 else None
+            self._update_calibration_data(cursor)
 
-            # Insert or update
-            cursor.execute("""
-                INSERT OR REPLACE INTO calibration_data
-                (confidence_bucket, total_predictions, correct_predictions, accuracy, updated_at)
-                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-            """, (bucket_center, total, correct, accuracy))
+        return len(outcomes)
 
-        self.conn.commit()
+    def _update_calibration_data(self, cursor: sqlite3.Cursor):
+        """Update calibration buckets with latest data (inside the caller's transaction)"""
+        # Confidence buckets 0-10%, 10-20%, ..., 90-100%, all rebuilt by one
+        # aggregate. The center is computed as (lower + upper) / 2 so keys
+        # match rows written by earlier versions exactly. Cleared first so a
+        # bucket with no rows left (e.g. after archive_resolved) doesn't
+        # keep its old counts.
+        cursor.execute("DELETE FROM calibration_data")
+        cursor.execute("""
+            INSERT INTO calibration_data
+            (confidence_bucket, total_predictions, correct_predictions, accuracy, updated_at)
+            SELECT
+                (b / 10.0 + (b + 1) / 10.0) / 2,
+                COUNT(*),
+                SUM(CASE WHEN was_correct = 1 THEN 1 ELSE 0 END),
+                SUM(CASE WHEN was_correct = 1 THEN 1 ELSE 0 END) * 1.0 / COUNT(*),
+                CURRENT_TIMESTAMP
+            FROM (
+                SELECT CAST(confidence * 10 AS INTEGER) AS b, was_correct
+                FROM predictions
+                WHERE actual_outcome IS NOT NULL
+                AND confidence >= 0 AND confidence < 1
+            )
+            GROUP BY b
+        """)
 
     def get_calibration_curve(self) -> List[Tuple[float, float, int]]:
         """
@@ -327,64 +882,145 @@ class TradeHistoryDB:
         Returns:
             List of (predicted_confidence, actual_accuracy, sample_size)
         """
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT confidence_bucket, accuracy, total_predictions
-            FROM calibration_data
-            WHERE total_predictions > 0
-            ORDER BY confidence_bucket
-        """)
+        with self.acquire() as conn:
+            rows = conn.execute("""
+                SELECT confidence_bucket, accuracy, total_predictions
+                FROM calibration_data
+                WHERE total_predictions > 0
+                ORDER BY confidence_bucket
+            """).fetchall()
 
         return [(row['confidence_bucket'], row['accuracy'], row['total_predictions'])
-                for row in cursor.fetchall()]
+                for row in rows]
 
     def calculate_brier_score(
         self,
         market_type: Optional[str] = None,
         strategy: Optional[str] = None,
-        time_range_days: Optional[int] = None
+        time_range_days: Optional[int] = None,
+        parquet_path: Optional[str] = None
     ) -> Optional[float]:
         """
         Calculate Brier score for resolved predictions
 
         Brier score = mean((predicted_prob - actual_outcome)^2)
         Lower is better (0 = perfect, 1 = worst possible)
+
+        Served from the agg_stats buckets; time_range_days is applied at
+        day granularity. With parquet_path, the score is computed from a
+        snapshot written by export_resolved_to_parquet() instead.
         """
-        cursor = self.conn.cursor()
+        if parquet_path is not None:
+            return self._brier_score_from_parquet(
+                parquet_path, market_type, strategy, time_range_days
+            )
 
         query = """
-            SELECT predicted_probability, was_correct
-            FROM predictions
-            WHERE actual_outcome IS NOT NULL
+            SELECT SUM(sum_sq_error), SUM(n)
+            FROM agg_stats
+            WHERE 1 = 1
         """
         params = []
 
         if market_type:
-            query += " AND market_type = ?"
-            params.append(market_type)
+            query += " AND market_type_id = ?"
+            params.append(self.market_type_id(market_type))
 
         if strategy:
             query += " AND strategy = ?"
             params.append(strategy)
 
         if time_range_days:
-            cutoff = (datetime.utcnow() - timedelta(days=time_range_days)).isoformat()
-            query += " AND timestamp >= ?"
+            cutoff = (datetime.utcnow() - timedelta(days=time_range_days)).date().isoformat()
+            query += " AND day >= ?"
             params.append(cutoff)
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+        with self.acquire() as conn:
+            sum_sq_error, n = conn.execute(query, params).fetchone()
 
-        if not rows:
+        if not n:
             return None
 
-        brier_scores = []
-        for row in rows:
-            predicted_prob = row['predicted_probability']
-            actual = 1.0 if row['was_correct'] else 0.0
-            brier_scores.append((predicted_prob - actual) ** 2)
+        return sum_sq_error / n
+
+    def export_resolved_to_parquet(self, path: str) -> int:
+        """
+        Snapshot resolved predictions to a columnar Parquet file
+
+        Only the analytical columns are written, so offline scans over the
+        history read a fraction of what the row store would. Requires pyarrow.
+
+        Returns:
+            Number of rows exported
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ("predicted_probability", pa.float64()),
+            ("was_correct", pa.int8()),
+            ("strategy", pa.string()),
+            ("market_type", pa.string()),
+            ("timestamp", pa.string()),
+            ("profit_loss_usdc", pa.float64()),
+        ])
+
+        with self.acquire() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute("""
+                SELECT
+                    p.predicted_probability,
+                    CASE WHEN p.was_correct = 1 THEN 1 ELSE 0 END,
+                    p.strategy,
+                    mt.name,
+                    p.timestamp,
+                    p.profit_loss_usdc
+                FROM predictions p
+                LEFT JOIN market_types mt ON mt.id = p.market_type_id
+                WHERE p.actual_outcome IS NOT NULL
+            """)
+            columns = list(zip(*cursor.fetchall())) or [()] * len(schema)
+
+        table = pa.table(
+            [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+            schema=schema,
+        )
+        pq.write_table(table, path, compression="snappy")
+        return table.num_rows
+
+    def _brier_score_from_parquet(
+        self,
+        path: str,
+        market_type: Optional[str],
+        strategy: Optional[str],
+        time_range_days: Optional[int]
+    ) -> Optional[float]:
+        """Brier score over an export_resolved_to_parquet() snapshot"""
+        import numpy as np
+        import pyarrow.parquet as pq
+
+        filters = []
+        if market_type:
+            filters.append(("market_type", "=", market_type))
+        if strategy:
+            filters.append(("strategy", "=", strategy))
+        if time_range_days:
+            cutoff = (datetime.utcnow() - timedelta(days=time_range_days)).isoformat()
+            filters.append(("timestamp", ">=", cutoff))
+
+        # Column projection + predicate pushdown: only two columns are decoded
+        table = pq.read_table(
+            path,
+            columns=["predicted_probability", "was_correct"],
+            filters=filters or None,
+        )
+        if table.num_rows == 0:
+            return None
 
-        return sum(brier_scores) / len(brier_scores)
+        p = table.column("predicted_probability").to_numpy()
+        y = table.column("was_correct").to_numpy()
+        return float(np.mean((p - y) ** 2))
 
     def get_performance_summary(
         self,
@@ -392,39 +1028,43 @@ class TradeHistoryDB:
         strategy: Optional[str] = None,
         days: int = 30
     ) -> Dict:
-        """Get comprehensive performance summary"""
-        cursor = self.conn.cursor()
+        """
+        Get comprehensive performance summary
 
-        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        Served from the summary_stats counters, so the cost grows with the
+        number of days rather than predictions; the window is applied at day
+        granularity.
+        """
+        cutoff = (datetime.utcnow() - timedelta(days=days)).date().isoformat()
 
         query = """
             SELECT
-                COUNT(*) as total_predictions,
-                SUM(CASE WHEN trade_executed = 1 THEN 1 ELSE 0 END) as trades_executed,
-                SUM(CASE WHEN was_correct = 1 THEN 1 ELSE 0 END) as correct_predictions,
-                SUM(CASE WHEN was_correct = 0 THEN 1 ELSE 0 END) as incorrect_predictions,
-                SUM(CASE WHEN profit_loss_usdc > 0 THEN 1 ELSE 0 END) as profitable_trades,
-                SUM(profit_loss_usdc) as total_pnl,
-                AVG(confidence) as avg_confidence,
-                COUNT(CASE WHEN actual_outcome IS NOT NULL THEN 1 END) as resolved_markets
-            FROM predictions
-            WHERE timestamp >= ?
+                SUM(n_total) as total_predictions,
+                SUM(n_executed) as trades_executed,
+                SUM(n_correct) as correct_predictions,
+                SUM(n_profitable) as profitable_trades,
+                SUM(n_pnl) as pnl_count,
+                SUM(sum_pnl) as total_pnl,
+                SUM(sum_confidence) as sum_confidence,
+                SUM(n_resolved) as resolved_markets
+            FROM summary_stats
+            WHERE day >= ?
         """
         params = [cutoff]
 
         if market_type:
-            query += " AND market_type = ?"
-            params.append(market_type)
+            query += " AND market_type_id = ?"
+            params.append(self.market_type_id(market_type))
 
         if strategy:
             query += " AND strategy = ?"
             params.append(strategy)
 
-        cursor.execute(query, params)
-        row = cursor.fetchone()
+        with self.acquire() as conn:
+            row = conn.execute(query, params).fetchone()
 
-        total = row['total_predictions']
-        resolved = row['resolved_markets']
+        total = row['total_predictions'] or 0
+        resolved = row['resolved_markets'] or 0
         correct = row['correct_predictions'] if row['correct_predictions'] else 0
         profitable = row['profitable_trades'] if row['profitable_trades'] else 0
 
@@ -435,11 +1075,20 @@ class TradeHistoryDB:
             "pending_markets": total - resolved,
             "win_rate": profitable / resolved if resolved > 0 else None,
             "prediction_accuracy": correct / resolved if resolved > 0 else None,
-            "total_pnl_usdc": row['total_pnl'],
-            "avg_confidence": row['avg_confidence'],
+            "total_pnl_usdc": row['total_pnl'] if row['pnl_count'] else None,
+            "avg_confidence": row['sum_confidence'] / total if total else None,
             "brier_score": self.calculate_brier_score(market_type, strategy, days)
         }
 
+    # Summary columns for past markets; leaves out the reasoning and
+    # features blobs, which grow with every prediction
+    _SIMILAR_MARKET_COLUMNS = """
+                    p.id, p.timestamp, p.market_id, p.question, p.market_type,
+                    p.predicted_outcome, p.predicted_probability, p.confidence,
+                    p.market_price_yes, p.market_price_no, p.strategy,
+                    p.trade_executed, p.trade_price, p.actual_outcome,
+                    p.was_correct, p.profit_loss_usdc"""
+
     def find_similar_markets(
         self,
         question: str,
@@ -447,56 +1096,73 @@ class TradeHistoryDB:
         limit: int = 10
     ) -> List[Dict]:
         """
-        Find similar past markets (basic text matching for now)
+        Find similar past markets (full-text keyword matching for now)
         TODO: Integrate with ChromaDB for semantic similarity
-        """
-        cursor = self.conn.cursor()
 
-        # Simple keyword matching for now
-        keywords = question.lower().split()[:5]  # First 5 words
-
-        query = """
-            SELECT *
-            FROM predictions
-            WHERE actual_outcome IS NOT NULL
+        Matches any of the question's first 5 words through the FTS5 index,
+        best matches first.
         """
-        params = []
+        # Quote each word so punctuation and FTS operators are taken literally
+        keywords = [
+            '"' + word.replace('"', '""') + '"'
+            for word in question.lower().split()[:5]  # First 5 words
+        ]
+
+        if keywords:
+            query = f"""
+                SELECT {self._SIMILAR_MARKET_COLUMNS}
+                FROM predictions_fts f
+                JOIN predictions p ON p.id = f.rowid
+                WHERE predictions_fts MATCH ?
+                AND p.actual_outcome IS NOT NULL
+            """
+            params = [" OR ".join(keywords)]
+            order = " ORDER BY f.rank, p.timestamp DESC LIMIT ?"
+        else:
+            query = f"""
+                SELECT {self._SIMILAR_MARKET_COLUMNS}
+                FROM predictions p
+                WHERE p.actual_outcome IS NOT NULL
+            """
+            params = []
+            order = " ORDER BY p.timestamp DESC LIMIT ?"
 
         if market_type:
-            query += " AND market_type = ?"
-            params.append(market_type)
-
-        # Add basic text matching
-        for keyword in keywords:
-            query += f" AND LOWER(question) LIKE ?"
-            params.append(f"%{keyword}%")
+            query += " AND p.market_type_id = ?"
+            params.append(self.market_type_id(market_type))
 
-        query += " ORDER BY timestamp DESC LIMIT ?"
+        query += order
         params.append(limit)
 
-        cursor.execute(query, params)
+        with self.acquire() as conn:
+            rows = conn.execute(query, params).fetchall()
 
-        return [dict(row) for row in cursor.fetchall()]
+        return [dict(row) for row in rows]
+
+    def stats_version(self) -> int:
+        """Counter that moves whenever get_edge_by_market_type() may have changed"""
+        with self.acquire() as conn:
+            return conn.execute("SELECT version FROM stats_version WHERE id = 0").fetchone()[0]
 
     def get_edge_by_market_type(self) -> Dict[str, Dict]:
         """Calculate expected edge by market type"""
-        cursor = self.conn.cursor()
-
-        cursor.execute("""
-            SELECT
-                market_type,
-                COUNT(*) as total_trades,
-                SUM(CASE WHEN was_correct = 1 THEN 1 ELSE 0 END) as correct_predictions,
-                SUM(CASE WHEN profit_loss_usdc > 0 THEN 1 ELSE 0 END) as profitable_trades,
-                SUM(profit_loss_usdc) as total_pnl,
-                AVG(profit_loss_usdc) as avg_pnl_per_trade
-            FROM predictions
-            WHERE trade_executed = 1 AND actual_outcome IS NOT NULL
-            GROUP BY market_type
-        """)
+        with self.acquire() as conn:
+            rows = conn.execute("""
+                SELECT
+                    mt.name as market_type,
+                    COUNT(*) as total_trades,
+                    SUM(CASE WHEN p.was_correct = 1 THEN 1 ELSE 0 END) as correct_predictions,
+                    SUM(CASE WHEN p.profit_loss_usdc > 0 THEN 1 ELSE 0 END) as profitable_trades,
+                    SUM(p.profit_loss_usdc) as total_pnl,
+                    AVG(p.profit_loss_usdc) as avg_pnl_per_trade
+                FROM predictions p
+                LEFT JOIN market_types mt ON mt.id = p.market_type_id
+                WHERE p.trade_executed = 1 AND p.actual_outcome IS NOT NULL
+                GROUP BY p.market_type_id
+            """).fetchall()
 
         results = {}
-        for row in cursor.fetchall():
+        for row in rows:
             market_type = row['market_type'] or 'unknown'
             total = row['total_trades']
             correct = row['correct_predictions'] if row['correct_predictions'] else 0
@@ -526,22 +1192,43 @@ class TradeHistoryDB:
         Updates the most recent prediction for this market
         """
         from datetime import datetime
-        cursor = self.conn.cursor()
-
-        cursor.execute("""
-            UPDATE predictions
-            SET position_open = 1,
-                token_id = ?,
-                entry_timestamp = ?,
-                trade_size_usdc = ?
-            WHERE market_id = ?
-            AND trade_executed = 1
-            AND position_open = 0
-            ORDER BY timestamp DESC
-            LIMIT 1
-        """, (token_id, datetime.utcnow().isoformat(), size, market_id))
-
-        self.conn.commit()
+        with self._write() as cursor:
+            cursor.execute("""
+                UPDATE predictions
+                SET position_open = 1,
+                    token_id = ?,
+                    entry_timestamp = ?,
+                    trade_size_usdc = ?
+                WHERE id = (
+                    -- UPDATE ... LIMIT needs SQLITE_ENABLE_UPDATE_DELETE_LIMIT,
+                    -- which stock builds lack; pick the row by id instead
+                    SELECT id FROM predictions
+                    WHERE market_id = ?
+                    AND trade_executed = 1
+                    AND position_open = 0
+                    ORDER BY timestamp DESC
+                    LIMIT 1
+                )
+            """, (token_id, datetime.utcnow().isoformat(), size, market_id))
+
+    _SQL_OPEN_POSITIONS = """
+        SELECT
+            market_id,
+            token_id,
+            question,
+            predicted_outcome,
+            trade_price as entry_price,
+            trade_size_usdc as size,
+            predicted_probability,
+            confidence,
+            entry_timestamp,
+            market_type,
+            time_to_close_hours
+        FROM predictions
+        WHERE position_open = 1
+        AND trade_executed = 1
+        ORDER BY entry_timestamp DESC
+    """
 
     def get_open_positions(self) -> List[Dict]:
         """
@@ -550,28 +1237,22 @@ class TradeHistoryDB:
         Returns:
             List of position dicts with market_id, token_id, entry_price, size, etc.
         """
-        cursor = self.conn.cursor()
+        with self.acquire() as conn:
+            rows = conn.execute(self._SQL_OPEN_POSITIONS).fetchall()
 
-        cursor.execute("""
-            SELECT
-                market_id,
-                token_id,
-                question,
-                predicted_outcome,
-                trade_price as entry_price,
-                trade_size_usdc as size,
-                predicted_probability,
-                confidence,
-                entry_timestamp,
-                market_type,
-                time_to_close_hours
-            FROM predictions
-            WHERE position_open = 1
-            AND trade_executed = 1
-            ORDER BY entry_timestamp DESC
-        """)
+        return [dict(row) for row in rows]
 
-        return [dict(row) for row in cursor.fetchall()]
+    def get_open_positions_fast(self) -> List[OpenPosition]:
+        """
+        Open positions as plain tuples, for per-tick polling
+
+        Skips the sqlite3.Row and dict built per row by get_open_positions().
+        """
+        with self.acquire() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(self._SQL_OPEN_POSITIONS)
+            return list(map(OpenPosition._make, cursor))
 
     def close_position(
         self,
@@ -583,81 +1264,52 @@ class TradeHistoryDB:
         Close a position and calculate realized P&L
 
         Returns:
-            Realized P&L in USDC
+            Realized P&L in USDC (summed if several rows were open), or
+            None if no position was open
         """
-        from datetime import datetime
-        cursor = self.conn.cursor()
-
-        # Get position details
-        cursor.execute("""
-            SELECT
-                trade_price as entry_price,
-                trade_size_usdc as size,
-                predicted_outcome
-            FROM predictions
-            WHERE market_id = ?
-            AND position_open = 1
-            LIMIT 1
-        """, (market_id,))
-
-        row = cursor.fetchone()
-        if not row:
-            return None
-
-        entry_price = row['entry_price']
-        size = row['size']
-
-        # Calculate P&L
-        # If we bought YES at entry_price and sell at exit_price:
+        # One atomic statement: no window between reading the entry price
+        # and closing, where a second closer could also see position_open = 1.
+        # If we bought at entry_price and sell at exit_price:
         # P&L = size * (exit_price - entry_price) / entry_price
-        pnl = size * (exit_price - entry_price) / entry_price
-
-        # Update position
-        cursor.execute("""
-            UPDATE predictions
-            SET position_open = 0,
-                exit_timestamp = ?,
-                exit_price = ?,
-                exit_reason = ?,
-                profit_loss_usdc = ?
-            WHERE market_id = ?
-            AND position_open = 1
-        """, (datetime.utcnow().isoformat(), exit_price, exit_reason, pnl, market_id))
+        with self._write() as cursor:
+            rows = cursor.execute(self._SQL_CLOSE_POSITION, (
+                datetime.utcnow().isoformat(), exit_price, exit_reason, exit_price, market_id
+            )).fetchall()
 
-        self.conn.commit()
+        if not rows:
+            return None
 
-        return pnl
+        return sum(row[0] for row in rows)
 
     def was_recently_analyzed(self, market_id: str, hours: int = 24) -> bool:
         """Check if a market was analyzed within the last N hours.
 
         Used to skip redundant AI calls for markets we've already evaluated.
         """
-        cursor = self.conn.cursor()
         cutoff = (datetime.utcnow() - timedelta(hours=hours)).isoformat()
 
-        cursor.execute("""
-            SELECT COUNT(*) FROM predictions
-            WHERE market_id = ? AND timestamp > ?
-        """, (market_id, cutoff))
+        with self.acquire() as conn:
+            row = conn.execute("""
+                SELECT COUNT(*) FROM predictions
+                WHERE market_id = ? AND timestamp > ?
+            """, (market_id, cutoff)).fetchone()
 
-        count = cursor.fetchone()[0]
+        count = row[0]
         return count > 0
 
     def get_cached_prediction(self, market_id: str, hours: int = 24) -> Optional[Dict]:
         """Get the most recent prediction for a market if within cache window."""
-        cursor = self.conn.cursor()
         cutoff = (datetime.utcnow() - timedelta(hours=hours)).isoformat()
 
-        cursor.execute("""
-            SELECT predicted_outcome, predicted_probability, confidence, reasoning, strategy
-            FROM predictions
-            WHERE market_id = ? AND timestamp > ?
-            ORDER BY timestamp DESC
-            LIMIT 1
-        """, (market_id, cutoff))
+        with self.acquire() as conn:
+            row = conn.execute("""
+                SELECT predicted_outcome, predicted_probability, confidence, reasoning, strategy
+                FROM predictions
+                WHERE market_id = ? AND timestamp > ?
+                ORDER BY timestamp DESC
+                LIMIT 1
+            """, (market_id, cutoff)).fetchone()
 
-        row = cursor.fetchone()
         if row:
             return {
                 "outcome": row[0],
@@ -669,12 +1321,173 @@ class TradeHistoryDB:
             }
         return None
 
+    def archive_resolved(self, archive_path: str = None, older_than_days: int = 30) -> int:
+        """
+        Move old resolved predictions into an attached archive database
+
+        Keeps the live predictions table (and its indexes) small for the
+        trading loop; meant for a periodic maintenance job.
+
+        Archiving deliberately splits history in two:
+        - all-time reports keep counting archived rows: Brier scores
+          (agg_stats) and get_performance_summary() (summary_stats);
+        - everything the bot learns from becomes a rolling window of the
+          last older_than_days: the edge gate (get_edge_by_market_type),
+          feature model and isotonic training, the calibration curve and
+          similar-market search only read the live table.
+        So the trading decisions adapt to recent performance while the
+        reports still describe the whole record.
+
+        Args:
+            archive_path: Archive file (default: "<db>.archive.db" next to the live DB)
+            older_than_days: Archive rows resolved more than this many days ago
+
+        Returns:
+            Number of predictions archived
+        """
+        if archive_path is None:
+            archive_path = str(Path(self.db_path).with_suffix(".archive.db"))
+        cutoff = (datetime.utcnow() - timedelta(days=older_than_days)).isoformat()
+
+        with self._write_lock:
+            # ATTACH/DETACH are not allowed inside a transaction
+            self.conn.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+            try:
+                with self._write() as cursor:
+                    columns = [row[1] for row in cursor.execute("PRAGMA main.table_info(predictions)")]
+                    cursor.execute(
+                        "CREATE TABLE IF NOT EXISTS archive.predictions AS "
+                        "SELECT * FROM main.predictions WHERE 0"
+                    )
+                    # Columns added to the live schema since the archive was created
+                    archived = {row[1] for row in cursor.execute("PRAGMA archive.table_info(predictions)")}
+                    for column in columns:
+                        if column not in archived:
+                            cursor.execute(f"ALTER TABLE archive.predictions ADD COLUMN {column}")
+
+                    cursor.execute("DROP TABLE IF EXISTS temp.archive_ids")
+                    cursor.execute("""
+                        CREATE TEMP TABLE archive_ids AS
+                        SELECT id FROM main.predictions
+                        WHERE actual_outcome IS NOT NULL
+                        AND position_open = 0
+                        AND resolution_date < ?
+                    """, (cutoff,))
+                    moved = cursor.execute("SELECT COUNT(*) FROM temp.archive_ids").fetchone()[0]
+
+                    if moved:
+                        column_list = ", ".join(columns)
+                        cursor.execute(f"""
+                            INSERT INTO archive.predictions ({column_list})
+                            SELECT {column_list} FROM main.predictions
+                            WHERE id IN (SELECT id FROM temp.archive_ids)
+                        """)
+                        cursor.execute("""
+                            DELETE FROM main.predictions
+                            WHERE id IN (SELECT id FROM temp.archive_ids)
+                        """)
+                        self._update_calibration_data(cursor)
+                        # The delete triggers took the rows out of agg_stats and
+                        # summary_stats; put their counts back so Brier scores
+                        # and summaries still cover them
+                        cursor.execute("""
+                            INSERT INTO agg_stats
+                            SELECT
+                                strategy,
+                                COALESCE(market_type_id, 0),
+                                substr(timestamp, 1, 10),
+                                COUNT(*),
+                                SUM(CASE WHEN was_correct = 1 THEN 1 ELSE 0 END),
+                                TOTAL((predicted_probability - (CASE WHEN was_correct = 1 THEN 1.0 ELSE 0.0 END))
+                                      * (predicted_probability - (CASE WHEN was_correct = 1 THEN 1.0 ELSE 0.0 END))),
+                                TOTAL(profit_loss_usdc)
+                            FROM archive.predictions
+                            WHERE id IN (SELECT id FROM temp.archive_ids)
+                            GROUP BY 1, 2, 3
+                            ON CONFLICT (strategy, market_type_id, day) DO UPDATE SET
+                                n = n + excluded.n,
+                                n_correct = n_correct + excluded.n_correct,
+                                sum_sq_error = sum_sq_error + excluded.sum_sq_error,
+                                sum_pnl = sum_pnl + excluded.sum_pnl
+                        """)
+                        cursor.execute("""
+                            INSERT INTO summary_stats
+                            SELECT
+                                strategy,
+                                COALESCE(market_type_id, 0),
+                                substr(timestamp, 1, 10),
+                                COUNT(*),
+                                SUM(CASE WHEN trade_executed = 1 THEN 1 ELSE 0 END),
+                                COUNT(actual_outcome),
+                                SUM(CASE WHEN was_correct = 1 THEN 1 ELSE 0 END),
+                                SUM(CASE WHEN profit_loss_usdc > 0 THEN 1 ELSE 0 END),
+                                COUNT(profit_loss_usdc),
+                                TOTAL(profit_loss_usdc),
+                                TOTAL(confidence)
+                            FROM archive.predictions
+                            WHERE id IN (SELECT id FROM temp.archive_ids)
+                            GROUP BY 1, 2, 3
+                            ON CONFLICT (strategy, market_type_id, day) DO UPDATE SET
+                                n_total = n_total + excluded.n_total,
+                                n_executed = n_executed + excluded.n_executed,
+                                n_resolved = n_resolved + excluded.n_resolved,
+                                n_correct = n_correct + excluded.n_correct,
+                                n_profitable = n_profitable + excluded.n_profitable,
+                                n_pnl = n_pnl + excluded.n_pnl,
+                                sum_pnl = sum_pnl + excluded.sum_pnl,
+                                sum_confidence = sum_confidence + excluded.sum_confidence
+                        """)
+
+                    cursor.execute("DROP TABLE temp.archive_ids")
+            finally:
+                self.conn.execute("DETACH DATABASE archive")
+
+        return moved
+
     def close(self):
         """Close database connection"""
         self.conn.close()
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
 
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
+
+
+# Shared instances for get_db(), keyed by (db_path, pid). A forked worker
+# gets its own instance; the parent's connections must not be used (or
+# closed) across fork, so they are simply left alone in the child.
+_DB_CACHE: Dict[Tuple[Optional[str], int], TradeHistoryDB] = {}
+_DB_CACHE_LOCK = threading.Lock()
+
+
+def get_db(db_path: str = None) -> TradeHistoryDB:
+    """
+    Shared TradeHistoryDB for this process
+
+    Opens (and schema-checks) the database once per path and process instead
+    of on every TradeHistoryDB() call. Do not close() the returned instance;
+    it is closed at interpreter exit.
+    """
+    key = (db_path, os.getpid())
+    db = _DB_CACHE.get(key)
+    if db is None:
+        with _DB_CACHE_LOCK:
+            db = _DB_CACHE.get(key)
+            if db is None:
+                db = _DB_CACHE[key] = TradeHistoryDB(db_path)
+    return db
+
+
+@atexit.register
+def _close_cached_dbs():
+    pid = os.getpid()
+    for (_, owner), db in list(_DB_CACHE.items()):
+        if owner == pid:
+            db.close()
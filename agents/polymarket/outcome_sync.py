@@ -13,11 +13,23 @@ Date: 2026-01-12
 
 import os
 import sqlite3
+import time
+import orjson
 import requests
+from collections import defaultdict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from dotenv import load_dotenv
 
+# Optional: ranks candidate titles in the fallback match
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    process = None
+
 load_dotenv()
 
 
@@ -31,6 +43,19 @@ class OutcomeSync:
     """
 
     DATA_API_BASE = "https://data-api.polymarket.com"
+    # Seconds a fetched /activity response is reused (back-to-back syncs)
+    ACTIVITY_CACHE_TTL = 60
+
+    # Params: (actual_outcome, was_correct, profit_loss_usdc, resolved_at, id)
+    _SQL_RECORD_OUTCOME = '''
+        UPDATE predictions
+        SET actual_outcome = ?,
+            was_correct = ?,
+            profit_loss_usdc = ?,
+            position_open = 0,
+            resolved_at = ?
+        WHERE id = ?
+    '''
 
     def __init__(self, db_path: str = None):
         if db_path is None:
@@ -41,47 +66,102 @@ class OutcomeSync:
         self.proxy_address = os.getenv("POLYMARKET_PROXY_ADDRESS")
         if not self.proxy_address:
             raise ValueError("POLYMARKET_PROXY_ADDRESS not set in environment")
-
-    def get_redeem_events(self, limit: int = 500) -> List[Dict]:
+        self._conn: Optional[sqlite3.Connection] = None
+        self._schema_ready = False
+        self._select_pending_sql = None
+        # (activity type, limit) -> (fetched at, events)
+        self._activity_cache: Dict[Tuple[str, int], Tuple[float, List[Dict]]] = {}
+
+        # One keep-alive connection pool for every Data API call, retrying
+        # rate limits and transient server errors with backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+        )
+        self.session.mount("https://", adapter)
+
+    def _get_conn(self) -> sqlite3.Connection:
         """
-        Fetch REDEEM events (resolved markets) from Polymarket Data API.
+        Shared database connection, opened on first use.
 
-        REDEEM events show:
-        - assetId: The token ID of the resolved position
-        - usdcSize: The payout amount (0 = loss, >0 = win)
-        - timestamp: When the redemption occurred
+        Autocommit mode (writers manage their own BEGIN/COMMIT), with the
+        PRAGMAs applied once. Use as `with self._get_conn() as conn:` so an
+        error inside an explicit transaction rolls it back.
+        """
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-20000")
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        """Close the HTTP session and database connection."""
+        self.session.close()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _get_activity(self, activity_type: str, limit: int) -> List[Dict]:
         """
+        Fetch /activity events of one type, reusing a response younger than
+        ACTIVITY_CACHE_TTL seconds. If the request fails, the last good
+        response (however old) is returned instead of nothing.
+        """
+        key = (activity_type, limit)
+        cached = self._activity_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.ACTIVITY_CACHE_TTL:
+            return cached[1]
+
         url = f"{self.DATA_API_BASE}/activity"
         params = {
             "user": self.proxy_address,
-            "type": "REDEEM",
+            "type": activity_type,
             "limit": limit
         }
 
         try:
-            resp = requests.get(url, params=params, timeout=30)
+            resp = self.session.get(url, params=params, timeout=30)
             resp.raise_for_status()
-            return resp.json()
+            events = orjson.loads(resp.content)
         except Exception as e:
-            print(f"Error fetching REDEEM events: {e}")
-            return []
+            print(f"Error fetching {activity_type} events: {e}")
+            return cached[1] if cached is not None else []
+
+        self._activity_cache[key] = (time.monotonic(), events)
+        return events
+
+    def get_redeem_events(self, limit: int = 500) -> List[Dict]:
+        """
+        Fetch REDEEM events (resolved markets) from Polymarket Data API.
+
+        REDEEM events show:
+        - assetId: The token ID of the resolved position
+        - usdcSize: The payout amount (0 = loss, >0 = win)
+        - timestamp: When the redemption occurred
+        """
+        return self._get_activity("REDEEM", limit)
 
     def get_trade_events(self, limit: int = 500) -> List[Dict]:
         """Fetch TRADE events to match with REDEEMs."""
-        url = f"{self.DATA_API_BASE}/activity"
-        params = {
-            "user": self.proxy_address,
-            "type": "TRADE",
-            "limit": limit
-        }
+        return self._get_activity("TRADE", limit)
 
-        try:
-            resp = requests.get(url, params=params, timeout=30)
-            resp.raise_for_status()
-            return resp.json()
-        except Exception as e:
-            print(f"Error fetching TRADE events: {e}")
-            return []
+    def get_redeem_and_trade_events(self, limit: int = 1000) -> Tuple[List[Dict], List[Dict]]:
+        """Fetch REDEEM and TRADE events concurrently (the calls are independent)."""
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            redeems = ex.submit(self.get_redeem_events, limit)
+            trades = ex.submit(self.get_trade_events, limit)
+            return redeems.result(), trades.result()
 
     def sync_outcomes(self, verbose: bool = True) -> Dict[str, Any]:
         """
@@ -92,33 +172,29 @@ class OutcomeSync:
 
         Returns stats about what was synced.
         """
-        redeems = self.get_redeem_events(limit=1000)
-        trades_api = self.get_trade_events(limit=1000)
+        redeems, trades_api = self.get_redeem_and_trade_events(limit=1000)
 
         if verbose:
             print(f"Found {len(redeems)} REDEEM events from Polymarket")
 
-        # Build lookup by conditionId from TRADE events (conditionId -> asset/token_id)
-        condition_to_asset = {}
-        for t in trades_api:
-            cond_id = t.get("conditionId", "")
-            asset = t.get("asset", "")
-            if cond_id and asset:
-                condition_to_asset[cond_id] = asset
-
-        # Build lookup by title (normalized) and by conditionId
-        redeem_by_title = {}
-        redeem_by_condition = {}
+        # Build lookup from TRADE events (asset/token_id -> conditionId)
+        asset_to_condition = {
+            t["asset"]: t["conditionId"]
+            for t in trades_api
+            if t.get("asset") and t.get("conditionId")
+        }
+
+        # Build lookup by title (normalized), by 40-char title prefix and by conditionId
+        redeem_by_title = defaultdict(list)
+        redeem_by_prefix = defaultdict(list)
+        redeem_by_condition = defaultdict(list)
         for r in redeems:
             title = (r.get("title") or "").strip().lower()
             cond_id = r.get("conditionId", "")
             if title:
-                if title not in redeem_by_title:
-                    redeem_by_title[title] = []
                 redeem_by_title[title].append(r)
+                redeem_by_prefix[title[:40]].append(r)
             if cond_id:
-                if cond_id not in redeem_by_condition:
-                    redeem_by_condition[cond_id] = []
                 redeem_by_condition[cond_id].append(r)
 
         # Connect to database
@@ -126,119 +202,88 @@ class OutcomeSync:
             print(f"Database not found at {self.db_path}")
             return {"error": "database_not_found"}
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # The update loop below runs in one explicit transaction, so the whole
+        # sync pays for a single commit; leaving the block on an error rolls it back
+        with self._get_conn() as conn:
+            cursor = conn.cursor()
+            self._ensure_schema(cursor)
+
+            cursor.execute("BEGIN IMMEDIATE")
+
+            matched = 0
+            pending_count = 0
+            wins = 0
+            losses = 0
+            total_pnl = 0.0
+            resolved_at = datetime.now().isoformat()
+            updates = []  # (outcome, was_correct, pnl, resolved_at, trade_id)
+
+            title_choices = list(redeem_by_title)
+            title_matches = {}  # question -> matched REDEEM event (or None)
+
+            # Stream trades without recorded outcomes straight off the cursor
+            cursor.execute(self._select_pending_sql)
+            for trade_id, token_id, question, size, entry_price, market_type in cursor:
+                pending_count += 1
+                redeem = None
+
+                # Strategy 1: Match by token_id -> conditionId -> REDEEM
+                if token_id:
+                    cond_id = asset_to_condition.get(token_id)
+                    if cond_id and cond_id in redeem_by_condition:
+                        redeem = redeem_by_condition[cond_id][0]
 
-        # Check if required columns exist, add if missing
-        try:
-            cursor.execute("SELECT resolved_at FROM predictions LIMIT 1")
-        except sqlite3.OperationalError:
-            cursor.execute("ALTER TABLE predictions ADD COLUMN resolved_at TEXT")
-            print("Added resolved_at column")
+                # Strategy 2: Match by title (fallback). A market usually has several
+                # prediction rows, so each distinct question is normalized and matched once
+                if not redeem and question:
+                    if question not in title_matches:
+                        title_matches[question] = self._match_by_title(
+                            question.strip().lower(), redeem_by_title, redeem_by_prefix, title_choices
+                        )
+                    redeem = title_matches[question]
 
-        # Check which columns exist (schema varies between versions)
-        cursor.execute("PRAGMA table_info(predictions)")
-        columns = {row[1] for row in cursor.fetchall()}
+                if redeem:
+                    usdc_payout = float(redeem.get("usdcSize", 0))
 
-        size_col = "trade_size_usdc" if "trade_size_usdc" in columns else "position_size"
-        price_col = "trade_price" if "trade_price" in columns else "entry_price"
+                    # P&L calculation:
+                    # cost = trade_size_usdc (the USDC spent to buy shares)
+                    # If WIN: pnl = payout - cost
+                    # If LOSS: pnl = -cost (lost entire stake)
+                    cost = float(size or 0)
 
-        # Handle case where neither size/price column exists
-        if size_col not in columns:
-            size_col = "1.0"  # Default size
-        if price_col not in columns:
-            price_col = "0.5"  # Default price
+                    if usdc_payout > 0:
+                        outcome = "YES"  # Won the position
+                        was_correct = 1
+                        pnl = usdc_payout - cost
+                        wins += 1
+                    else:
+                        outcome = "NO"  # Lost the position
+                        was_correct = 0
+                        pnl = -cost
+                        losses += 1
 
-        # Get trades without recorded outcomes
-        cursor.execute(f'''
-            SELECT id, token_id, question,
-                   {size_col} as size,
-                   {price_col} as price,
-                   market_type
-            FROM predictions
-            WHERE trade_executed = 1
-            AND (actual_outcome IS NULL OR profit_loss_usdc IS NULL)
-        ''')
-        pending = cursor.fetchall()
+                    total_pnl += pnl
 
-        if verbose:
-            print(f"Found {len(pending)} trades without recorded outcomes")
+                    updates.append((outcome, was_correct, pnl, resolved_at, trade_id))
 
-        matched = 0
-        wins = 0
-        losses = 0
-        total_pnl = 0.0
+                    matched += 1
 
-        for trade_id, token_id, question, size, entry_price, market_type in pending:
-            redeem = None
+                    if verbose:
+                        result = "WIN" if was_correct else "LOSS"
+                        q_short = (question or "Unknown")[:50]
+                        print(f"   {result}: {q_short}... P&L: ${pnl:.2f}")
 
-            # Strategy 1: Match by token_id -> conditionId -> REDEEM
-            if token_id:
-                for cond_id, asset in condition_to_asset.items():
-                    if asset == token_id and cond_id in redeem_by_condition:
-                        redeem = redeem_by_condition[cond_id][0]
-                        break
-
-            # Strategy 2: Match by title (fallback)
-            if not redeem and question:
-                title_normalized = question.strip().lower()
-                # Try exact match
-                if title_normalized in redeem_by_title:
-                    redeem = redeem_by_title[title_normalized][0]
-                else:
-                    # Try partial match (first 40 chars)
-                    title_prefix = title_normalized[:40]
-                    for t, r_list in redeem_by_title.items():
-                        if t.startswith(title_prefix) or title_prefix in t:
-                            redeem = r_list[0]
-                            break
-
-            if redeem:
-                usdc_payout = float(redeem.get("usdcSize", 0))
-
-                # P&L calculation:
-                # cost = trade_size_usdc (the USDC spent to buy shares)
-                # If WIN: pnl = payout - cost
-                # If LOSS: pnl = -cost (lost entire stake)
-                cost = float(size or 0)
-
-                if usdc_payout > 0:
-                    outcome = "YES"  # Won the position
-                    was_correct = 1
-                    pnl = usdc_payout - cost
-                    wins += 1
-                else:
-                    outcome = "NO"  # Lost the position
-                    was_correct = 0
-                    pnl = -cost
-                    losses += 1
-
-                total_pnl += pnl
-
-                # Update database - use profit_loss_usdc column
-                cursor.execute('''
-                    UPDATE predictions
-                    SET actual_outcome = ?,
-                        was_correct = ?,
-                        profit_loss_usdc = ?,
-                        position_open = 0,
-                        resolved_at = ?
-                    WHERE id = ?
-                ''', (outcome, was_correct, pnl, datetime.now().isoformat(), trade_id))
-
-                matched += 1
-
-                if verbose:
-                    result = "WIN" if was_correct else "LOSS"
-                    q_short = (question or "Unknown")[:50]
-                    print(f"   {result}: {q_short}... P&L: ${pnl:.2f}")
-
-        conn.commit()
-        conn.close()
+            if verbose:
+                print(f"Found {pending_count} trades without recorded outcomes")
+
+            # Update database - use profit_loss_usdc column
+            cursor.executemany(self._SQL_RECORD_OUTCOME, updates)
+
+            cursor.execute("COMMIT")
 
         result = {
             "redeem_events": len(redeems),
-            "pending_trades": len(pending),
+            "pending_trades": pending_count,
             "matched": matched,
             "wins": wins,
             "losses": losses,
@@ -251,6 +296,96 @@ class OutcomeSync:
 
         return result
 
+    def _ensure_schema(self, cursor: sqlite3.Cursor):
+        """
+        Inspect and prepare the predictions table (once per instance).
+
+        Adds resolved_at if missing, creates the sync indexes, and builds the
+        pending-trades query for whichever size/price columns this schema has.
+        """
+        if self._schema_ready:
+            return
+
+        # Check which columns exist (schema varies between versions)
+        cursor.execute("PRAGMA table_info(predictions)")
+        columns = {row[1] for row in cursor.fetchall()}
+
+        # Check if required columns exist, add if missing
+        if "resolved_at" not in columns:
+            cursor.execute("ALTER TABLE predictions ADD COLUMN resolved_at TEXT")
+            print("Added resolved_at column")
+
+        size_col = "trade_size_usdc" if "trade_size_usdc" in columns else "position_size"
+        price_col = "trade_price" if "trade_price" in columns else "entry_price"
+
+        # Handle case where neither size/price column exists
+        if size_col not in columns:
+            size_col = "1.0"  # Default size
+        if price_col not in columns:
+            price_col = "0.5"  # Default price
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_pred_pending
+            ON predictions(trade_executed, actual_outcome, profit_loss_usdc)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_pred_mtype
+            ON predictions(market_type) WHERE actual_outcome IS NOT NULL
+        ''')
+
+        # Pending = no outcome yet, or an outcome without P&L. The OR is split
+        # into disjoint UNION ALL arms so each one can seek idx_pred_pending
+        select_cols = f'''
+            SELECT id, token_id, question,
+                   {size_col} as size,
+                   {price_col} as price,
+                   market_type
+            FROM predictions
+        '''
+        self._select_pending_sql = f'''
+            {select_cols}
+            WHERE trade_executed = 1 AND actual_outcome IS NULL
+            UNION ALL
+            {select_cols}
+            WHERE trade_executed = 1 AND actual_outcome IS NOT NULL
+            AND profit_loss_usdc IS NULL
+        '''
+        self._schema_ready = True
+
+    @staticmethod
+    def _match_by_title(
+        title_normalized: str,
+        redeem_by_title: Dict[str, List[Dict]],
+        redeem_by_prefix: Dict[str, List[Dict]],
+        title_choices: List[str]
+    ) -> Optional[Dict]:
+        """Find the REDEEM event for a normalized question title, if any."""
+        # Try exact match
+        if title_normalized in redeem_by_title:
+            return redeem_by_title[title_normalized][0]
+
+        # Try partial match (first 40 chars): same-prefix bucket first,
+        # scanning for the prefix inside other titles only if it's empty
+        title_prefix = title_normalized[:40]
+        if title_prefix in redeem_by_prefix:
+            return redeem_by_prefix[title_prefix][0]
+
+        if process is None:
+            # Nothing to rank with: the first title containing the prefix wins
+            first = next((t for t in title_choices if title_prefix in t), None)
+            return redeem_by_title[first][0] if first is not None else None
+
+        candidates = [t for t in title_choices if title_prefix in t]
+        if len(candidates) > 1:
+            # Closest title wins. Fuzzy scores only rank titles that
+            # contain the prefix: on their own they can't tell apart
+            # markets differing by a date or hour ("3pm" vs "4pm")
+            best = process.extractOne(title_normalized, candidates, scorer=fuzz.ratio)[0]
+            return redeem_by_title[best][0]
+        if candidates:
+            return redeem_by_title[candidates[0]][0]
+        return None
+
     def get_pnl_by_market_type(self) -> Dict[str, Dict]:
         """
         Calculate P&L statistics by market type from recorded outcomes.
@@ -260,25 +395,28 @@ class OutcomeSync:
         if not os.path.exists(self.db_path):
             return {}
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute('''
-            SELECT market_type,
-                   COUNT(*) as trades,
-                   SUM(CASE WHEN actual_outcome = 1 THEN 1 ELSE 0 END) as wins,
-                   SUM(CASE WHEN actual_outcome = 0 THEN 1 ELSE 0 END) as losses,
-                   SUM(pnl) as total_pnl,
-                   AVG(pnl) as avg_pnl
-            FROM predictions
-            WHERE trade_executed = 1
-            AND actual_outcome IS NOT NULL
-            AND pnl IS NOT NULL
-            GROUP BY market_type
-        ''')
+        with self._get_conn() as conn:
+            cursor = conn.cursor()
+            self._ensure_schema(cursor)
+
+            cursor.execute('''
+                SELECT market_type,
+                       COUNT(*) as trades,
+                       SUM(CASE WHEN was_correct = 1 THEN 1 ELSE 0 END) as wins,
+                       SUM(CASE WHEN was_correct = 0 THEN 1 ELSE 0 END) as losses,
+                       SUM(profit_loss_usdc) as total_pnl,
+                       AVG(profit_loss_usdc) as avg_pnl
+                FROM predictions
+                WHERE trade_executed = 1
+                AND actual_outcome IS NOT NULL
+                AND profit_loss_usdc IS NOT NULL
+                GROUP BY market_type
+            ''')
+
+            rows = cursor.fetchall()
 
         results = {}
-        for row in cursor.fetchall():
+        for row in rows:
             market_type, trades, wins, losses, total_pnl, avg_pnl = row
             results[market_type or "unknown"] = {
                 "trades": trades,
@@ -290,7 +428,6 @@ class OutcomeSync:
                 "has_edge": (avg_pnl or 0) > 0
             }
 
-        conn.close()
         return results
 
     def calculate_historical_pnl(self) -> Dict[str, Any]:
@@ -299,16 +436,13 @@ class OutcomeSync:
 
         This uses raw Polymarket data, not the database.
         """
-        redeems = self.get_redeem_events(limit=1000)
-        trades = self.get_trade_events(limit=1000)
+        redeems, trades = self.get_redeem_and_trade_events(limit=1000)
 
         # Build trade lookup by asset
-        trade_by_asset = {}
+        trade_by_asset = defaultdict(list)
         for t in trades:
             asset_id = t.get("assetId", "")
             if asset_id and t.get("side") == "BUY":
-                if asset_id not in trade_by_asset:
-                    trade_by_asset[asset_id] = []
                 trade_by_asset[asset_id].append(t)
 
         # Match redeems to trades
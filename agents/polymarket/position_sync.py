@@ -9,7 +9,11 @@ Data API Base URL: https://data-api.polymarket.com/
 
 import os
 import sqlite3
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Optional, Any
 from dotenv import load_dotenv
@@ -22,6 +26,9 @@ class PositionSync:
 
     DATA_API_BASE = "https://data-api.polymarket.com"
 
+    # Params: (id,)
+    _SQL_CLOSE_POSITION = "UPDATE predictions SET position_open = 0 WHERE id = ?"
+
     def __init__(self, db_path: str = None):
         # Use persistent storage by default
         if db_path is None:
@@ -33,6 +40,48 @@ class PositionSync:
         self.proxy_address = os.getenv("POLYMARKET_PROXY_ADDRESS")
         if not self.proxy_address:
             raise ValueError("POLYMARKET_PROXY_ADDRESS not set in environment")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._indexes_ready = False
+
+        # One keep-alive connection pool for every Data API call, retrying
+        # rate limits and transient server errors with backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+        )
+        self.session.mount("https://", adapter)
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """
+        Shared database connection, opened on first use.
+
+        Autocommit mode (writers manage their own BEGIN/COMMIT), with the
+        PRAGMAs applied once. Use as `with self._get_conn() as conn:` so an
+        error inside an explicit transaction rolls it back.
+        """
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-20000")
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        """Close the HTTP session and database connection."""
+        self.session.close()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def get_actual_positions(self, size_threshold: float = 0.1) -> List[Dict]:
         """
@@ -49,9 +98,9 @@ class PositionSync:
         }
 
         try:
-            resp = requests.get(url, params=params, timeout=30)
+            resp = self.session.get(url, params=params, timeout=30)
             resp.raise_for_status()
-            return resp.json()
+            return orjson.loads(resp.content)
         except Exception as e:
             print(f"Error fetching positions: {e}")
             return []
@@ -71,9 +120,9 @@ class PositionSync:
         }
 
         try:
-            resp = requests.get(url, params=params, timeout=30)
+            resp = self.session.get(url, params=params, timeout=30)
             resp.raise_for_status()
-            return resp.json()
+            return orjson.loads(resp.content)
         except Exception as e:
             print(f"Error fetching trades: {e}")
             return []
@@ -95,9 +144,9 @@ class PositionSync:
             params["type"] = activity_type
 
         try:
-            resp = requests.get(url, params=params, timeout=30)
+            resp = self.session.get(url, params=params, timeout=30)
             resp.raise_for_status()
-            return resp.json()
+            return orjson.loads(resp.content)
         except Exception as e:
             print(f"Error fetching activity: {e}")
             return []
@@ -112,92 +161,104 @@ class PositionSync:
         params = {"user": self.proxy_address}
 
         try:
-            resp = requests.get(url, params=params, timeout=30)
+            resp = self.session.get(url, params=params, timeout=30)
             resp.raise_for_status()
-            data = resp.json()
+            data = orjson.loads(resp.content)
             return float(data.get("value", 0))
         except Exception as e:
             print(f"Error fetching portfolio value: {e}")
             return 0.0
 
-    def reconcile_positions(self, verbose: bool = True) -> Dict[str, Any]:
+    def reconcile_positions(self, verbose: bool = True, positions: Optional[List[Dict]] = None) -> Dict[str, Any]:
         """
         Sync local database with actual on-chain positions.
 
         Uses token_id matching for accuracy (not fragile string matching).
+        Pass `positions` (from get_actual_positions) to reuse an earlier fetch.
         Returns stats about what was changed.
         """
         # Get actual positions from API
-        actual_positions = self.get_actual_positions()
+        actual_positions = positions if positions is not None else self.get_actual_positions()
 
         # Build set of actual asset IDs (token IDs) for reliable matching
         actual_asset_ids = set()
-        actual_titles = {}  # For fallback matching
+        actual_titles = set()  # For fallback matching
         for p in actual_positions:
             asset_id = p.get("asset", "") or p.get("assetId", "")
             if asset_id:
                 actual_asset_ids.add(asset_id)
             title = p.get("title", "")[:50]
             if title:
-                actual_titles[title] = True
+                actual_titles.add(title)
 
         if verbose:
             print(f"📊 Actual positions from Polymarket API: {len(actual_positions)}")
             for p in actual_positions:
                 print(f"   ✓ {p.get('title', 'Unknown')[:55]}... | {p.get('outcome')} | ${p.get('currentValue', 0):.2f}")
 
-        # Connect to database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Get all DB positions marked as open (include token_id for matching)
-        cursor.execute('''
-            SELECT id, token_id, question FROM predictions
-            WHERE trade_executed = 1 AND position_open = 1
-        ''')
-        db_positions = cursor.fetchall()
-
-        if verbose:
-            print(f"\n📂 DB positions marked open: {len(db_positions)}")
-
-        # Close positions that don't exist on-chain
-        closed_count = 0
-        kept_count = 0
+        # Connect to database (the close loop runs in one transaction,
+        # rolled back if the block raises)
+        with self._get_conn() as conn:
+            cursor = conn.cursor()
 
-        for row in db_positions:
-            pid = row[0]
-            token_id = row[1] if len(row) > 1 else None
-            question = row[2] if len(row) > 2 else (row[1] if len(row) > 1 else "")
+            if not self._indexes_ready:
+                # Open positions are a small slice of executed trades
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_pred_open
+                    ON predictions(trade_executed, position_open) WHERE trade_executed = 1
+                ''')
+                self._indexes_ready = True
 
-            # Primary: Match by token_id (reliable)
-            if token_id and token_id in actual_asset_ids:
-                kept_count += 1
-                continue
+            cursor.execute("BEGIN IMMEDIATE")
 
-            # Fallback: Match by title prefix (less reliable but backwards compatible)
-            q_prefix = (question or "")[:50]
-            if q_prefix and any(q_prefix in title or title in q_prefix for title in actual_titles):
-                kept_count += 1
-                continue
+            # Get all DB positions marked as open (include token_id for matching)
+            cursor.execute('''
+                SELECT id, token_id, question FROM predictions
+                WHERE trade_executed = 1 AND position_open = 1
+            ''')
+            db_positions = cursor.fetchall()
 
-            # Position not found on-chain - mark as closed
+            if verbose:
+                print(f"\n📂 DB positions marked open: {len(db_positions)}")
+
+            # Close positions that don't exist on-chain
+            stale_ids = []
+            kept_count = 0
+
+            for row in db_positions:
+                pid = row[0]
+                token_id = row[1] if len(row) > 1 else None
+                question = row[2] if len(row) > 2 else (row[1] if len(row) > 1 else "")
+
+                # Primary: Match by token_id (reliable)
+                if token_id and token_id in actual_asset_ids:
+                    kept_count += 1
+                    continue
+
+                # Fallback: Match by title prefix (less reliable but backwards compatible).
+                # Identical prefixes are a set lookup; the substring scan covers the rest
+                q_prefix = (question or "")[:50]
+                if q_prefix and (
+                    q_prefix in actual_titles
+                    or any(q_prefix in title or title in q_prefix for title in actual_titles)
+                ):
+                    kept_count += 1
+                    continue
+
+                # Position not found on-chain - mark as closed
+                stale_ids.append((pid,))
+                if verbose:
+                    print(f"   ✗ Closed: {(question or 'Unknown')[:50]}...")
+
+            cursor.executemany(self._SQL_CLOSE_POSITION, stale_ids)
+            closed_count = len(stale_ids)
+            cursor.execute("COMMIT")
+
+            # Get final count
             cursor.execute(
-                'UPDATE predictions SET position_open = 0 WHERE id = ?',
-                (pid,)
+                'SELECT COUNT(*) FROM predictions WHERE trade_executed = 1 AND position_open = 1'
             )
-            closed_count += 1
-            if verbose:
-                print(f"   ✗ Closed: {(question or 'Unknown')[:50]}...")
-
-        conn.commit()
-
-        # Get final count
-        cursor.execute(
-            'SELECT COUNT(*) FROM predictions WHERE trade_executed = 1 AND position_open = 1'
-        )
-        final_open = cursor.fetchone()[0]
-
-        conn.close()
+            final_open = cursor.fetchone()[0]
 
         result = {
             "actual_positions": len(actual_positions),
@@ -216,14 +277,16 @@ class PositionSync:
 
         return result
 
-    def get_open_exposure(self) -> float:
+    def get_open_exposure(self, positions: Optional[List[Dict]] = None) -> float:
         """Get total USD exposure from actual on-chain positions."""
-        positions = self.get_actual_positions()
+        if positions is None:
+            positions = self.get_actual_positions()
         return sum(float(p.get("currentValue", 0)) for p in positions)
 
-    def get_unrealized_pnl(self) -> float:
+    def get_unrealized_pnl(self, positions: Optional[List[Dict]] = None) -> float:
         """Get total unrealized P&L from actual positions."""
-        positions = self.get_actual_positions()
+        if positions is None:
+            positions = self.get_actual_positions()
         return sum(float(p.get("cashPnl", 0)) for p in positions)
 
 
@@ -235,25 +298,24 @@ def test():
     print("POLYMARKET POSITION SYNC TEST")
     print("=" * 60)
 
-    # Get positions
-    positions = sync.get_actual_positions()
-    print(f"\nActual positions: {len(positions)}")
+    # Positions, portfolio value and recent trades are independent requests
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        positions_f = ex.submit(sync.get_actual_positions)
+        value_f = ex.submit(sync.get_portfolio_value)
+        trades_f = ex.submit(sync.get_trade_history, limit=5)
+        positions, value, trades = positions_f.result(), value_f.result(), trades_f.result()
 
-    # Get portfolio value
-    value = sync.get_portfolio_value()
+    print(f"\nActual positions: {len(positions)}")
     print(f"Portfolio value: ${value:.2f}")
-
-    # Get recent trades
-    trades = sync.get_trade_history(limit=5)
     print(f"\nRecent trades: {len(trades)}")
     for t in trades[:3]:
         print(f"  {t.get('side')} {t.get('outcome', 'Unknown')} @ ${t.get('price', 0)}")
 
     # Reconcile
     print("\n" + "=" * 60)
-    result = sync.reconcile_positions()
-    print(f"\nExposure: ${sync.get_open_exposure():.2f}")
-    print(f"Unrealized P&L: ${sync.get_unrealized_pnl():.2f}")
+    result = sync.reconcile_positions(positions=positions)
+    print(f"\nExposure: ${sync.get_open_exposure(positions):.2f}")
+    print(f"Unrealized P&L: ${sync.get_unrealized_pnl(positions):.2f}")
 
 
 if __name__ == "__main__":
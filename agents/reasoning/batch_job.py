@@ -0,0 +1,129 @@
+"""
+Batch Reasoning Job
+
+Runs the reasoning pipeline for many markets through the OpenAI Batch API:
+one JSONL upload, results within the completion window, at half the
+per-token price and outside the account's RPM/TPM limits. Meant for
+backtests and overnight re-scoring, not live trading.
+
+Each line is the fused single-call request (prediction, self-critique and
+decision in one structured reply, on the reasoner's structured_model), so
+every market is independent within the batch. OpenAI only.
+"""
+
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from agents.reasoning.multi_agent import MultiAgentReasoning
+
+
+class BatchReasoningJob:
+    """Submit, poll and collect one Batch API reasoning run."""
+
+    TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+    def __init__(self, reasoner: MultiAgentReasoning, completion_window: str = "24h"):
+        """
+        reasoner must be an OpenAI one (use_xai=False): XAI has no Batch or
+        Files API. Requests go to its structured_model.
+        """
+        if reasoner.use_xai:
+            raise ValueError(
+                "BatchReasoningJob needs an OpenAI reasoner (use_xai=False)"
+            )
+        self.reasoner = reasoner
+        self.client = reasoner.client
+        self.completion_window = completion_window
+        self.batch_id: Optional[str] = None
+        self.status: Optional[str] = None
+        self._output_file_id: Optional[str] = None
+
+    def submit(self, markets: List[Dict], jsonl_path: Optional[str] = None) -> str:
+        """
+        Upload one request per market and start the batch.
+
+        Each market is a dict with a market_id plus question, description,
+        market_data and optional social_data. Returns the batch id.
+        """
+        temporary = jsonl_path is None
+        if temporary:
+            fd, jsonl_path = tempfile.mkstemp(
+                prefix="reasoning_batch_", suffix=".jsonl"
+            )
+            os.close(fd)
+
+        with open(jsonl_path, "w") as f:
+            for m in markets:
+                body = self.reasoner._single_call_request(
+                    m["question"],
+                    m.get("description", ""),
+                    m.get("market_data", {}),
+                    m.get("social_data"),
+                )
+                line = {
+                    "custom_id": str(m["market_id"]),
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": body,
+                }
+                f.write(json.dumps(line, default=str) + "\n")
+
+        try:
+            with open(jsonl_path, "rb") as f:
+                input_file = self.client.files.create(file=f, purpose="batch")
+        finally:
+            if temporary:
+                os.remove(jsonl_path)
+
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.completion_window,
+        )
+        self.batch_id = batch.id
+        self.status = batch.status
+        return batch.id
+
+    def poll(self) -> str:
+        """Refresh and return the batch status."""
+        batch = self.client.batches.retrieve(self.batch_id)
+        self.status = batch.status
+        self._output_file_id = batch.output_file_id
+        return batch.status
+
+    def wait(self, poll_interval: float = 60.0) -> str:
+        """Poll until the batch reaches a terminal status, and return it."""
+        while self.poll() not in self.TERMINAL_STATUSES:
+            time.sleep(poll_interval)
+        return self.status
+
+    def results(self) -> Dict[str, Dict]:
+        """
+        Pipeline results (as from full_reasoning_pipeline) keyed by market_id.
+
+        Markets whose request failed or whose reply doesn't parse are left
+        out; rerun them with reason_single_call.
+        """
+        if self.status != "completed" or not self._output_file_id:
+            raise RuntimeError(
+                f"Batch {self.batch_id} has no results (status: {self.status})"
+            )
+
+        output = self.client.files.content(self._output_file_id).text
+        results = {}
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            try:
+                content = response["body"]["choices"][0]["message"]["content"]
+                results[record["custom_id"]] = self.reasoner._parse_single_call(content)
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                print(f"Skipping batch result for {record.get('custom_id')}: {e}")
+        return results
@@ -10,12 +10,30 @@ Prevents prediction errors through multiple verification steps:
 This makes backwards trades IMPOSSIBLE.
 """
 
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, fields
+import asyncio
+import atexit
+import json
 import os
-from openai import OpenAI
-
-@dataclass
+import random
+import re
+import threading
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from agents.reasoning.rate_limiter import AsyncRateLimiter
+from agents.reasoning.response_cache import get_response_cache
+from agents.strategies.arbitrage import AmbiguousMarketError, ArbitrageDetector
+
+# Optional: aiohttp transport for the async path (the SDK's httpx pool
+# degrades at high concurrency)
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+@dataclass(frozen=True, slots=True)
 class Prediction:
     """Prediction from the first agent"""
     outcome: str  # "Yes" or "No"
@@ -25,7 +43,7 @@ class Prediction:
     supporting_evidence: List[str]
     contradicting_evidence: List[str]
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Critique:
     """Critique from the red team agent"""
     challenges: List[str]
@@ -34,7 +52,7 @@ class Critique:
     recommended_adjustment: float  # adjustment to probability
     red_flags: List[str]
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FinalDecision:
     """Final decision after synthesis"""
     outcome_to_buy: str  # "Yes" or "No" - WHAT TO BUY
@@ -44,6 +62,197 @@ class FinalDecision:
     verification: str  # Explicit check that outcome matches prediction
 
 
+def _object_schema(cls) -> Dict[str, Any]:
+    """Strict JSON schema for one of the flat agent dataclasses above."""
+    json_types = {
+        str: {"type": "string"},
+        float: {"type": "number"},
+        List[str]: {"type": "array", "items": {"type": "string"}},
+    }
+    names = [f.name for f in fields(cls)]
+    return {
+        "type": "object",
+        "properties": {f.name: json_types[f.type] for f in fields(cls)},
+        "required": names,
+        "additionalProperties": False,
+    }
+
+
+# One market's prediction, self-critique and decision
+_REASONING_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "prediction": _object_schema(Prediction),
+        "critique": _object_schema(Critique),
+        "decision": _object_schema(FinalDecision),
+    },
+    "required": ["prediction", "critique", "decision"],
+    "additionalProperties": False,
+}
+
+# Structured output for reason_single_call: all three agents in one reply
+_SINGLE_CALL_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "market_reasoning", "strict": True, "schema": _REASONING_SCHEMA},
+}
+
+# Structured output for reason_batch: one reasoning object per market_id
+_BATCH_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "market_reasoning_batch",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "market_id": {"type": "string"},
+                            **_REASONING_SCHEMA["properties"],
+                        },
+                        "required": ["market_id", *_REASONING_SCHEMA["required"]],
+                        "additionalProperties": False,
+                    },
+                },
+            },
+            "required": ["results"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# Instructions shared by the single-call and batch prompts
+_REASONING_STEPS = """1. prediction: Predict which outcome will happen (outcome "YES" or "NO"),
+   with probability and confidence (0.0 to 1.0), reasoning, and the
+   evidence for and against.
+2. critique: Red team your own prediction ruthlessly. What could make it
+   wrong? Is the confidence justified ("too high", "appropriate" or
+   "too low")? Alternative hypotheses, a recommended probability
+   adjustment (e.g. -0.05), and red flags.
+3. decision: The outcome to BUY ("YES" or "NO") after weighing the
+   critique, with final probability, confidence and reasoning.
+
+CRITICAL VERIFICATION:
+- If you think YES is more likely → BUY YES
+- If you think NO is more likely → BUY NO
+- NEVER buy the LESS likely outcome
+- verification: "I am buying [outcome] because I think it has [probability]% chance of happening, which is more likely than the alternative."
+"""
+
+
+# "FIELD: value" lines in the agents' formatted replies. The value is the
+# rest of that line only, as the prompts ask for.
+_FIELD_RE = re.compile(
+    r"^(PREDICTION|PROBABILITY|CONFIDENCE|REASONING|SUPPORTING|CONTRADICTING|BUY"
+    r"|CHALLENGES|ALTERNATIVES|ADJUSTMENT|RED_FLAGS|VERIFICATION):(.*)$",
+    re.MULTILINE
+)
+
+
+def _first_word(text: str) -> str:
+    """First word of a reply value, lowercased, without list markers or punctuation."""
+    words = text.strip(" -*.[]").split(maxsplit=1)
+    return words[0].strip(",.;:!*[]").lower() if words else ""
+
+
+# Predictor fields the critic's prompt uses; critique can start once these
+# lines have streamed in
+_CRITIQUE_INPUT_FIELDS = ("PREDICTION", "PROBABILITY", "CONFIDENCE", "REASONING")
+
+
+# API clients shared by every MultiAgentReasoning in the process, so
+# concurrent pipelines reuse warm keep-alive connections
+_CLIENT_LIMITS = httpx.Limits(max_keepalive_connections=200, max_connections=500)
+_CLIENT_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+_CLIENT_CACHE: Dict[Tuple[Optional[str], Optional[str], int], OpenAI] = {}
+# Async clients are also keyed by event loop: httpx's pooled connections
+# belong to the loop that opened them, and each asyncio.run() is a new loop
+_ASYNC_CLIENT_CACHE: Dict[Tuple[Optional[str], Optional[str], int, asyncio.AbstractEventLoop], AsyncOpenAI] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+
+def _get_client(api_key: Optional[str], base_url: Optional[str] = None) -> OpenAI:
+    """
+    Shared sync client for this key, endpoint and process.
+
+    Safe to use from several threads; do not close it, it is closed at
+    interpreter exit.
+    """
+    key = (api_key, base_url, os.getpid())
+    client = _CLIENT_CACHE.get(key)
+    if client is None:
+        with _CLIENT_CACHE_LOCK:
+            client = _CLIENT_CACHE.get(key)
+            if client is None:
+                client = _CLIENT_CACHE[key] = OpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    http_client=httpx.Client(limits=_CLIENT_LIMITS, timeout=_CLIENT_TIMEOUT)
+                )
+    return client
+
+
+def _get_async_client(api_key: Optional[str], base_url: Optional[str] = None) -> AsyncOpenAI:
+    """
+    Shared async client for this key, endpoint, process and running event loop.
+
+    Must be called from inside the loop. Clients left behind by loops that
+    have since closed are dropped when the next one is created.
+    """
+    key = (api_key, base_url, os.getpid(), asyncio.get_running_loop())
+    client = _ASYNC_CLIENT_CACHE.get(key)
+    if client is None or client.is_closed():
+        with _CLIENT_CACHE_LOCK:
+            client = _ASYNC_CLIENT_CACHE.get(key)
+            if client is None or client.is_closed():
+                for stale in [k for k in _ASYNC_CLIENT_CACHE if k[3].is_closed()]:
+                    del _ASYNC_CLIENT_CACHE[stale]
+                client = _ASYNC_CLIENT_CACHE[key] = AsyncOpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    http_client=httpx.AsyncClient(limits=_CLIENT_LIMITS, timeout=_CLIENT_TIMEOUT)
+                )
+    return client
+
+
+# One rate limiter per account (same key as _CLIENT_CACHE): RPM/TPM limits are
+# per API key, so every pipeline using the key must draw from one budget
+_RATE_LIMITERS: Dict[Tuple[Optional[str], Optional[str], int], AsyncRateLimiter] = {}
+
+
+def _get_rate_limiter(
+    api_key: Optional[str],
+    base_url: Optional[str],
+    requests_per_minute: int,
+    tokens_per_minute: int
+) -> AsyncRateLimiter:
+    """
+    Shared rate limiter for this key, endpoint and process.
+
+    The limits given by the first caller for a key are the ones used.
+    """
+    key = (api_key, base_url, os.getpid())
+    limiter = _RATE_LIMITERS.get(key)
+    if limiter is None:
+        with _CLIENT_CACHE_LOCK:
+            limiter = _RATE_LIMITERS.get(key)
+            if limiter is None:
+                limiter = _RATE_LIMITERS[key] = AsyncRateLimiter(requests_per_minute, tokens_per_minute)
+    return limiter
+
+
+@atexit.register
+def _close_cached_clients():
+    # Async clients can only be closed on their own loop (see aclose())
+    pid = os.getpid()
+    for (_, _, owner), client in list(_CLIENT_CACHE.items()):
+        if owner == pid:
+            client.close()
+
+
 class MultiAgentReasoning:
     """
     Multi-agent reasoning system that prevents errors through verification.
@@ -55,15 +264,60 @@ class MultiAgentReasoning:
     4. Verification catches errors
     """
 
-    def __init__(self, openai_api_key: Optional[str] = None, use_xai: bool = True):
+    # Async calls retry 429s this many times, backing off exponentially from
+    # RETRY_BASE_DELAY seconds (plus jitter)
+    MAX_RETRIES = 5
+    RETRY_BASE_DELAY = 1.0
+
+    def __init__(
+        self,
+        openai_api_key: Optional[str] = None,
+        use_xai: bool = True,
+        single_call: bool = False,
+        cache_ttl: int = 300,
+        critic_model: Optional[str] = None,
+        structured_model: Optional[str] = None,
+        max_concurrent_requests: int = 16,
+        requests_per_minute: int = 500,
+        tokens_per_minute: int = 200_000,
+        arbitrage_detector: Optional[ArbitrageDetector] = None
+    ):
         """
         Initialize multi-agent reasoning with XAI (Grok) or OpenAI.
 
         Args:
             openai_api_key: API key (optional, reads from env)
             use_xai: If True, use XAI/Grok (default). If False, use OpenAI.
+            single_call: If True, full_reasoning_pipeline runs all three agents
+                in one structured-output call (reason_single_call) on
+                structured_model.
+            cache_ttl: Seconds an identical request is answered from the
+                on-disk response cache (0 disables caching). The cache is
+                shared by every instance with the same TTL.
+            max_concurrent_requests: Cap on in-flight async API calls.
+            critic_model: Model for the first critique pass (default: env
+                CRITIC_MODEL, else the provider's small model). Critiques with
+                red flags or a confidence concern are redone on the main model.
+            structured_model: Model for the JSON-schema calls (reason_single_call,
+                reason_batch, BatchReasoningJob). Default: env STRUCTURED_MODEL,
+                else grok-4-1-fast-reasoning on XAI and gpt-4o on OpenAI (gpt-4
+                has no structured outputs).
+            requests_per_minute / tokens_per_minute: Account limits the async
+                calls are paced to. The budget is shared by every instance
+                using the same API key; the first one's limits apply.
+            arbitrage_detector: If set, the pipelines first check the market
+                prices for risk-free arbitrage and skip the LLM calls when
+                there is one (see fast_path).
         """
         self.use_xai = use_xai
+        self.single_call = single_call
+        self.cache = get_response_cache(ttl_seconds=cache_ttl) if cache_ttl > 0 else None
+        self._http = None  # aiohttp session, created on first async call
+        self._http_loop = None
+        self.max_concurrent_requests = max_concurrent_requests
+        self._slots = None  # semaphore for the current event loop
+        self._slots_loop = None
+        self.arbitrage_detector = arbitrage_detector
 
         if use_xai:
             # Use XAI (Grok-4) - OpenAI-compatible API
@@ -71,21 +325,42 @@ class MultiAgentReasoning:
             if not api_key:
                 raise ValueError("XAI_API_KEY not found in environment")
 
-            self.client = OpenAI(
-                api_key=api_key,
-                base_url="https://api.x.ai/v1"
+            self._client_base_url = "https://api.x.ai/v1"
+            self.client = _get_client(api_key, self._client_base_url)
+            self.rate_limiter = _get_rate_limiter(
+                api_key, "https://api.x.ai/v1", requests_per_minute, tokens_per_minute
             )
+            self.base_url = "https://api.x.ai/v1"
+            self._api_key = api_key
             self.model = "grok-4-1-fast-reasoning"  # XAI's reasoning model
+            default_critic = "grok-3-mini"
+            default_structured = self.model
             self.provider = "XAI (Grok-4.1-Fast-Reasoning)"
         else:
             # Use OpenAI
             if openai_api_key is None:
                 openai_api_key = os.getenv("OPENAI_API_KEY")
 
-            self.client = OpenAI(api_key=openai_api_key)
+            self._client_base_url = None
+            self.client = _get_client(openai_api_key)
+            self.rate_limiter = _get_rate_limiter(
+                openai_api_key, None, requests_per_minute, tokens_per_minute
+            )
+            self.base_url = "https://api.openai.com/v1"
+            self._api_key = openai_api_key
             self.model = "gpt-4"
+            default_critic = "gpt-4o-mini"
+            default_structured = "gpt-4o"
             self.provider = "OpenAI"
 
+        self.critic_model = critic_model or os.getenv("CRITIC_MODEL", default_critic)
+        self.structured_model = structured_model or os.getenv("STRUCTURED_MODEL", default_structured)
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """Shared async client for the running event loop (use inside async code)."""
+        return _get_async_client(self._api_key, self._client_base_url)
+
     def health_check(self) -> Tuple[bool, str]:
         """
         Test API access before trading.
@@ -178,6 +453,105 @@ class MultiAgentReasoning:
                     f"Status: {error_status}, Code: {error_code_body}\n"
                     f"Message: {error_message}")
 
+    def _complete(self, request: Dict[str, Any]) -> str:
+        """Run one chat completion (or reuse a cached reply) and return the message text."""
+        if self.cache is not None:
+            cached = self.cache.get(request)
+            if cached is not None:
+                return cached
+
+        response = self.client.chat.completions.create(**request)
+        content = response.choices[0].message.content
+
+        if self.cache is not None and content:
+            self.cache.set(request, content)
+        return content
+
+    async def _complete_async(self, request: Dict[str, Any]) -> str:
+        """Async twin of _complete: aiohttp when installed, else AsyncOpenAI."""
+        if self.cache is not None:
+            cached = self.cache.get(request)
+            if cached is not None:
+                return cached
+
+        async def send() -> str:
+            if aiohttp is not None:
+                return await self._raw_chat(request)
+            response = await self.async_client.chat.completions.create(**request)
+            return response.choices[0].message.content
+
+        async with self._request_slots():
+            content = await self._call_with_retries(send, request)
+
+        if self.cache is not None and content:
+            self.cache.set(request, content)
+        return content
+
+    def _request_slots(self) -> asyncio.Semaphore:
+        """Semaphore capping in-flight async calls (one per event loop)."""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.max_concurrent_requests)
+            self._slots_loop = loop
+        return self._slots
+
+    async def _call_with_retries(self, send, request: Dict[str, Any]):
+        """
+        Await send() once the rate limiter has budget for the request,
+        retrying rate-limit (429) errors with exponential backoff and jitter.
+        """
+        # ~4 characters per prompt token, plus the reply budget
+        tokens = sum(len(m["content"]) for m in request["messages"]) // 4 + request.get("max_tokens", 0)
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            await self.rate_limiter.acquire(tokens)
+            try:
+                return await send()
+            except Exception as e:
+                # openai.RateLimitError carries status_code, aiohttp errors status
+                status = getattr(e, "status_code", None) or getattr(e, "status", None)
+                if status != 429 or attempt == self.MAX_RETRIES:
+                    raise
+            delay = self.RETRY_BASE_DELAY * 2 ** attempt
+            await asyncio.sleep(delay + random.uniform(0, delay))
+
+    async def _raw_chat(self, request: Dict[str, Any]) -> str:
+        """
+        POST /chat/completions on a pooled aiohttp session and return the
+        message text. Raises aiohttp.ClientResponseError on non-2xx.
+        """
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http.closed or self._http_loop is not loop:
+            # Sessions are bound to the event loop they were created on
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=200, limit_per_host=200),
+                headers={"Authorization": f"Bearer {self._api_key}"},
+                timeout=aiohttp.ClientTimeout(total=600),
+            )
+            self._http_loop = loop
+
+        async with self._http.post(f"{self.base_url}/chat/completions", json=request) as resp:
+            resp.raise_for_status()
+            body = await resp.json()
+        return body["choices"][0]["message"]["content"]
+
+    async def aclose(self):
+        """
+        Close this instance's aiohttp session and the async client shared on
+        this event loop (call before the loop ends). Other instances on the
+        loop get a fresh client on their next call; the sync client is
+        closed at exit.
+        """
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
+
+        key = (self._api_key, self._client_base_url, os.getpid(), asyncio.get_running_loop())
+        with _CLIENT_CACHE_LOCK:
+            client = _ASYNC_CLIENT_CACHE.pop(key, None)
+        if client is not None:
+            await client.close()
+
     def predict(
         self,
         question: str,
@@ -191,7 +565,71 @@ class MultiAgentReasoning:
         This agent analyzes the market and makes a forecast.
         It explicitly states what outcome it thinks will happen.
         """
+        request = self._predict_request(question, description, market_data, social_data)
+        return self._parse_prediction(self._complete(request))
+
+    async def predict_async(
+        self,
+        question: str,
+        description: str,
+        market_data: Dict,
+        social_data: Optional[Dict] = None
+    ) -> Prediction:
+        """Agent 1 on the async client (see predict)."""
+        request = self._predict_request(question, description, market_data, social_data)
+        return self._parse_prediction(await self._complete_async(request))
 
+    async def predict_stream(
+        self,
+        question: str,
+        description: str,
+        market_data: Dict,
+        social_data: Optional[Dict] = None
+    ):
+        """
+        Agent 1 with a streamed reply (async generator).
+
+        Yields a partial Prediction as soon as the fields the critic needs
+        (_CRITIQUE_INPUT_FIELDS) are complete, then the full Prediction once
+        the reply ends. A cached reply yields only the full Prediction.
+        """
+        request = self._predict_request(question, description, market_data, social_data)
+        if self.cache is not None:
+            cached = self.cache.get(request)
+            if cached is not None:
+                yield self._parse_prediction(cached)
+                return
+
+        content = ""
+        partial_sent = False
+        async with self._request_slots():
+            stream = await self._call_with_retries(
+                lambda: self.async_client.chat.completions.create(**request, stream=True),
+                request
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                content += delta
+                if not partial_sent and "\n" in delta:
+                    complete = content[:content.rfind("\n") + 1]
+                    if all(f"\n{field}:" in "\n" + complete for field in _CRITIQUE_INPUT_FIELDS):
+                        partial_sent = True
+                        yield self._parse_prediction(complete)
+
+        if self.cache is not None and content:
+            self.cache.set(request, content)
+        yield self._parse_prediction(content)
+
+    def _predict_request(
+        self,
+        question: str,
+        description: str,
+        market_data: Dict,
+        social_data: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """Chat completion arguments for the predictor agent."""
         prompt = f"""You are a prediction agent analyzing a prediction market.
 
 Market Question: {question}
@@ -227,7 +665,7 @@ SUPPORTING: [evidence for this prediction]
 CONTRADICTING: [evidence against this prediction]
 """
 
-        response = self.client.chat.completions.create(
+        return dict(
             model=self.model,  # Use configured model (grok-beta or gpt-4)
             messages=[
                 {"role": "system", "content": "You are an expert prediction analyst."},
@@ -237,14 +675,15 @@ CONTRADICTING: [evidence against this prediction]
             max_tokens=1000
         )
 
-        content = response.choices[0].message.content
-
+    def _parse_prediction(self, content: str) -> Prediction:
+        """Parse the predictor's formatted reply."""
+        values = self._extract_all(content)
         # Parse response (with robust error handling for micro-markets)
-        outcome = self._extract_field(content, "PREDICTION")
+        outcome = values.get("PREDICTION", "")
 
         # Try to parse probability, default to 0.5 if LLM returns "N/A" or similar
         try:
-            prob_str = self._extract_field(content, "PROBABILITY", "0.5")
+            prob_str = values.get("PROBABILITY", "0.5")
             # Remove brackets, ranges, or other formatting
             prob_str = prob_str.strip("[]").split()[0]  # Take first number if range
             probability = float(prob_str)
@@ -252,15 +691,15 @@ CONTRADICTING: [evidence against this prediction]
             probability = 0.5  # Default to 50% for unpredictable micro-markets
 
         try:
-            conf_str = self._extract_field(content, "CONFIDENCE", "0.5")
+            conf_str = values.get("CONFIDENCE", "0.5")
             conf_str = conf_str.strip("[]").split()[0]
             confidence = float(conf_str)
         except (ValueError, AttributeError, IndexError):
             confidence = 0.5
 
-        reasoning = self._extract_field(content, "REASONING", "")
-        supporting = self._extract_field(content, "SUPPORTING", "").split("\n")
-        contradicting = self._extract_field(content, "CONTRADICTING", "").split("\n")
+        reasoning = values.get("REASONING", "")
+        supporting = values.get("SUPPORTING", "").split("\n")
+        contradicting = values.get("CONTRADICTING", "").split("\n")
 
         return Prediction(
             outcome=outcome.strip().upper(),
@@ -282,7 +721,43 @@ CONTRADICTING: [evidence against this prediction]
         This agent challenges the prediction and looks for errors.
         It acts as a skeptical peer reviewer.
         """
+        critique = self._parse_critique(self._complete(self._critique_request(question, prediction)))
+        if self._needs_escalation(critique):
+            request = self._critique_request(question, prediction, model=self.model)
+            critique = self._parse_critique(self._complete(request))
+        return critique
+
+    async def critique_async(
+        self,
+        question: str,
+        prediction: Prediction
+    ) -> Critique:
+        """Agent 2 on the async client (see critique)."""
+        request = self._critique_request(question, prediction)
+        critique = self._parse_critique(await self._complete_async(request))
+        if self._needs_escalation(critique):
+            request = self._critique_request(question, prediction, model=self.model)
+            critique = self._parse_critique(await self._complete_async(request))
+        return critique
+
+    def _needs_escalation(self, critique: Critique) -> bool:
+        """
+        Whether a critique from the small critic model should be redone on
+        the main model: it raised red flags or questioned the confidence.
+        """
+        if self.critic_model == self.model:
+            return False
+        red_flags = [r for r in critique.red_flags if _first_word(r) not in ("", "none", "n/a")]
+        # Only the verdict counts, not any explanation after it
+        return bool(red_flags) or _first_word(critique.confidence_assessment) not in ("", "appropriate")
 
+    def _critique_request(
+        self,
+        question: str,
+        prediction: Prediction,
+        model: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Chat completion arguments for the critic agent (critic_model unless given)."""
         prompt = f"""You are a critic agent reviewing a prediction. Your job is to find flaws.
 
 Market Question: {question}
@@ -308,18 +783,19 @@ Provide:
 2. Alternative hypotheses (other possible outcomes)
 3. Confidence assessment (is confidence too high/low/appropriate?)
 4. Recommended adjustment to probability
-5. Red flags (major concerns)
+5. Red flags: only concerns serious enough to reverse the trade. Ordinary
+   challenges belong under CHALLENGES; if there are no red flags, write None.
 
-Format:
+Format (CONFIDENCE must be exactly one of: too high, appropriate, too low):
 CHALLENGES: [list problems]
 ALTERNATIVES: [other hypotheses]
 CONFIDENCE: [too high/appropriate/too low]
 ADJUSTMENT: [+/- adjustment to probability]
-RED_FLAGS: [major concerns]
+RED_FLAGS: [None, or the major concerns]
 """
 
-        response = self.client.chat.completions.create(
-            model=self.model,  # Use configured model (grok-beta or gpt-4)
+        return dict(
+            model=model or self.critic_model,
             messages=[
                 {"role": "system", "content": "You are a skeptical critic finding flaws in predictions."},
                 {"role": "user", "content": prompt}
@@ -328,13 +804,14 @@ RED_FLAGS: [major concerns]
             max_tokens=800
         )
 
-        content = response.choices[0].message.content
-
-        challenges = self._extract_field(content, "CHALLENGES", "").split("\n")
-        alternatives = self._extract_field(content, "ALTERNATIVES", "").split("\n")
-        confidence_assessment = self._extract_field(content, "CONFIDENCE", "appropriate")
-        adjustment_str = self._extract_field(content, "ADJUSTMENT", "0")
-        red_flags = self._extract_field(content, "RED_FLAGS", "").split("\n")
+    def _parse_critique(self, content: str) -> Critique:
+        """Parse the critic's formatted reply."""
+        values = self._extract_all(content)
+        challenges = values.get("CHALLENGES", "").split("\n")
+        alternatives = values.get("ALTERNATIVES", "").split("\n")
+        confidence_assessment = values.get("CONFIDENCE", "appropriate")
+        adjustment_str = values.get("ADJUSTMENT", "0")
+        red_flags = values.get("RED_FLAGS", "").split("\n")
 
         # Parse adjustment
         try:
@@ -364,7 +841,26 @@ RED_FLAGS: [major concerns]
         This agent combines prediction and critique to make the final call.
         It includes explicit verification to catch logical errors.
         """
+        request = self._synthesize_request(question, prediction, critique)
+        return self._parse_decision(self._complete(request))
+
+    async def synthesize_async(
+        self,
+        question: str,
+        prediction: Prediction,
+        critique: Critique
+    ) -> FinalDecision:
+        """Agent 3 on the async client (see synthesize)."""
+        request = self._synthesize_request(question, prediction, critique)
+        return self._parse_decision(await self._complete_async(request))
 
+    def _synthesize_request(
+        self,
+        question: str,
+        prediction: Prediction,
+        critique: Critique
+    ) -> Dict[str, Any]:
+        """Chat completion arguments for the synthesis agent."""
         prompt = f"""You are a synthesis agent making a final trading decision.
 
 Market Question: {question}
@@ -403,7 +899,7 @@ REASONING: [synthesis of prediction and critique]
 VERIFICATION: I am buying [outcome] because I think it has [probability]% chance of happening, which is more likely than the alternative.
 """
 
-        response = self.client.chat.completions.create(
+        return dict(
             model=self.model,  # Use configured model (grok-beta or gpt-4)
             messages=[
                 {"role": "system", "content": "You are a careful decision maker who verifies logic."},
@@ -413,13 +909,14 @@ VERIFICATION: I am buying [outcome] because I think it has [probability]% chance
             max_tokens=800
         )
 
-        content = response.choices[0].message.content
-
-        outcome_to_buy = self._extract_field(content, "BUY")
+    def _parse_decision(self, content: str) -> FinalDecision:
+        """Parse the synthesizer's formatted reply."""
+        values = self._extract_all(content)
+        outcome_to_buy = values.get("BUY", "")
 
         # Robust parsing for micro-markets
         try:
-            prob_str = self._extract_field(content, "PROBABILITY", "0.5")
+            prob_str = values.get("PROBABILITY", "0.5")
             # Remove brackets if present
             prob_str = prob_str.strip("[]")
             probability = float(prob_str)
@@ -427,14 +924,14 @@ VERIFICATION: I am buying [outcome] because I think it has [probability]% chance
             probability = 0.5
 
         try:
-            conf_str = self._extract_field(content, "CONFIDENCE", "0.5")
+            conf_str = values.get("CONFIDENCE", "0.5")
             conf_str = conf_str.strip("[]")
             confidence = float(conf_str)
         except (ValueError, AttributeError):
             confidence = 0.5
 
-        reasoning = self._extract_field(content, "REASONING", "")
-        verification = self._extract_field(content, "VERIFICATION", "")
+        reasoning = values.get("REASONING", "")
+        verification = values.get("VERIFICATION", "")
 
         return FinalDecision(
             outcome_to_buy=outcome_to_buy.strip().upper(),
@@ -475,18 +972,80 @@ VERIFICATION: I am buying [outcome] because I think it has [probability]% chance
 
         return True, "Verification passed"
 
+    def fast_path(
+        self,
+        market_id: str,
+        question: str,
+        outcome_prices: Dict[str, float]
+    ) -> Optional[Dict]:
+        """
+        Pipeline result for a market with risk-free arbitrage, without any
+        LLM calls (None if there is none, or no detector is configured).
+
+        The trade is several legs, not one outcome, so "final_outcome_to_buy"
+        is None and the legs are under "arbitrage" for execution; the
+        prediction and decision carry a "YES+NO" style label for display only.
+        """
+        if self.arbitrage_detector is None or len(outcome_prices) < 2:
+            return None
+        try:
+            opportunities = self.arbitrage_detector.scan_market(market_id, question, outcome_prices)
+        except AmbiguousMarketError:
+            return None  # let the agents read the market
+        arb = next((o for o in opportunities if o.risk_level == "risk_free"), None)
+        if arb is None:
+            return None
+
+        outcome = "+".join(trade["outcome"] for trade in arb.trades)
+        evidence = [f"Buying every outcome costs ${arb.total_cost} and pays ${arb.guaranteed_return}"]
+        prediction = Prediction(
+            outcome=outcome,
+            probability=1.0,
+            confidence=1.0,
+            reasoning="risk-free arbitrage",
+            supporting_evidence=evidence,
+            contradicting_evidence=[]
+        )
+        critique = Critique(
+            challenges=[],
+            alternative_hypotheses=[],
+            confidence_assessment="appropriate",
+            recommended_adjustment=0.0,
+            red_flags=[]
+        )
+        decision = FinalDecision(
+            outcome_to_buy=outcome,
+            probability=1.0,
+            confidence=1.0,
+            reasoning="risk-free arbitrage",
+            verification=f"{arb.opportunity_type} arbitrage, {arb.expected_profit_pct:.2f}% guaranteed"
+        )
+        result = self._pipeline_result(prediction, critique, decision)
+        result["final_outcome_to_buy"] = None
+        result["arbitrage"] = arb
+        return result
+
     def full_reasoning_pipeline(
         self,
         question: str,
         description: str,
         market_data: Dict,
-        social_data: Optional[Dict] = None
+        social_data: Optional[Dict] = None,
+        market_id: Optional[str] = None
     ) -> Dict:
         """
         Run full multi-agent reasoning pipeline
 
-        Returns complete analysis with all agent outputs
+        Returns complete analysis with all agent outputs. With an
+        arbitrage_detector, markets whose prices are already risk-free
+        arbitrage return fast_path's result instead.
         """
+        arb_result = self.fast_path(market_id or question, question, market_data.get('prices', {}))
+        if arb_result is not None:
+            return arb_result
+
+        if self.single_call:
+            return self.reason_single_call(question, description, market_data, social_data)
 
         # Step 1: Prediction
         prediction = self.predict(question, description, market_data, social_data)
@@ -497,6 +1056,215 @@ VERIFICATION: I am buying [outcome] because I think it has [probability]% chance
         # Step 3: Synthesis
         decision = self.synthesize(question, prediction, critique)
 
+        return self._pipeline_result(prediction, critique, decision)
+
+    async def full_reasoning_pipeline_async(
+        self,
+        question: str,
+        description: str,
+        market_data: Dict,
+        social_data: Optional[Dict] = None,
+        market_id: Optional[str] = None
+    ) -> Dict:
+        """
+        Async full_reasoning_pipeline. The prediction is streamed and the
+        critic starts as soon as the fields it needs have arrived, overlapping
+        the tail of the prediction. Use scan_many to overlap many markets.
+        """
+        arb_result = self.fast_path(market_id or question, question, market_data.get('prices', {}))
+        if arb_result is not None:
+            return arb_result
+
+        if self.single_call:
+            return await self.reason_single_call_async(question, description, market_data, social_data)
+
+        critique_task = None
+        try:
+            async for prediction in self.predict_stream(question, description, market_data, social_data):
+                if critique_task is None:
+                    critique_task = asyncio.create_task(self.critique_async(question, prediction))
+        except BaseException:
+            if critique_task is not None:
+                critique_task.cancel()
+            raise
+        critique = await critique_task
+        decision = await self.synthesize_async(question, prediction, critique)
+        return self._pipeline_result(prediction, critique, decision)
+
+    def reason_single_call(
+        self,
+        question: str,
+        description: str,
+        market_data: Dict,
+        social_data: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Predict, self-critique and decide in one chat call.
+
+        One round trip and one copy of the market context instead of three.
+        The reply is schema-constrained JSON, and the decision still goes
+        through verify_decision. Returns the same dict as full_reasoning_pipeline.
+        """
+        request = self._single_call_request(question, description, market_data, social_data)
+        return self._parse_single_call(self._complete(request))
+
+    async def reason_single_call_async(
+        self,
+        question: str,
+        description: str,
+        market_data: Dict,
+        social_data: Optional[Dict] = None
+    ) -> Dict:
+        """reason_single_call on the async client."""
+        request = self._single_call_request(question, description, market_data, social_data)
+        return self._parse_single_call(await self._complete_async(request))
+
+    def _single_call_request(
+        self,
+        question: str,
+        description: str,
+        market_data: Dict,
+        social_data: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """Chat completion arguments for the fused predict/critique/decide call."""
+        prompt = f"""Analyze this prediction market in three steps.
+
+Market Question: {question}
+Description: {description}
+
+Market Data:
+- Current Prices: {market_data.get('prices', {})}
+- Volume: {market_data.get('volume', 'Unknown')}
+- Time to Close: {market_data.get('time_to_close_hours', 'Unknown')} hours
+
+{f"Social Data: {social_data}" if social_data else ""}
+
+{_REASONING_STEPS}"""
+
+        return dict(
+            model=self.structured_model,
+            messages=[
+                {"role": "system", "content": "You are an expert prediction analyst who critiques your own forecasts and verifies your logic."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.5,
+            max_tokens=2000,
+            response_format=_SINGLE_CALL_FORMAT
+        )
+
+    def _parse_single_call(self, content: str) -> Dict:
+        """Build the pipeline result from the fused call's JSON reply."""
+        return self._result_from_json(json.loads(content))
+
+    def _result_from_json(self, obj: Dict) -> Dict:
+        """Pipeline result from one {prediction, critique, decision} object."""
+        pred, crit, dec = obj["prediction"], obj["critique"], obj["decision"]
+
+        # Same normalization as the line-format parsers
+        prediction = Prediction(**{**pred, "outcome": pred["outcome"].strip().upper()})
+        critique = Critique(**{**crit, "confidence_assessment": crit["confidence_assessment"].lower()})
+        decision = FinalDecision(**{**dec, "outcome_to_buy": dec["outcome_to_buy"].strip().upper()})
+
+        return self._pipeline_result(prediction, critique, decision)
+
+    def reason_batch(self, markets: List[Dict], batch_size: int = 10) -> List[Dict]:
+        """
+        Reason over many markets with one chat call per batch_size markets.
+
+        Each market is a dict with a market_id plus reason_single_call's
+        arguments (question, description, market_data, optional social_data).
+        Results come back in input order. Markets missing from a batch reply,
+        or whose entry doesn't parse, are retried one at a time.
+        """
+        results = []
+        for start in range(0, len(markets), batch_size):
+            batch = markets[start:start + batch_size]
+            try:
+                by_id = self._parse_batch(self._complete(self._batch_request(batch)))
+            except ValueError as e:
+                print(f"Batch reasoning reply unusable, retrying per market: {e}")
+                by_id = {}
+
+            for market in batch:
+                result = by_id.get(str(market["market_id"]))
+                if result is None:
+                    args = {k: v for k, v in market.items() if k != "market_id"}
+                    result = self.reason_single_call(**args)
+                results.append(result)
+        return results
+
+    def _batch_request(self, markets: List[Dict]) -> Dict[str, Any]:
+        """Chat completion arguments for reasoning over several markets at once."""
+        payload = [
+            {
+                "market_id": str(m["market_id"]),
+                "question": m["question"],
+                "description": m.get("description", ""),
+                "prices": m.get("market_data", {}).get("prices", {}),
+                "volume": m.get("market_data", {}).get("volume", "Unknown"),
+                "time_to_close_hours": m.get("market_data", {}).get("time_to_close_hours", "Unknown"),
+                **({"social_data": m["social_data"]} if m.get("social_data") else {}),
+            }
+            for m in markets
+        ]
+
+        prompt = f"""Analyze each of these prediction markets independently, in three steps.
+
+Markets:
+{json.dumps({"markets": payload}, default=str)}
+
+For each market:
+{_REASONING_STEPS}
+Return JSON with one object per input market_id in "results", each carrying its market_id.
+"""
+
+        return dict(
+            model=self.structured_model,
+            messages=[
+                {"role": "system", "content": "You are an expert prediction analyst who critiques your own forecasts and verifies your logic."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.5,
+            # gpt-4o caps output at 16k tokens; a full 10-market batch would ask for 20k
+            max_tokens=min(2000 * len(markets), 16_000),
+            response_format=_BATCH_FORMAT
+        )
+
+    def _parse_batch(self, content: str) -> Dict[str, Dict]:
+        """Pipeline results keyed by market_id; malformed entries are skipped."""
+        by_id = {}
+        for obj in json.loads(content)["results"]:
+            try:
+                by_id[str(obj["market_id"])] = self._result_from_json(obj)
+            except (KeyError, TypeError, AttributeError):
+                continue
+        return by_id
+
+    async def scan_many(self, markets: List[Dict], max_concurrency: int = 8) -> List[Any]:
+        """
+        Run the pipeline over many markets concurrently.
+
+        Each market is a dict of full_reasoning_pipeline keyword arguments
+        (question, description, market_data, optional social_data and
+        market_id). Results come back in input order; a market whose
+        pipeline raised gets the exception object in its slot instead of a
+        result dict.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(market: Dict) -> Dict:
+            async with semaphore:
+                return await self.full_reasoning_pipeline_async(**market)
+
+        return await asyncio.gather(*(run(m) for m in markets), return_exceptions=True)
+
+    def _pipeline_result(
+        self,
+        prediction: Prediction,
+        critique: Critique,
+        decision: FinalDecision
+    ) -> Dict:
+        """Verify the decision and assemble the pipeline result dict."""
         # Step 4: Verification
         is_valid, verification_message = self.verify_decision(decision, prediction)
 
@@ -513,10 +1281,9 @@ VERIFICATION: I am buying [outcome] because I think it has [probability]% chance
             "final_confidence": decision.confidence if is_valid else None
         }
 
-    def _extract_field(self, content: str, field: str, default: str = "") -> str:
-        """Extract field from formatted response"""
-        lines = content.split("\n")
-        for line in lines:
-            if line.startswith(f"{field}:"):
-                return line.split(":", 1)[1].strip()
-        return default
+    def _extract_all(self, content: str) -> Dict[str, str]:
+        """Extract every field from a formatted response in one pass (first occurrence wins)"""
+        values = {}
+        for match in _FIELD_RE.finditer(content):
+            values.setdefault(match.group(1), match.group(2).strip())
+        return values
@@ -0,0 +1,60 @@
+"""
+Async Rate Limiter
+
+Token bucket over requests and tokens per minute, so concurrent reasoning
+pipelines stay under the account's RPM/TPM limits instead of bursting into
+429s. Capacity refills continuously; acquire() waits until both buckets can
+cover the next request.
+"""
+
+import asyncio
+import threading
+import time
+
+
+class AsyncRateLimiter:
+    """Requests-per-minute and tokens-per-minute budget for one API account."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        # Shared by pipelines on different threads/event loops
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(
+            self.requests_per_minute,
+            self._requests + elapsed * self.requests_per_minute / 60.0,
+        )
+        self._tokens = min(
+            self.tokens_per_minute,
+            self._tokens + elapsed * self.tokens_per_minute / 60.0,
+        )
+
+    async def acquire(self, tokens: int):
+        """
+        Wait until one request and `tokens` tokens are available, then debit them.
+
+        The check and debit happen under a lock with no await in between, so
+        concurrent callers can't both take the last unit of capacity.
+        """
+        # A request larger than the whole bucket would otherwise wait forever
+        tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self._requests) * 60.0 / self.requests_per_minute,
+                    (tokens - self._tokens) * 60.0 / self.tokens_per_minute,
+                )
+            await asyncio.sleep(wait)
@@ -0,0 +1,115 @@
+"""
+LLM Response Cache
+
+SQLite-backed cache of chat completion replies, keyed by a SHA-256 of the
+canonical request (model, messages and sampling parameters). Re-running the
+reasoning pipeline on a market whose inputs haven't changed within the TTL
+reads the replies from disk instead of repeating the API round trips.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+
+class ResponseCache:
+    """Time-limited store of chat completion message texts."""
+
+    def __init__(self, db_path: Optional[str] = None, ttl_seconds: int = 300):
+        if db_path is None:
+            db_dir = os.path.expanduser("~/.polymarket")
+            os.makedirs(db_dir, exist_ok=True)
+            db_path = os.path.join(db_dir, "llm_cache.db")
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+
+        # One connection shared by threads and the async pipeline
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            db_path, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """
+        )
+        self.prune()
+
+    @staticmethod
+    def key(request: Dict[str, Any]) -> str:
+        """Stable hash of a chat completion request."""
+        canonical = json.dumps(request, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, request: Dict[str, Any]) -> Optional[str]:
+        """Cached reply for this request, or None if absent or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM responses WHERE key = ? AND created_at >= ?",
+                (self.key(request), time.time() - self.ttl_seconds),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, request: Dict[str, Any], content: str):
+        """Store the reply for this request."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, content, created_at) VALUES (?, ?, ?)",
+                (self.key(request), content, time.time()),
+            )
+
+    def prune(self) -> int:
+        """Delete expired replies. Returns the number removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+        return cursor.rowcount
+
+    def close(self):
+        """Close the cache database."""
+        self._conn.close()
+
+
+# Shared instances for get_response_cache(), keyed by (db_path, ttl, pid), so
+# every reasoning instance reuses one connection instead of opening its own
+_CACHE_INSTANCES: Dict[Tuple[Optional[str], int, int], ResponseCache] = {}
+_CACHE_INSTANCES_LOCK = threading.Lock()
+
+
+def get_response_cache(
+    db_path: Optional[str] = None, ttl_seconds: int = 300
+) -> ResponseCache:
+    """
+    Shared ResponseCache for this path, TTL and process.
+
+    Do not close() the returned instance; it is closed at interpreter exit.
+    """
+    key = (db_path, ttl_seconds, os.getpid())
+    cache = _CACHE_INSTANCES.get(key)
+    if cache is None:
+        with _CACHE_INSTANCES_LOCK:
+            cache = _CACHE_INSTANCES.get(key)
+            if cache is None:
+                cache = _CACHE_INSTANCES[key] = ResponseCache(db_path, ttl_seconds)
+    return cache
+
+
+@atexit.register
+def _close_cached_response_caches():
+    pid = os.getpid()
+    for (_, _, owner), cache in list(_CACHE_INSTANCES.items()):
+        if owner == pid:
+            cache.close()
@@ -9,19 +9,78 @@ Implements risk-free arbitrage strategies:
 Based on research showing $40M+ extracted via arbitrage in 2024-2025.
 """
 
-from typing import Dict, List, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 from decimal import Decimal
 from dataclasses import dataclass
+from functools import lru_cache
 
+import numpy as np
 
-@dataclass
+from agents.strategies.arbitrage_kernel import candidate_rows
+
+# Fixed-point units for the risk-free detectors. Prices and gas are held in
+# 1e-4 USDC and fee fractions in 1e-6, so every cost below is an exact
+# integer in 1e-10 USDC (Polymarket ticks are 0.01 / 0.001).
+PRICE_SCALE = 10_000
+FEE_SCALE = 1_000_000
+COST_SCALE = PRICE_SCALE * FEE_SCALE
+MAX_COST = COST_SCALE * 99 // 100  # $0.99: must cost less than this after fees + gas
+
+# Every share pays out $1.00 at resolution (Decimal is immutable, so shared)
+PAYOUT = Decimal('1.00')
+
+
+# Binary outcome labels as feeds spell them, after strip().lower()
+_YES = frozenset({"yes", "y", "true", "1"})
+_NO = frozenset({"no", "n", "false", "0"})
+
+
+class AmbiguousMarketError(ValueError):
+    """A binary market's outcome labels contradict each other (e.g. two YES)."""
+
+
+def _to_units(value: float, scale: int) -> int:
+    """Round a float to integer units of 1/scale."""
+    return int(round(value * scale))
+
+
+def _binary_sides(outcome_prices: Dict[str, float]) -> Tuple[float, float]:
+    """
+    (YES, NO) prices of a two-outcome market.
+
+    Labels are matched ignoring case and surrounding whitespace, in either
+    order; if only one side is labelled, the other outcome is its
+    complement. Markets with named outcomes (candidates, Over/Under, asset
+    ids) are read in feed order.
+    """
+    (first, first_price), (second, second_price) = outcome_prices.items()
+    first_label, second_label = first.strip().lower(), second.strip().lower()
+    first_yes, second_yes = first_label in _YES, second_label in _YES
+    first_no, second_no = first_label in _NO, second_label in _NO
+
+    if (first_yes and second_yes) or (first_no and second_no):
+        raise AmbiguousMarketError(f"Both outcomes read as the same side: {first!r}, {second!r}")
+    if second_yes or first_no:
+        return second_price, first_price
+    return first_price, second_price
+
+
+def _trade(outcome: str, price: float) -> Mapping[str, Any]:
+    """One unit of an outcome at this price, as a read-only mapping."""
+    return MappingProxyType({"outcome": outcome, "price": price, "amount": 1.0})
+
+
+@dataclass(frozen=True, slots=True)
 class ArbitrageOpportunity:
     """Represents a detected arbitrage opportunity."""
     market_id: str
     question: str
     opportunity_type: str  # "binary", "multi_outcome", "asymmetric"
     expected_profit_pct: float
-    trades: List[Dict[str, any]]  # List of {outcome, price, amount}
+    # Read-only {outcome, price, amount} per trade; scan_market hands the same
+    # cached instance to every caller, so it must not be mutable
+    trades: Tuple[Mapping[str, Any], ...]
     total_cost: Decimal
     guaranteed_return: Decimal
     risk_level: str  # "risk_free", "low_risk"
@@ -37,6 +96,9 @@ class ArbitrageDetector:
     - Asymmetric: Single outcome < $0.97 (wait for $1.00 resolution)
     """
 
+    # scan_market results kept per detector, keyed by fixed-point prices
+    SCAN_CACHE_SIZE = 16384
+
     def __init__(
         self,
         min_profit_pct: float = 1.0,  # Minimum 1% profit after fees
@@ -46,6 +108,15 @@ class ArbitrageDetector:
         self.min_profit_pct = min_profit_pct
         self.trading_fee_pct = trading_fee_pct
         self.gas_cost_usdc = gas_cost_usdc
+        # Invariant per detector: price * (1 + fee) is one multiply, gas is per trade
+        self._fee_mul = FEE_SCALE + _to_units(trading_fee_pct, FEE_SCALE)
+        self._gas_cost = _to_units(gas_cost_usdc, PRICE_SCALE) * FEE_SCALE
+        self._scan_cached = lru_cache(maxsize=self.SCAN_CACHE_SIZE)(self._scan_quantized)
+
+    def _effective_cost(self, total_units: int, num_trades: int) -> int:
+        """Cost of buying every outcome incl. fees and gas, in 1/COST_SCALE USDC."""
+        # FIXED: trading_fee_pct is a percentage (0.01 = 1%), must multiply by total_cost
+        return total_units * self._fee_mul + self._gas_cost * num_trades
 
     def detect_binary_arbitrage(
         self,
@@ -64,18 +135,16 @@ class ArbitrageDetector:
         - NO: $0.50
         - Total: $0.98 → Buy both for $0.98, get $1.00 → 2% profit
         """
-        total_cost = Decimal(str(yes_price)) + Decimal(str(no_price))
+        total_units = _to_units(yes_price, PRICE_SCALE) + _to_units(no_price, PRICE_SCALE)
 
-        # Account for fees and gas
-        # FIXED: trading_fee_pct is a percentage (0.01 = 1%), must multiply by total_cost
-        fee_amount = total_cost * Decimal(str(self.trading_fee_pct))
-        effective_cost = total_cost + fee_amount + Decimal(str(self.gas_cost_usdc))
+        # Account for fees and gas (gas once, as before)
+        effective_cost = self._effective_cost(total_units, 1)
 
         # Must be profitable after fees
-        if effective_cost >= Decimal('0.99'):
+        if effective_cost >= MAX_COST:
             return None
 
-        profit_pct = float((Decimal('1.00') - effective_cost) / effective_cost * 100)
+        profit_pct = (COST_SCALE - effective_cost) * 100 / effective_cost
 
         if profit_pct < self.min_profit_pct:
             return None
@@ -85,12 +154,9 @@ class ArbitrageDetector:
             question=question,
             opportunity_type="binary",
             expected_profit_pct=profit_pct,
-            trades=[
-                {"outcome": "YES", "price": yes_price, "amount": 1.0},
-                {"outcome": "NO", "price": no_price, "amount": 1.0},
-            ],
-            total_cost=effective_cost,
-            guaranteed_return=Decimal('1.00'),
+            trades=(_trade("YES", yes_price), _trade("NO", no_price)),
+            total_cost=(Decimal(effective_cost) / COST_SCALE).normalize(),
+            guaranteed_return=PAYOUT,
             risk_level="risk_free"
         )
 
@@ -112,28 +178,28 @@ class ArbitrageDetector:
         - Outcome D: $0.20
         - Total: $0.95 → Buy all for $0.95, get $1.00 → 5% profit
         """
-        total_cost = sum(Decimal(str(price)) for price in outcome_prices.values())
-
-        # Account for fees and gas (multiple trades)
+        # Account for fees and gas (multiple trades). Costs only grow as outcomes
+        # are added, so most markets are rejected after the first few prices
         num_outcomes = len(outcome_prices)
-        # FIXED: trading_fee_pct is a percentage (0.01 = 1%), must multiply by total_cost
-        total_fees = total_cost * Decimal(str(self.trading_fee_pct))
-        total_gas = Decimal(str(self.gas_cost_usdc * num_outcomes))
-        effective_cost = total_cost + total_fees + total_gas
+        gas = self._gas_cost * num_outcomes
+        total_units = 0
+        for price in outcome_prices.values():
+            total_units += _to_units(price, PRICE_SCALE)
+            if total_units * self._fee_mul + gas >= MAX_COST:
+                return None
+
+        effective_cost = self._effective_cost(total_units, num_outcomes)
 
         # Must be profitable after fees
-        if effective_cost >= Decimal('0.99'):
+        if effective_cost >= MAX_COST:
             return None
 
-        profit_pct = float((Decimal('1.00') - effective_cost) / effective_cost * 100)
+        profit_pct = (COST_SCALE - effective_cost) * 100 / effective_cost
 
         if profit_pct < self.min_profit_pct:
             return None
 
-        trades = [
-            {"outcome": outcome, "price": price, "amount": 1.0}
-            for outcome, price in outcome_prices.items()
-        ]
+        trades = tuple(_trade(outcome, price) for outcome, price in outcome_prices.items())
 
         return ArbitrageOpportunity(
             market_id=market_id,
@@ -141,8 +207,8 @@ class ArbitrageDetector:
             opportunity_type="multi_outcome",
             expected_profit_pct=profit_pct,
             trades=trades,
-            total_cost=effective_cost,
-            guaranteed_return=Decimal('1.00'),
+            total_cost=(Decimal(effective_cost) / COST_SCALE).normalize(),
+            guaranteed_return=PAYOUT,
             risk_level="risk_free"
         )
 
@@ -188,11 +254,9 @@ class ArbitrageDetector:
             question=question,
             opportunity_type="asymmetric",
             expected_profit_pct=best_profit,
-            trades=[
-                {"outcome": best_side, "price": best_price, "amount": 1.0},
-            ],
+            trades=(_trade(best_side, best_price),),
             total_cost=Decimal(str(best_price)),
-            guaranteed_return=Decimal('1.00'),  # If outcome correct
+            guaranteed_return=PAYOUT,  # If outcome correct
             risk_level="low_risk"  # Requires outcome to be correct
         )
 
@@ -205,15 +269,35 @@ class ArbitrageDetector:
         """
         Scan a single market for ALL arbitrage opportunities.
 
-        Returns list of opportunities sorted by profit potential.
+        Returns list of opportunities sorted by profit potential. Raises
+        AmbiguousMarketError if a binary market's labels contradict each other.
+
+        Prices are read at the detectors' fixed-point resolution (1e-4), and
+        results are cached on that, so repeated quotes that haven't moved by
+        a full unit are answered without redoing the math.
         """
+        quantized = tuple(
+            (outcome, _to_units(price, PRICE_SCALE)) for outcome, price in outcome_prices.items()
+        )
+        return list(self._scan_cached(market_id, question, quantized))
+
+    def clear_scan_cache(self):
+        """Drop cached scan_market results (e.g. after changing fees or gas)."""
+        self._scan_cached.cache_clear()
+
+    def _scan_quantized(
+        self,
+        market_id: str,
+        question: str,
+        quantized: Tuple[Tuple[str, int], ...],
+    ) -> Tuple[ArbitrageOpportunity, ...]:
+        """scan_market on (outcome, price units) pairs, in feed order."""
+        outcome_prices = {outcome: units / PRICE_SCALE for outcome, units in quantized}
         opportunities = []
 
         # Check binary arbitrage (if exactly 2 outcomes)
         if len(outcome_prices) == 2:
-            outcomes = list(outcome_prices.keys())
-            yes_price = outcome_prices.get("Yes", outcome_prices.get(outcomes[0]))
-            no_price = outcome_prices.get("No", outcome_prices.get(outcomes[1]))
+            yes_price, no_price = _binary_sides(outcome_prices)
 
             # Binary arbitrage (risk-free)
             binary_arb = self.detect_binary_arbitrage(market_id, question, yes_price, no_price)
@@ -239,4 +323,59 @@ class ArbitrageDetector:
             )
         )
 
+        return tuple(opportunities)
+
+    def scan_markets_bulk(
+        self,
+        market_ids: Sequence[str],
+        questions: Sequence[str],
+        prices: np.ndarray,
+        outcomes: Optional[Sequence[Sequence[str]]] = None,
+    ) -> List[ArbitrageOpportunity]:
+        """
+        Scan a whole feed for risk-free (binary / multi-outcome) arbitrage.
+
+        prices is an (N, K) array with one market per row, padded with NaN
+        for markets with fewer than K outcomes; binary rows are (YES, NO).
+        outcomes optionally names each row's outcomes (default outcome_<j>).
+
+        Fees and gas are applied to every row at once (the numba kernel when
+        installed, else NumPy). Only rows that pass go through the exact
+        per-market detectors, so results match scan_market's risk-free
+        opportunities (asymmetric trades are not scanned here). Returned in
+        row order.
+        """
+        prices = np.ascontiguousarray(prices, dtype=np.float64)
+        if prices.ndim != 2 or len(prices) == 0:
+            return []
+
+        # Small slack so float rounding can't drop a row the exact check accepts
+        threshold = 0.99 + 1e-9
+
+        if candidate_rows is not None:
+            mask = np.empty(len(prices), dtype=np.bool_)
+            candidate_rows(prices, self.trading_fee_pct, self.gas_cost_usdc, threshold, mask)
+        else:
+            valid = ~np.isnan(prices)
+            counts = valid.sum(axis=1)
+            totals = np.where(valid, prices, 0.0).sum(axis=1)
+            # Gas mirrors the scalar detectors: once for binary, per outcome otherwise
+            num_trades = np.where(counts == 2, 1, counts)
+            effective = totals * (1.0 + self.trading_fee_pct) + self.gas_cost_usdc * num_trades
+            mask = (counts >= 2) & (effective < threshold)
+
+        opportunities = []
+        for i in np.nonzero(mask)[0]:
+            row = prices[i][~np.isnan(prices[i])]
+            if len(row) == 2:
+                opp = self.detect_binary_arbitrage(
+                    market_ids[i], questions[i], float(row[0]), float(row[1])
+                )
+            else:
+                names = outcomes[i] if outcomes is not None else [f"outcome_{j}" for j in range(len(row))]
+                opp = self.detect_multi_outcome_arbitrage(
+                    market_ids[i], questions[i], dict(zip(names, row.tolist()))
+                )
+            if opp:
+                opportunities.append(opp)
         return opportunities
@@ -0,0 +1,51 @@
+"""
+JIT-compiled arbitrage scanning kernel
+
+Numba version of the cost filter in ArbitrageDetector.scan_markets_bulk:
+one parallel pass over the price matrix with no temporary arrays. numba is
+optional; candidate_rows is None when it isn't installed and callers fall
+back to NumPy.
+"""
+
+import numpy as np
+
+# Optional: compiled kernel for large feeds
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+
+def _candidate_rows(
+    prices: np.ndarray,
+    fee_pct: float,
+    gas: float,
+    threshold: float,
+    out_mask: np.ndarray,
+):
+    """
+    Flag rows of a NaN-padded (N, K) price matrix whose cost of buying
+    every outcome, after fees and gas, is below threshold.
+
+    Gas matches the scalar detectors: charged once for binary rows and per
+    outcome otherwise. Rows with fewer than two prices are never flagged.
+    """
+    n, k = prices.shape
+    for i in prange(n):
+        total = 0.0
+        count = 0
+        for j in range(k):
+            p = prices[i, j]
+            if not np.isnan(p):
+                total += p
+                count += 1
+        trades = 1 if count == 2 else count
+        effective = total * (1.0 + fee_pct) + gas * trades
+        out_mask[i] = count >= 2 and effective < threshold
+
+
+# fastmath is left off: it lets LLVM assume no NaNs, which breaks the padding check
+candidate_rows = (
+    njit(parallel=True, cache=True)(_candidate_rows) if njit is not None else None
+)
@@ -9,14 +9,43 @@ Sends notifications to Discord webhook for:
 - Performance summaries
 """
 
+import atexit
 import os
+import queue
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, Optional
 from datetime import datetime
 
+# Discord accepts up to 10 embeds and 6000 characters of embed text per message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS = 6000
+
+_STOP = object()  # worker shutdown marker
+
+
+def _embed_chars(embed: Dict) -> int:
+    """Characters of an embed that count towards Discord's per-message limit."""
+    size = len(embed["title"]) + len(embed["description"])
+    for field in embed["fields"]:
+        size += len(str(field.get("name", ""))) + len(str(field.get("value", "")))
+    return size
+
 
 class DiscordAlerter:
-    """Send trading alerts to Discord"""
+    """
+    Send trading alerts to Discord
+
+    Alerts are queued and posted by a background thread, so the trading
+    loop never waits on the webhook. Alerts that pile up are sent together,
+    several embeds per message.
+    """
+
+    # Pending alerts; when full, the oldest is dropped
+    QUEUE_SIZE = 256
 
     def __init__(self, webhook_url: Optional[str] = None):
         self.webhook_url = webhook_url or os.getenv("DISCORD_WEBHOOK_URL")
@@ -24,10 +53,63 @@ class DiscordAlerter:
         if not self.webhook_url:
             print("⚠️  No Discord webhook URL configured")
 
+        # One keep-alive connection to discord.com for every alert. POST is
+        # retried explicitly: Discord rejects rate-limited webhooks without
+        # posting them, and Retry honours its Retry-After header
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=4,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=frozenset({"POST"}),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("https://", adapter)
+
+        self._queue: queue.Queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._worker_thread: Optional[threading.Thread] = None
+        if self.webhook_url:
+            self._worker_thread = threading.Thread(target=self._worker, name="discord-alerts", daemon=True)
+            self._worker_thread.start()
+            # The worker is a daemon; give queued alerts a chance at exit
+            atexit.register(self.flush)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait up to timeout seconds for queued alerts to be sent. True if all were."""
+        if self._worker_thread is None:
+            return True
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 5.0):
+        """Send queued alerts (up to timeout seconds), stop the worker and close the HTTP session."""
+        if self._worker_thread is not None:
+            self.flush(timeout)
+            atexit.unregister(self.flush)
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                pass
+            self._worker_thread.join(timeout)
+            self._worker_thread = None
+        self.session.close()
+
     def send_alert(self, title: str, description: str, color: int = 0x00ff00, fields: Optional[list] = None):
         """
         Send Discord embed alert
 
+        Queues the embed for the background worker and returns immediately.
+
         Args:
             title: Alert title
             description: Alert description
@@ -45,10 +127,51 @@ class DiscordAlerter:
             "fields": fields or []
         }
 
-        payload = {"embeds": [embed]}
+        try:
+            self._queue.put_nowait(embed)
+        except queue.Full:
+            # Never block trading on Discord: make room by dropping the oldest alert
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self._queue.put_nowait(embed)
+                print("Discord alert queue full, dropped oldest alert")
+            except (queue.Empty, queue.Full):
+                print(f"Discord alert queue full, dropped: {title}")
+
+    def _worker(self):
+        """Post queued embeds, batching whatever has piled up into one message."""
+        carry = None  # item taken from the queue that didn't fit the last message
+        while True:
+            item = carry if carry is not None else self._queue.get()
+            carry = None
+            if item is _STOP:
+                self._queue.task_done()
+                return
+
+            embeds = [item]
+            size = _embed_chars(item)
+            while len(embeds) < MAX_EMBEDS_PER_MESSAGE:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP or size + _embed_chars(item) > MAX_EMBED_CHARS:
+                    carry = item
+                    break
+                embeds.append(item)
+                size += _embed_chars(item)
+
+            try:
+                self._post({"embeds": embeds})
+            finally:
+                for _ in embeds:
+                    self._queue.task_done()
 
+    def _post(self, payload: Dict):
+        """POST one webhook message."""
         try:
-            response = requests.post(self.webhook_url, json=payload)
+            response = self.session.post(self.webhook_url, json=payload, timeout=5)
             if response.status_code not in [200, 204]:
                 print(f"Discord alert failed: {response.status_code}")
         except Exception as e:
@@ -0,0 +1,26 @@
+"""
+Optional Numba JIT support
+
+Numba isn't a hard dependency. When it is installed, numeric kernels
+decorated with `njit` are compiled; otherwise the decorator is a no-op and
+the same kernels run as plain Python/NumPy.
+"""
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
@@ -225,18 +225,20 @@ def import_historical_data():
         entry_price = total_cost / total_size if total_size > 0 else 0.5
 
         # Insert into database
+        cursor.execute("INSERT OR IGNORE INTO market_types (name) VALUES (?)", (market_type,))
         cursor.execute('''
             INSERT INTO predictions (
-                timestamp, market_id, question, market_type,
+                timestamp, market_id, question, market_type, market_type_id,
                 predicted_outcome, predicted_probability, confidence,
                 token_id, trade_executed, trade_size_usdc, trade_price,
                 position_open, actual_outcome, pnl, imported, strategy
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ) VALUES (?, ?, ?, ?, (SELECT id FROM market_types WHERE name = ?), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             timestamp,
             asset_id[:20] if asset_id else "unknown",
             title,
             market_type,
+            market_type,
             outcome,
             entry_price,
             0.6,  # Default confidence
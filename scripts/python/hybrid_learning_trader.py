@@ -38,7 +38,7 @@ from py_clob_client.clob_types import OrderArgs, OrderType
 
 from agents.polymarket.polymarket import Polymarket
 from agents.polymarket.gamma import GammaMarketClient as Gamma
-from agents.learning.trade_history import TradeHistoryDB
+from agents.learning.trade_history import get_db
 from agents.utils.discord_alerts import DiscordAlerter
 
 # Optional imports
@@ -112,7 +112,7 @@ class HybridLearningTrader:
         # Core
         self.polymarket = Polymarket()
         self.gamma = Gamma()
-        self.db = TradeHistoryDB(DB_PATH)
+        self.db = get_db(DB_PATH)
         self.discord = DiscordAlerter()
 
         # Crypto edge
@@ -423,11 +423,12 @@ class LearningAutonomousTrader:
                 return
 
             print("\n🔄 Syncing positions with Polymarket...")
-            result = self.position_sync.reconcile_positions(verbose=True)
+            positions = self.position_sync.get_actual_positions()
+            result = self.position_sync.reconcile_positions(verbose=True, positions=positions)
             self.last_sync_time = current_time
 
-            # Cache actual exposure for faster lookups
-            self._cached_exposure = self.position_sync.get_open_exposure()
+            # Cache actual exposure for faster lookups (same snapshot, no refetch)
+            self._cached_exposure = self.position_sync.get_open_exposure(positions)
             self._cached_exposure_time = current_time
 
         except Exception as e:
@@ -63,29 +63,19 @@ def get_calibration_data(conn):
 
 
 def get_brier_score(conn):
-    """Calculate Brier score"""
+    """Calculate Brier score (a trade counts as a hit when it made money)"""
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT confidence, profit_loss_usdc
+        SELECT AVG(
+            (confidence - (CASE WHEN profit_loss_usdc > 0 THEN 1.0 ELSE 0.0 END))
+            * (confidence - (CASE WHEN profit_loss_usdc > 0 THEN 1.0 ELSE 0.0 END))
+        )
         FROM predictions
         WHERE trade_executed = 1 AND actual_outcome IS NOT NULL
         AND confidence IS NOT NULL
     """)
 
-    rows = cursor.fetchall()
-    if not rows:
-        return None
-
-    brier_scores = []
-    for row in rows:
-        conf = row['confidence']
-        pnl = row['profit_loss_usdc']
-        if conf is None:
-            continue
-        actual = 1.0 if (pnl is not None and pnl > 0) else 0.0
-        brier_scores.append((conf - actual) ** 2)
-
-    return sum(brier_scores) / len(brier_scores) if brier_scores else None
+    return cursor.fetchone()[0]
 
 
 def get_strategy_performance(conn):
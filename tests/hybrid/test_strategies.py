@@ -71,6 +71,42 @@ class TestStrategyIntent:
         assert "BUY" in repr_str
         assert "0.75" in repr_str
 
+    def test_intent_timestamp(self):
+        """Test intent timestamp is epoch nanoseconds with a datetime view."""
+        before = datetime.now(timezone.utc)
+        intent = StrategyIntent(
+            market_id="test",
+            token_id="token",
+            outcome="YES",
+            side="buy",
+            price=Decimal("0.50"),
+            size=Decimal("5"),
+            reason="Test",
+            strategy_name="test",
+        )
+        assert isinstance(intent.timestamp, int)
+        assert intent.timestamp_dt.tzinfo == timezone.utc
+        assert abs((intent.timestamp_dt - before).total_seconds()) < 5
+
+    def test_intent_default_metadata_shared_and_readonly(self):
+        """Test metadata-less intents share one read-only empty mapping."""
+        kwargs = dict(
+            market_id="test",
+            token_id="token",
+            outcome="YES",
+            side="buy",
+            price=Decimal("0.50"),
+            size=Decimal("5"),
+            reason="Test",
+            strategy_name="test",
+        )
+        a = StrategyIntent(**kwargs)
+        b = StrategyIntent(**kwargs)
+        assert a.metadata is b.metadata
+        assert len(a.metadata) == 0
+        with pytest.raises(TypeError):
+            a.metadata["key"] = "value"
+
 
 class TestOrderBook:
     """Tests for OrderBook dataclass."""
@@ -368,3 +404,31 @@ class TestStrategyManager:
         # Single book analysis returns empty (arbitrage needs dual)
         intents = manager.analyze_all(book)
         assert intents == []
+
+    def test_failing_strategy_is_disabled(self):
+        """Test a strategy that keeps raising is disabled by the breaker."""
+
+        class BrokenStrategy(BaseStrategy):
+            def analyze(self, orderbook):
+                raise RuntimeError("boom")
+
+        manager = StrategyManager()
+        strategy = BrokenStrategy("broken")
+        manager.add_strategy(strategy)
+
+        book = OrderBook(
+            market_id="test",
+            token_id="token",
+            outcome="YES",
+            bids=[],
+            asks=[],
+        )
+
+        assert StrategyManager.MAX_CONSECUTIVE_ERRORS == 10
+        for _ in range(9):
+            assert manager.analyze_all(book) == []
+        assert strategy.enabled is True
+
+        # The 10th consecutive failure trips the breaker
+        manager.analyze_all(book)
+        assert strategy.enabled is False
@@ -0,0 +1,86 @@
+"""Tests for binary outcome label handling in the arbitrage detector."""
+
+import pytest
+
+from agents.strategies.arbitrage import (
+    AmbiguousMarketError,
+    ArbitrageDetector,
+    _binary_sides,
+)
+
+
+class TestBinarySides:
+    """Tests for _binary_sides()."""
+
+    @pytest.mark.parametrize(
+        "prices",
+        [
+            {"Yes": 0.4, "No": 0.6},
+            {"No": 0.6, "Yes": 0.4},
+            {" YES ": 0.4, "no": 0.6},
+            {"true": 0.4, "False": 0.6},
+            {"0": 0.6, "1": 0.4},
+            {"Y": 0.4, "N": 0.6},
+        ],
+    )
+    def test_labels_are_normalized(self, prices):
+        """YES/NO are found ignoring case, whitespace, spelling and order."""
+        assert _binary_sides(prices) == (0.4, 0.6)
+
+    @pytest.mark.parametrize(
+        "prices",
+        [
+            {"Yes": 0.4, "Other": 0.6},
+            {"Other": 0.6, "Yes": 0.4},
+            {"No": 0.6, "Other": 0.4},
+            {"Other": 0.4, "No": 0.6},
+        ],
+    )
+    def test_single_label_sets_the_other_side(self, prices):
+        """With one side labelled, the other outcome is its complement."""
+        assert _binary_sides(prices) == (0.4, 0.6)
+
+    def test_named_outcomes_keep_feed_order(self):
+        """Candidates and other named outcomes are read first = YES."""
+        assert _binary_sides({"Trump": 0.55, "Harris": 0.45}) == (0.55, 0.45)
+        assert _binary_sides({"Under": 0.3, "Over": 0.7}) == (0.3, 0.7)
+
+    @pytest.mark.parametrize(
+        "prices",
+        [
+            {"Yes": 0.4, " yes": 0.5},
+            {"No": 0.4, "false": 0.5},
+            {"1": 0.4, "true": 0.5},
+        ],
+    )
+    def test_same_side_twice_is_ambiguous(self, prices):
+        """Two labels for the same side raise AmbiguousMarketError."""
+        with pytest.raises(AmbiguousMarketError):
+            _binary_sides(prices)
+
+    def test_ambiguous_market_error_is_a_value_error(self):
+        """Callers catching ValueError keep working."""
+        assert issubclass(AmbiguousMarketError, ValueError)
+
+
+class TestScanMarketLabels:
+    """scan_market reads binary markets through _binary_sides()."""
+
+    def test_reversed_labels_price_the_right_sides(self):
+        """A feed listing NO first still buys YES at the YES price."""
+        detector = ArbitrageDetector(min_profit_pct=1.0, gas_cost_usdc=0.0)
+
+        opportunities = detector.scan_market("m1", "q", {"no": 0.52, "YES": 0.40})
+
+        binary = next(opp for opp in opportunities if opp.opportunity_type == "binary")
+        assert [(trade["outcome"], trade["price"]) for trade in binary.trades] == [
+            ("YES", 0.40),
+            ("NO", 0.52),
+        ]
+
+    def test_ambiguous_market_raises_every_time(self):
+        """The error is raised on every call, not cached away."""
+        detector = ArbitrageDetector()
+        for _ in range(2):
+            with pytest.raises(AmbiguousMarketError):
+                detector.scan_market("m1", "q", {"Yes": 0.4, "yes ": 0.5})
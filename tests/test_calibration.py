@@ -0,0 +1,48 @@
+"""Tests for the calibration tracker's statistics."""
+
+import dataclasses
+
+import pytest
+
+from agents.learning.calibration import CalibrationStats, CalibrationTracker
+from agents.learning.trade_history import TradeHistoryDB
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A fresh trade history DB in a temporary directory."""
+    database = TradeHistoryDB(str(tmp_path / "trades.db"))
+    yield database
+    database.close()
+
+
+class TestCalibrationStats:
+    """Tests for CalibrationStats."""
+
+    def test_built_and_copied_with_public_fields(self):
+        """calibration_curve is a regular constructor argument."""
+        stats = CalibrationStats(
+            brier_score=0.2,
+            is_overconfident=False,
+            is_underconfident=False,
+            average_bias=0.0,
+            calibration_curve=[(0.55, 0.5, 4)],
+            sample_size=4,
+        )
+
+        copy = dataclasses.replace(stats, sample_size=5)
+
+        assert copy.calibration_curve == [(0.55, 0.5, 4)]
+        assert copy.sample_size == 5
+
+    def test_tracker_curve_keeps_exact_values(self, db):
+        """Bucket centres come back as stored, without float32 rounding."""
+        for i in range(10):
+            market_id = f"m{i}"
+            db.store_prediction(market_id, "Q?", "YES", 0.55, 0.55, "test", "test")
+            db.record_outcome(market_id, "YES" if i < 6 else "NO")
+
+        stats = CalibrationTracker(db).get_calibration_stats()
+
+        assert stats.calibration_curve == [(0.55, 0.6, 10)]
+        assert stats.average_bias == pytest.approx(-0.05)
@@ -0,0 +1,52 @@
+"""Tests for the isotonic calibrator's scalar and batch paths."""
+
+import numpy as np
+import pytest
+
+from agents.learning.isotonic_calibration import IsotonicCalibrator, _ThresholdCurve
+
+
+@pytest.fixture
+def calibrator(tmp_path):
+    """A calibrator with no database, fitted by hand in each test."""
+    return IsotonicCalibrator(None, model_path=str(tmp_path / "isotonic.npz"))
+
+
+def _fit(calibrator, xt, yt):
+    """Install a fitted curve with these thresholds."""
+    curve = _ThresholdCurve(
+        np.asarray(xt, dtype=np.float64), np.asarray(yt, dtype=np.float64)
+    )
+    calibrator._curve = calibrator._curve_from_estimator(curve)
+    calibrator.calibrator = curve
+
+
+class TestCalibrate:
+    """calibrate() and calibrate_batch() evaluate the same curve."""
+
+    def test_steep_step_agrees_with_batch(self, calibrator):
+        """A step narrower than 0.001 is not snapped to a grid."""
+        _fit(calibrator, [0.0, 0.3, 0.3004, 1.0], [0.2, 0.2, 0.6, 0.6])
+
+        assert calibrator.calibrate(0.30049) == 0.6
+        assert calibrator.calibrate_batch(np.array([0.30049]))[0] == 0.6
+        assert calibrator.calibrate(0.3002) == pytest.approx(0.4)
+
+    def test_matches_batch_on_random_curve(self, calibrator):
+        """Scalar and batch results agree everywhere, including out of range."""
+        rng = np.random.default_rng(0)
+        xt = np.sort(rng.random(40))
+        _fit(calibrator, xt, np.sort(rng.random(40)))
+        x = np.concatenate([rng.random(2000), xt, [-1.0, 0.0, 1.0, 2.0]])
+
+        batch = calibrator.calibrate_batch(x)
+        scalar = np.array([calibrator.calibrate(float(value)) for value in x])
+
+        np.testing.assert_allclose(scalar, batch, rtol=0, atol=1e-12)
+
+    def test_values_are_exact_float64(self, calibrator):
+        """Threshold values come back without float32 rounding."""
+        _fit(calibrator, [0.0, 1.0], [0.55, 0.55])
+
+        assert calibrator.calibrate(0.5) == 0.55
+        assert calibrator.calibrate_batch(np.array([0.5]))[0] == 0.55
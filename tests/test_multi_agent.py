@@ -0,0 +1,226 @@
+"""Tests for the multi-agent reasoning pipeline's parsing, routing and retries."""
+
+import asyncio
+import random
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("httpx")
+
+from agents.reasoning.multi_agent import MultiAgentReasoning
+from agents.strategies.arbitrage import ArbitrageDetector
+
+FIELDS = (
+    "PREDICTION",
+    "PROBABILITY",
+    "CONFIDENCE",
+    "REASONING",
+    "SUPPORTING",
+    "CONTRADICTING",
+    "BUY",
+    "CHALLENGES",
+    "ALTERNATIVES",
+    "ADJUSTMENT",
+    "RED_FLAGS",
+    "VERIFICATION",
+)
+
+
+def _extract_field(content, field, default=""):
+    """The line-by-line parser _extract_all replaced, as the reference."""
+    for line in content.split("\n"):
+        if line.startswith(f"{field}:"):
+            return line.split(":", 1)[1].strip()
+    return default
+
+
+@pytest.fixture
+def reasoning(monkeypatch):
+    """A reasoning instance (no network calls are made)."""
+    monkeypatch.setenv("XAI_API_KEY", "test-key")
+    return MultiAgentReasoning(cache_ttl=0)
+
+
+class TestExtractAll:
+    """Tests for _extract_all()."""
+
+    def test_first_occurrence_wins(self, reasoning):
+        """A repeated field keeps its first value."""
+        values = reasoning._extract_all("CONFIDENCE: 0.8\nCONFIDENCE: 0.2")
+        assert values["CONFIDENCE"] == "0.8"
+
+    def test_empty_field_does_not_take_next_line(self, reasoning):
+        """An empty value stays empty instead of swallowing the following line."""
+        values = reasoning._extract_all("REASONING:\nPREDICTION: YES")
+        assert values["REASONING"] == ""
+        assert values["PREDICTION"] == "YES"
+
+    def test_field_must_start_the_line(self, reasoning):
+        """Indented or embedded labels are not fields."""
+        values = reasoning._extract_all("  BUY: YES\nnote BUY: NO\nBUY:  NO  \r")
+        assert values == {"BUY": "NO"}
+
+    def test_matches_line_parser_on_random_replies(self, reasoning):
+        """Every field agrees with the old per-field parser on fuzzed replies."""
+        rng = random.Random(1)
+        tokens = list(FIELDS) + [
+            "x",
+            ": ",
+            ":",
+            "\n",
+            "\r\n",
+            " ",
+            "0.5",
+            "  yes",
+            "-5%",
+        ]
+        for _ in range(5000):
+            content = "".join(rng.choice(tokens) for _ in range(rng.randint(0, 25)))
+            values = reasoning._extract_all(content)
+            for field in FIELDS:
+                assert values.get(field, "<missing>") == _extract_field(
+                    content, field, "<missing>"
+                ), content
+
+
+class TestNeedsEscalation:
+    """Tests for redoing small-model critiques on the main model."""
+
+    @staticmethod
+    def _critique(reasoning, confidence="appropriate", red_flags="None"):
+        return reasoning._parse_critique(
+            f"CHALLENGES: thin volume\nCONFIDENCE: {confidence}\n"
+            f"ADJUSTMENT: 0\nRED_FLAGS: {red_flags}"
+        )
+
+    @pytest.mark.parametrize(
+        "confidence", ["appropriate", "Appropriate.", "appropriate - evidence is solid"]
+    )
+    def test_appropriate_without_red_flags_stays_on_critic(self, reasoning, confidence):
+        """Only the verdict word is read from the confidence line."""
+        critique = self._critique(reasoning, confidence=confidence)
+        assert not reasoning._needs_escalation(critique)
+
+    @pytest.mark.parametrize("red_flags", ["None", "none.", "N/A", "- None", ""])
+    def test_none_red_flags_stay_on_critic(self, reasoning, red_flags):
+        """The spellings of "no red flags" don't escalate."""
+        critique = self._critique(reasoning, red_flags=red_flags)
+        assert not reasoning._needs_escalation(critique)
+
+    def test_confidence_concern_escalates(self, reasoning):
+        """A too high / too low verdict goes to the main model."""
+        critique = self._critique(reasoning, confidence="too high, ignores base rates")
+        assert reasoning._needs_escalation(critique)
+
+    def test_red_flag_escalates(self, reasoning):
+        """A real red flag goes to the main model."""
+        critique = self._critique(reasoning, red_flags="Resolution source is ambiguous")
+        assert reasoning._needs_escalation(critique)
+
+    def test_prompt_asks_for_exact_answers(self, reasoning):
+        """The critic is told how to say there is nothing to escalate."""
+        prompt = reasoning._critique_request(
+            "Q?", reasoning._parse_prediction("PREDICTION: YES")
+        )["messages"][1]["content"]
+        assert "write None" in prompt
+        assert "exactly one of: too high, appropriate, too low" in prompt
+
+
+class TestFastPath:
+    """Tests for answering risk-free arbitrage without the agents."""
+
+    @pytest.fixture
+    def arb_reasoning(self, monkeypatch):
+        monkeypatch.setenv("XAI_API_KEY", "test-key")
+        return MultiAgentReasoning(
+            cache_ttl=0, arbitrage_detector=ArbitrageDetector(gas_cost_usdc=0.0)
+        )
+
+    def test_no_single_outcome_to_buy(self, arb_reasoning):
+        """The legs are under "arbitrage", not in final_outcome_to_buy."""
+        result = arb_reasoning.fast_path("m1", "Q?", {"Yes": 0.3, "No": 0.6})
+        assert result["verification"]["passed"]
+        assert result["final_outcome_to_buy"] is None
+        assert result["final_confidence"] == 1.0
+        legs = {trade["outcome"] for trade in result["arbitrage"].trades}
+        assert legs == {"YES", "NO"}
+
+    def test_no_arbitrage(self, arb_reasoning):
+        """Fairly priced markets go to the agents."""
+        assert arb_reasoning.fast_path("m1", "Q?", {"Yes": 0.6, "No": 0.45}) is None
+
+    def test_without_detector(self, reasoning):
+        """Without a detector there is no fast path."""
+        assert reasoning.fast_path("m1", "Q?", {"Yes": 0.3, "No": 0.6}) is None
+
+
+class RateLimited(Exception):
+    """Stands in for openai.RateLimitError / a 429 aiohttp error."""
+
+    def __init__(self, status_code=429):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class TestCallWithRetries:
+    """Tests for the 429 retry/backoff around async API calls."""
+
+    REQUEST = {"messages": [{"role": "user", "content": "x" * 400}], "max_tokens": 50}
+
+    @pytest.fixture
+    def calls(self, reasoning, monkeypatch):
+        """Record backoff sleeps (with maximum jitter) and rate-limiter debits."""
+        calls = SimpleNamespace(sleeps=[], acquired=[])
+
+        async def fake_sleep(seconds):
+            calls.sleeps.append(seconds)
+
+        async def fake_acquire(tokens):
+            calls.acquired.append(tokens)
+
+        monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+        monkeypatch.setattr(random, "uniform", lambda low, high: high)
+        monkeypatch.setattr(reasoning.rate_limiter, "acquire", fake_acquire)
+        return calls
+
+    @staticmethod
+    def _send(failures):
+        """send() that raises each of `failures` in turn, then returns "ok"."""
+        failures = list(failures)
+
+        async def send():
+            if failures:
+                raise failures.pop(0)
+            return "ok"
+
+        return send
+
+    def _call(self, reasoning, send):
+        return asyncio.run(reasoning._call_with_retries(send, self.REQUEST))
+
+    def test_retries_429_with_exponential_backoff(self, reasoning, calls):
+        """Each 429 waits twice as long as the last, plus jitter."""
+        send = self._send([RateLimited(), RateLimited(), RateLimited()])
+        assert self._call(reasoning, send) == "ok"
+        base = reasoning.RETRY_BASE_DELAY
+        assert calls.sleeps == [2 * base, 4 * base, 8 * base]
+
+    def test_every_attempt_goes_through_the_limiter(self, reasoning, calls):
+        """Retries are paced too, each debiting the request's token estimate."""
+        self._call(reasoning, self._send([RateLimited()]))
+        assert calls.acquired == [150, 150]
+
+    def test_gives_up_after_max_retries(self, reasoning, calls):
+        """The last 429 is re-raised once the retries are used up."""
+        send = self._send([RateLimited()] * (reasoning.MAX_RETRIES + 1))
+        with pytest.raises(RateLimited):
+            self._call(reasoning, send)
+        assert len(calls.sleeps) == reasoning.MAX_RETRIES
+
+    def test_other_errors_are_not_retried(self, reasoning, calls):
+        """Only rate-limit errors are retried."""
+        with pytest.raises(RateLimited):
+            self._call(reasoning, self._send([RateLimited(status_code=500)]))
+        assert calls.sleeps == []
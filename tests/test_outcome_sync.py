@@ -0,0 +1,239 @@
+"""Tests for syncing resolved outcomes from the Polymarket Data API."""
+
+import sqlite3
+from types import SimpleNamespace
+
+import orjson
+import pytest
+import requests
+
+from agents.polymarket import outcome_sync
+from agents.learning.trade_history import TradeHistoryDB
+from agents.polymarket.outcome_sync import OutcomeSync
+
+
+class StubResponse:
+    """Just the parts of requests.Response the sync reads."""
+
+    def __init__(self, payload):
+        self.content = orjson.dumps(payload)
+
+    def raise_for_status(self):
+        pass
+
+
+class StubSession:
+    """Serves canned /activity payloads by event type and records the calls."""
+
+    def __init__(self, by_type):
+        self.by_type = by_type
+        self.calls = []
+        self.error = None
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url, dict(params or {})))
+        if self.error is not None:
+            raise self.error
+        return StubResponse(self.by_type.get(params.get("type"), []))
+
+    def close(self):
+        pass
+
+
+class FakeClock:
+    """Monotonic clock the tests move by hand."""
+
+    def __init__(self):
+        self.now = 5000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(outcome_sync, "time", SimpleNamespace(monotonic=fake.monotonic))
+    return fake
+
+
+@pytest.fixture
+def db(tmp_path):
+    """The trader's prediction database the sync writes outcomes to."""
+    database = TradeHistoryDB(str(tmp_path / "trader.db"))
+    yield database
+    database.close()
+
+
+def _executed_trade(db, market_id, question, token_id=None):
+    """Store a prediction with an executed $10 trade at 0.50."""
+    prediction_id = db.store_prediction(
+        market_id=market_id,
+        question=question,
+        predicted_outcome="YES",
+        predicted_probability=0.7,
+        confidence=0.7,
+        reasoning="test",
+        strategy="test",
+        market_type="crypto",
+    )
+    db.record_trade_execution(
+        prediction_id, trade_size_usdc=10.0, trade_price=0.5, execution_result="OK"
+    )
+    if token_id is not None:
+        db.record_position_open(market_id, token_id, entry_price=0.5, size=10.0)
+    return prediction_id
+
+
+def _outcome(db, prediction_id):
+    """(actual_outcome, was_correct, profit_loss_usdc) as stored."""
+    with sqlite3.connect(db.db_path) as conn:
+        return conn.execute(
+            "SELECT actual_outcome, was_correct, profit_loss_usdc"
+            " FROM predictions WHERE id = ?",
+            (prediction_id,),
+        ).fetchone()
+
+
+@pytest.fixture
+def sync(tmp_path, monkeypatch):
+    """An OutcomeSync on a tmp database, talking to a stub session."""
+    monkeypatch.setenv("POLYMARKET_PROXY_ADDRESS", "0xproxy")
+    sync = OutcomeSync(str(tmp_path / "trader.db"))
+    sync.session = StubSession({})
+    yield sync
+    sync.close()
+
+
+class TestGetActivity:
+    """Tests for the /activity response cache and error fallback."""
+
+    def test_reuses_response_within_ttl(self, sync, clock):
+        """Back-to-back syncs share one request per event type."""
+        sync.session.by_type = {"REDEEM": [{"title": "a"}]}
+        first = sync.get_redeem_events(limit=10)
+        clock.now += OutcomeSync.ACTIVITY_CACHE_TTL - 1
+        assert sync.get_redeem_events(limit=10) == first == [{"title": "a"}]
+        assert len(sync.session.calls) == 1
+
+    def test_refetches_after_ttl(self, sync, clock):
+        """An old response is replaced by a fresh fetch."""
+        sync.session.by_type = {"REDEEM": [{"title": "a"}]}
+        sync.get_redeem_events(limit=10)
+        sync.session.by_type = {"REDEEM": [{"title": "b"}]}
+        clock.now += OutcomeSync.ACTIVITY_CACHE_TTL
+        assert sync.get_redeem_events(limit=10) == [{"title": "b"}]
+        assert len(sync.session.calls) == 2
+
+    def test_cache_is_per_type_and_limit(self, sync, clock):
+        """REDEEM and TRADE, and different limits, are cached separately."""
+        sync.session.by_type = {"REDEEM": [{"title": "r"}], "TRADE": [{"asset": "t"}]}
+        assert sync.get_redeem_and_trade_events(limit=10) == (
+            [{"title": "r"}],
+            [{"asset": "t"}],
+        )
+        sync.get_redeem_events(limit=20)
+        requested = sorted((p["type"], p["limit"]) for _, p in sync.session.calls)
+        assert requested == [("REDEEM", 10), ("REDEEM", 20), ("TRADE", 10)]
+
+    def test_error_falls_back_to_last_good_response(self, sync, clock):
+        """A failed refresh returns the stale events rather than none."""
+        sync.session.by_type = {"REDEEM": [{"title": "a"}]}
+        sync.get_redeem_events(limit=10)
+        clock.now += 10 * OutcomeSync.ACTIVITY_CACHE_TTL
+        sync.session.error = requests.ConnectionError("down")
+        assert sync.get_redeem_events(limit=10) == [{"title": "a"}]
+
+    def test_error_without_cache_returns_empty(self, sync, clock):
+        """With nothing fetched yet, an error means no events."""
+        sync.session.error = requests.ConnectionError("down")
+        assert sync.get_redeem_events(limit=10) == []
+
+
+class TestSyncOutcomes:
+    """Tests for matching REDEEM events to executed trades."""
+
+    QUESTION = "Will Bitcoin close above $100,000 on December 31, 2026?"
+
+    def test_win_and_loss_pnl(self, db, sync):
+        """A payout is a win net of stake; no payout loses the stake."""
+        won = _executed_trade(db, "m1", self.QUESTION)
+        lost = _executed_trade(db, "m2", "Will ETH flip BTC?")
+        sync.session.by_type = {
+            "REDEEM": [
+                {"title": self.QUESTION, "usdcSize": 20.0},
+                {"title": "Will ETH flip BTC?", "usdcSize": 0},
+            ]
+        }
+        result = sync.sync_outcomes(verbose=False)
+        assert (result["matched"], result["wins"], result["losses"]) == (2, 1, 1)
+        assert result["total_pnl"] == pytest.approx(0.0)
+        assert _outcome(db, won) == ("YES", 1, pytest.approx(10.0))
+        assert _outcome(db, lost) == ("NO", 0, pytest.approx(-10.0))
+
+    def test_matches_token_through_condition(self, db, sync):
+        """A held token maps to its market's REDEEM via the TRADE events."""
+        trade = _executed_trade(db, "m1", "Unrelated title", token_id="tok-1")
+        sync.session.by_type = {
+            "TRADE": [{"asset": "tok-1", "conditionId": "0xc1"}],
+            "REDEEM": [{"title": "Other", "conditionId": "0xc1", "usdcSize": 20.0}],
+        }
+        assert sync.sync_outcomes(verbose=False)["matched"] == 1
+        assert _outcome(db, trade)[0] == "YES"
+
+    def test_matches_title_case_insensitively(self, db, sync):
+        """Titles are compared trimmed and lower-cased."""
+        trade = _executed_trade(db, "m1", self.QUESTION)
+        sync.session.by_type = {
+            "REDEEM": [{"title": f"  {self.QUESTION.upper()} ", "usdcSize": 0}]
+        }
+        sync.sync_outcomes(verbose=False)
+        assert _outcome(db, trade)[0] == "NO"
+
+    def test_matches_title_prefix(self, db, sync):
+        """Titles sharing the first 40 characters match."""
+        trade = _executed_trade(db, "m1", self.QUESTION)
+        redeem_title = self.QUESTION[:40] + " (reworded)"
+        sync.session.by_type = {"REDEEM": [{"title": redeem_title, "usdcSize": 20.0}]}
+        sync.sync_outcomes(verbose=False)
+        assert _outcome(db, trade)[0] == "YES"
+
+    def test_matches_prefix_inside_longer_title(self, db, sync):
+        """A question whose prefix appears inside a REDEEM title matches it."""
+        trade = _executed_trade(db, "m1", self.QUESTION)
+        redeem_title = "Crypto: " + self.QUESTION
+        sync.session.by_type = {"REDEEM": [{"title": redeem_title, "usdcSize": 20.0}]}
+        sync.sync_outcomes(verbose=False)
+        assert _outcome(db, trade)[0] == "YES"
+
+    def test_unmatched_trade_stays_pending(self, db, sync):
+        """Trades without a REDEEM are counted but left unresolved."""
+        trade = _executed_trade(db, "m1", self.QUESTION)
+        sync.session.by_type = {"REDEEM": [{"title": "Something else", "usdcSize": 1}]}
+        result = sync.sync_outcomes(verbose=False)
+        assert (result["pending_trades"], result["matched"]) == (1, 0)
+        assert _outcome(db, trade) == (None, None, None)
+
+    def test_outcome_without_pnl_is_pending(self, db, sync):
+        """Resolved rows missing P&L are re-synced; complete ones are not."""
+        trade = _executed_trade(db, "m1", self.QUESTION)
+        done = _executed_trade(db, "m2", "Will ETH flip BTC?")
+        with sqlite3.connect(db.db_path) as conn:
+            conn.execute(
+                "UPDATE predictions SET actual_outcome = 'YES' WHERE id = ?", (trade,)
+            )
+            conn.execute(
+                "UPDATE predictions SET actual_outcome = 'NO', was_correct = 0,"
+                " profit_loss_usdc = -10.0 WHERE id = ?",
+                (done,),
+            )
+        sync.session.by_type = {
+            "REDEEM": [
+                {"title": self.QUESTION, "usdcSize": 20.0},
+                {"title": "Will ETH flip BTC?", "usdcSize": 20.0},
+            ]
+        }
+        result = sync.sync_outcomes(verbose=False)
+        assert (result["pending_trades"], result["matched"]) == (1, 1)
+        assert _outcome(db, trade) == ("YES", 1, pytest.approx(10.0))
+        assert _outcome(db, done) == ("NO", 0, pytest.approx(-10.0))
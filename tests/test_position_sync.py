@@ -0,0 +1,136 @@
+"""Tests for reconciling local positions with the Polymarket Data API."""
+
+import orjson
+import pytest
+import requests
+
+from agents.learning.trade_history import TradeHistoryDB
+from agents.polymarket.position_sync import PositionSync
+
+
+class StubResponse:
+    """Just the parts of requests.Response the sync reads."""
+
+    def __init__(self, payload):
+        self.content = orjson.dumps(payload)
+
+    def raise_for_status(self):
+        pass
+
+
+class StubSession:
+    """Serves canned Data API payloads by endpoint and records the calls."""
+
+    def __init__(self, by_path):
+        self.by_path = by_path
+        self.calls = []
+        self.error = None
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url, dict(params or {})))
+        if self.error is not None:
+            raise self.error
+        return StubResponse(self.by_path.get(url.rsplit("/", 1)[-1], []))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def db(tmp_path):
+    """The trader's prediction database holding the open positions."""
+    database = TradeHistoryDB(str(tmp_path / "trader.db"))
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def sync(tmp_path, monkeypatch):
+    """A PositionSync on a tmp database, talking to a stub session."""
+    monkeypatch.setenv("POLYMARKET_PROXY_ADDRESS", "0xproxy")
+    sync = PositionSync(str(tmp_path / "trader.db"))
+    sync.session = StubSession({})
+    yield sync
+    sync.close()
+
+
+def _open_position(db, market_id, question, token_id):
+    """Store an executed $10 trade at 0.50 with its position open."""
+    prediction_id = db.store_prediction(
+        market_id=market_id,
+        question=question,
+        predicted_outcome="YES",
+        predicted_probability=0.7,
+        confidence=0.7,
+        reasoning="test",
+        strategy="test",
+    )
+    db.record_trade_execution(
+        prediction_id, trade_size_usdc=10.0, trade_price=0.5, execution_result="OK"
+    )
+    db.record_position_open(market_id, token_id, entry_price=0.5, size=10.0)
+    return prediction_id
+
+
+class TestFetch:
+    """Tests for the Data API reads."""
+
+    def test_activity_filters_by_type(self, sync):
+        """The type param is only sent when a type is asked for."""
+        sync.session.by_path = {"activity": [{"type": "REDEEM"}]}
+        assert sync.get_activity("REDEEM", limit=5) == [{"type": "REDEEM"}]
+        sync.get_activity(limit=5)
+        (_, typed), (_, untyped) = sync.session.calls
+        assert typed == {"user": "0xproxy", "limit": 5, "type": "REDEEM"}
+        assert "type" not in untyped
+
+    def test_errors_return_empty(self, sync):
+        """A failed request reads as no data rather than raising."""
+        sync.session.error = requests.ConnectionError("down")
+        assert sync.get_activity("REDEEM") == []
+        assert sync.get_actual_positions() == []
+        assert sync.get_trade_history() == []
+        assert sync.get_portfolio_value() == 0.0
+
+    def test_snapshot_is_reused(self, sync):
+        """Exposure and P&L read a passed snapshot without refetching."""
+        positions = [
+            {"currentValue": 4.0, "cashPnl": -1.0},
+            {"currentValue": 6.0, "cashPnl": 2.5},
+        ]
+        assert sync.get_open_exposure(positions) == pytest.approx(10.0)
+        assert sync.get_unrealized_pnl(positions) == pytest.approx(1.5)
+        assert sync.session.calls == []
+
+
+class TestReconcilePositions:
+    """Tests for closing local positions that are gone on-chain."""
+
+    def test_closes_stale_and_keeps_held(self, db, sync):
+        """Held tokens stay open; positions missing on-chain are closed."""
+        _open_position(db, "m1", "Will BTC close above $100k?", "tok-1")
+        _open_position(db, "m2", "Will ETH flip BTC?", "tok-2")
+        _open_position(db, "m3", "Will SOL reach $500?", "tok-3")
+        sync.session.by_path = {
+            "positions": [{"asset": "tok-1", "title": "Renamed market"}]
+        }
+        result = sync.reconcile_positions(verbose=False)
+        assert result["db_positions_before"] == 3
+        assert (result["kept_matching"], result["closed_stale"]) == (1, 2)
+        assert result["final_open"] == 1
+        assert [p["market_id"] for p in db.get_open_positions()] == ["m1"]
+
+    def test_title_fallback_keeps_position(self, db, sync):
+        """Without a token match, an overlapping title keeps it open."""
+        _open_position(db, "m1", "Will BTC close above $100k?", "tok-old")
+        _open_position(db, "m2", "Will ETH flip BTC?", "tok-2")
+        positions = [{"assetId": "tok-new", "title": "Will BTC close above $100k?"}]
+        result = sync.reconcile_positions(verbose=False, positions=positions)
+        assert (result["kept_matching"], result["closed_stale"]) == (1, 1)
+        assert sync.session.calls == []
+
+    def test_no_positions_closes_everything(self, db, sync):
+        """An empty snapshot closes every open position."""
+        _open_position(db, "m1", "Will BTC close above $100k?", "tok-1")
+        result = sync.reconcile_positions(verbose=False, positions=[])
+        assert (result["closed_stale"], result["final_open"]) == (1, 0)
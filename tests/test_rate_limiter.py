@@ -0,0 +1,81 @@
+"""Tests for the async token-bucket rate limiter."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from agents.reasoning import rate_limiter
+from agents.reasoning.rate_limiter import AsyncRateLimiter
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the limiter sleeps."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Run the limiter on a fake clock (the event loop keeps the real one)."""
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(monotonic=fake.monotonic))
+    monkeypatch.setattr(rate_limiter, "asyncio", SimpleNamespace(sleep=fake.sleep))
+    return fake
+
+
+def _acquire_all(limiter, *tokens):
+    async def run():
+        for n in tokens:
+            await limiter.acquire(n)
+
+    asyncio.run(run())
+
+
+class TestAsyncRateLimiter:
+    """Tests for AsyncRateLimiter.acquire()."""
+
+    def test_burst_within_capacity_does_not_wait(self, clock):
+        """A full bucket serves up to its capacity immediately."""
+        limiter = AsyncRateLimiter(requests_per_minute=3, tokens_per_minute=1000)
+        _acquire_all(limiter, 100, 100, 100)
+        assert clock.sleeps == []
+
+    def test_waits_for_request_refill(self, clock):
+        """Once requests run out, the next waits for one to refill."""
+        limiter = AsyncRateLimiter(requests_per_minute=2, tokens_per_minute=1000)
+        _acquire_all(limiter, 1, 1, 1)
+        assert clock.sleeps == [pytest.approx(30.0)]
+
+    def test_waits_for_token_refill(self, clock):
+        """Token budget limits large requests separately from request count."""
+        limiter = AsyncRateLimiter(requests_per_minute=100, tokens_per_minute=600)
+        _acquire_all(limiter, 500, 300)
+        # 200 tokens short at 10 tokens/s
+        assert clock.sleeps == [pytest.approx(20.0)]
+
+    def test_refill_is_capped_at_capacity(self, clock):
+        """Idle time doesn't bank more than one minute of budget."""
+        limiter = AsyncRateLimiter(requests_per_minute=2, tokens_per_minute=1000)
+        clock.now += 3600
+        _acquire_all(limiter, 1, 1)
+        assert clock.sleeps == []
+        _acquire_all(limiter, 1)
+        assert clock.sleeps == [pytest.approx(30.0)]
+
+    def test_oversized_request_is_clamped(self, clock):
+        """A request above the whole token budget waits for a full bucket."""
+        limiter = AsyncRateLimiter(requests_per_minute=100, tokens_per_minute=600)
+        _acquire_all(limiter, 10_000)
+        assert clock.sleeps == []
+        _acquire_all(limiter, 10_000)
+        assert clock.sleeps == [pytest.approx(60.0)]
@@ -0,0 +1,109 @@
+"""Tests for the on-disk LLM response cache."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from agents.reasoning import response_cache
+from agents.reasoning.response_cache import ResponseCache, get_response_cache
+
+REQUEST = {
+    "model": "grok-4",
+    "messages": [{"role": "user", "content": "Will it rain?"}],
+    "temperature": 0.3,
+}
+
+
+class FakeClock:
+    """Wall clock the tests move by hand."""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(response_cache, "time", SimpleNamespace(time=fake.time))
+    return fake
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "llm_cache.db"), ttl_seconds=300)
+    yield cache
+    cache.close()
+
+
+class TestResponseCache:
+    """Tests for ResponseCache get/set/prune."""
+
+    def test_hit_within_ttl(self, cache, clock):
+        """A stored reply is served until the TTL runs out."""
+        cache.set(REQUEST, "PREDICTION: YES")
+        clock.now += 300
+        assert cache.get(REQUEST) == "PREDICTION: YES"
+
+    def test_miss_after_ttl(self, cache, clock):
+        """An expired reply is not served."""
+        cache.set(REQUEST, "PREDICTION: YES")
+        clock.now += 301
+        assert cache.get(REQUEST) is None
+
+    def test_key_ignores_dict_order(self, cache):
+        """Requests that differ only in key order share an entry."""
+        cache.set(REQUEST, "PREDICTION: YES")
+        reordered = dict(reversed(list(REQUEST.items())))
+        assert cache.get(reordered) == "PREDICTION: YES"
+
+    def test_key_depends_on_request(self, cache):
+        """A change to the prompt or sampling parameters is a miss."""
+        cache.set(REQUEST, "PREDICTION: YES")
+        assert cache.get({**REQUEST, "temperature": 0.7}) is None
+
+    def test_set_refreshes_timestamp(self, cache, clock):
+        """Re-storing a reply restarts its TTL."""
+        cache.set(REQUEST, "PREDICTION: YES")
+        clock.now += 200
+        cache.set(REQUEST, "PREDICTION: NO")
+        clock.now += 200
+        assert cache.get(REQUEST) == "PREDICTION: NO"
+
+    def test_prune_removes_only_expired(self, cache, clock):
+        """prune() deletes expired rows and reports how many."""
+        cache.set(REQUEST, "old")
+        clock.now += 200
+        cache.set({**REQUEST, "temperature": 0.7}, "new")
+        clock.now += 200
+        assert cache.prune() == 1
+        assert cache.prune() == 0
+        assert cache.get({**REQUEST, "temperature": 0.7}) == "new"
+
+    def test_open_prunes_expired(self, tmp_path, clock):
+        """Opening the cache drops replies that expired on disk."""
+        path = str(tmp_path / "llm_cache.db")
+        first = ResponseCache(path, ttl_seconds=300)
+        first.set(REQUEST, "PREDICTION: YES")
+        first.close()
+        clock.now += 301
+        second = ResponseCache(path, ttl_seconds=300)
+        (count,) = second._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        second.close()
+        assert count == 0
+
+
+class TestGetResponseCache:
+    """Tests for the shared per-path cache instances."""
+
+    def test_same_path_and_ttl_share_instance(self, tmp_path):
+        """Reasoning instances reuse one connection per path and TTL."""
+        path = str(tmp_path / "llm_cache.db")
+        assert get_response_cache(path, 300) is get_response_cache(path, 300)
+
+    def test_different_ttl_gets_own_instance(self, tmp_path):
+        """The TTL is part of the instance, so it is part of the key."""
+        path = str(tmp_path / "llm_cache.db")
+        assert get_response_cache(path, 300) is not get_response_cache(path, 60)
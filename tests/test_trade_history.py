@@ -0,0 +1,316 @@
+"""Tests for the trade history database."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from agents.learning.trade_history import TradeHistoryDB
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A fresh trade history DB in a temporary directory."""
+    database = TradeHistoryDB(str(tmp_path / "trades.db"))
+    yield database
+    database.close()
+
+
+def _executed_prediction(
+    db, market_id, question="Will BTC close above $100k?", market_type="crypto"
+):
+    """Store a prediction with an executed $10 YES trade at 0.50."""
+    prediction_id = db.store_prediction(
+        market_id=market_id,
+        question=question,
+        predicted_outcome="YES",
+        predicted_probability=0.7,
+        confidence=0.7,
+        reasoning="test",
+        strategy="test",
+        market_type=market_type,
+    )
+    db.record_trade_execution(
+        prediction_id,
+        trade_size_usdc=10.0,
+        trade_price=0.5,
+        execution_result="EXECUTED",
+    )
+    return prediction_id
+
+
+class TestArchiveResolved:
+    """Tests for archive_resolved()."""
+
+    def test_archiving_shrinks_learning_window_but_not_reports(self, db, tmp_path):
+        """Archived rows leave the edge gate but stay in Brier and summary reports."""
+        old_resolution = (datetime.utcnow() - timedelta(days=60)).isoformat()
+        _executed_prediction(db, "old-win")
+        db.record_outcome("old-win", "YES", resolution_date=old_resolution)
+        _executed_prediction(db, "new-loss")
+        db.record_outcome("new-loss", "NO")
+
+        assert db.get_edge_by_market_type()["crypto"]["total_trades"] == 2
+        brier_before = db.calculate_brier_score()
+        summary_before = db.get_performance_summary()
+
+        moved = db.archive_resolved(str(tmp_path / "archive.db"), older_than_days=30)
+        assert moved == 1
+
+        # The edge gate now only sees the recent (losing) trade
+        edge = db.get_edge_by_market_type()["crypto"]
+        assert edge["total_trades"] == 1
+        assert edge["has_edge"] is False
+
+        # All-time reports still include the archived win
+        assert db.calculate_brier_score() == pytest.approx(brier_before)
+        summary = db.get_performance_summary()
+        assert summary["total_predictions"] == summary_before["total_predictions"] == 2
+        assert summary["resolved_markets"] == 2
+
+    def test_open_and_recent_rows_stay_live(self, db, tmp_path):
+        """Only rows resolved before the cutoff with closed positions move."""
+        _executed_prediction(db, "recent")
+        db.record_outcome("recent", "YES")
+        _executed_prediction(db, "pending")
+
+        assert (
+            db.archive_resolved(str(tmp_path / "archive.db"), older_than_days=30) == 0
+        )
+        assert db.get_performance_summary()["total_predictions"] == 2
+
+
+def _brier_from_rows(db):
+    """Brier score recomputed from the resolved rows themselves."""
+    rows = db.conn.execute(
+        "SELECT predicted_probability, was_correct FROM predictions WHERE actual_outcome IS NOT NULL"
+    ).fetchall()
+    return sum(
+        (probability - (1.0 if correct else 0.0)) ** 2 for probability, correct in rows
+    ) / len(rows)
+
+
+class TestAggStats:
+    """Tests for the agg_stats triggers behind calculate_brier_score()."""
+
+    def test_re_resolution_replaces_old_contribution(self, db):
+        """Rewriting an already-resolved row (as outcome_sync does) restates its bucket."""
+        prediction_id = db.store_prediction(
+            "m1", "Will BTC close above $100k?", "YES", 0.9, 0.9, "test", "test"
+        )
+        db.store_prediction(
+            "m2", "Will ETH close above $5k?", "YES", 0.6, 0.6, "test", "test"
+        )
+        db.record_outcomes_bulk([("m1", "YES"), ("m2", "YES")])
+        assert db.calculate_brier_score() == pytest.approx(_brier_from_rows(db))
+
+        db.conn.execute(
+            "UPDATE predictions SET actual_outcome = ?, was_correct = ?, profit_loss_usdc = ? WHERE id = ?",
+            ("NO", 0, -10.0, prediction_id),
+        )
+
+        assert db.calculate_brier_score() == pytest.approx(_brier_from_rows(db))
+        assert db.calculate_brier_score() == pytest.approx((0.81 + 0.16) / 2)
+        sum_pnl = db.conn.execute("SELECT SUM(sum_pnl) FROM agg_stats").fetchone()[0]
+        assert sum_pnl == pytest.approx(-10.0)
+
+    def test_unresolving_and_deleting_remove_the_row(self, db):
+        """Rows that stop being resolved or are deleted leave the Brier score."""
+        first = db.store_prediction(
+            "m1", "Will BTC close above $100k?", "YES", 0.9, 0.9, "test", "test"
+        )
+        second = db.store_prediction(
+            "m2", "Will ETH close above $5k?", "YES", 0.6, 0.6, "test", "test"
+        )
+        db.store_prediction(
+            "m3", "Will SOL close above $500?", "YES", 0.3, 0.3, "test", "test"
+        )
+        db.record_outcomes_bulk([("m1", "NO"), ("m2", "YES"), ("m3", "YES")])
+
+        db.conn.execute("DELETE FROM predictions WHERE id = ?", (first,))
+        assert db.calculate_brier_score() == pytest.approx((0.16 + 0.49) / 2)
+
+        db.conn.execute(
+            "UPDATE predictions SET actual_outcome = NULL, was_correct = NULL WHERE id = ?",
+            (second,),
+        )
+        assert db.calculate_brier_score() == pytest.approx(0.49)
+        assert db.calculate_brier_score() == pytest.approx(_brier_from_rows(db))
+
+
+class TestCalibrationData:
+    """Tests for the calibration buckets."""
+
+    def test_emptied_bucket_is_removed(self, db, tmp_path):
+        """A bucket whose rows were all archived drops out of the curve."""
+        old_resolution = (datetime.utcnow() - timedelta(days=60)).isoformat()
+        db.store_prediction("old", "Old market?", "YES", 0.95, 0.95, "test", "test")
+        db.record_outcome("old", "YES", resolution_date=old_resolution)
+        db.store_prediction("new", "New market?", "YES", 0.35, 0.35, "test", "test")
+        db.record_outcome("new", "NO")
+
+        assert [bucket for bucket, _, _ in db.get_calibration_curve()] == [
+            pytest.approx(0.35),
+            pytest.approx(0.95),
+        ]
+
+        db.archive_resolved(str(tmp_path / "archive.db"), older_than_days=30)
+
+        curve = db.get_calibration_curve()
+        assert len(curve) == 1
+        bucket, accuracy, count = curve[0]
+        assert bucket == pytest.approx(0.35)
+        assert accuracy == 0.0
+        assert count == 1
+
+
+class TestMarketTypeId:
+    """Tests for the market type id cache."""
+
+    def test_rolled_back_id_is_not_cached(self, db):
+        """An id registered by a rolled-back transaction never reaches the cache."""
+        with pytest.raises(RuntimeError):
+            with db.batch():
+                _executed_prediction(db, "m1", market_type="weather")
+                raise RuntimeError("abort")
+
+        assert db.market_type_id("weather") is None
+
+        prediction_id = _executed_prediction(db, "m2", market_type="weather")
+        mt_id = db.market_type_id("weather")
+        row = db.conn.execute(
+            "SELECT market_type_id FROM predictions WHERE id = ?", (prediction_id,)
+        ).fetchone()
+        assert mt_id is not None
+        assert row[0] == mt_id
+
+
+class TestFindSimilarMarkets:
+    """Tests for the FTS5-backed find_similar_markets()."""
+
+    def test_matches_resolved_markets_by_keyword(self, db):
+        """Inserted questions are indexed; only resolved matches are returned."""
+        _executed_prediction(db, "btc", question="Will Bitcoin hit $150k?")
+        _executed_prediction(db, "eth", question="Will Ethereum flip Bitcoin?")
+        _executed_prediction(db, "rain", question="Rain in London tomorrow?")
+        _executed_prediction(db, "open", question="Bitcoin ETF approved?")
+        for market_id in ("btc", "eth", "rain"):
+            db.record_outcome(market_id, "YES")
+
+        found = {row["market_id"] for row in db.find_similar_markets("bitcoin price")}
+
+        assert found == {"btc", "eth"}
+
+    def test_fts_operators_are_taken_literally(self, db):
+        """Quotes and FTS keywords in the question don't break the MATCH."""
+        _executed_prediction(db, "m1", question='Will "AND" NOT win? (OR lose)')
+        db.record_outcome("m1", "YES")
+
+        found = db.find_similar_markets('"AND" NOT (OR')
+
+        assert [row["market_id"] for row in found] == ["m1"]
+
+    def test_question_update_and_delete_keep_index_in_sync(self, db):
+        """The update and delete triggers re-index and drop rows."""
+        prediction_id = _executed_prediction(
+            db, "m1", question="Will Bitcoin hit $150k?"
+        )
+        db.record_outcome("m1", "YES")
+
+        db.conn.execute(
+            "UPDATE predictions SET question = ? WHERE id = ?",
+            ("Will Solana hit $500?", prediction_id),
+        )
+        assert db.find_similar_markets("bitcoin") == []
+        assert [row["market_id"] for row in db.find_similar_markets("solana")] == ["m1"]
+
+        db.conn.execute("DELETE FROM predictions WHERE id = ?", (prediction_id,))
+        indexed = db.conn.execute(
+            "SELECT rowid FROM predictions_fts WHERE predictions_fts MATCH 'solana'"
+        ).fetchall()
+        assert indexed == []
+
+    def test_no_keywords_falls_back_to_latest_resolved(self, db):
+        """A blank question returns the newest resolved markets, limit applied."""
+        for market_id in ("a", "b", "c"):
+            _executed_prediction(db, market_id)
+            db.record_outcome(market_id, "YES")
+        _executed_prediction(db, "open")
+
+        found = db.find_similar_markets("   ", limit=2)
+
+        assert len(found) == 2
+        assert {row["market_id"] for row in found} <= {"a", "b", "c"}
+        assert found[0]["timestamp"] >= found[1]["timestamp"]
+
+    def test_market_type_filter(self, db):
+        """market_type restricts matches to that type."""
+        _executed_prediction(
+            db, "c1", question="Bitcoin above $100k?", market_type="crypto"
+        )
+        _executed_prediction(
+            db, "p1", question="Bitcoin reserve bill passes?", market_type="politics"
+        )
+        db.record_outcomes_bulk([("c1", "YES"), ("p1", "NO")])
+
+        found = db.find_similar_markets("bitcoin", market_type="politics")
+
+        assert [row["market_id"] for row in found] == ["p1"]
+
+
+def _resolution(db, prediction_id):
+    """(actual_outcome, was_correct, profit_loss_usdc) of one prediction."""
+    return tuple(
+        db.conn.execute(
+            "SELECT actual_outcome, was_correct, profit_loss_usdc FROM predictions WHERE id = ?",
+            (prediction_id,),
+        ).fetchone()
+    )
+
+
+class TestRecordOutcome:
+    """Tests for resolving a market's predictions."""
+
+    def test_resolves_correctness_and_pnl(self, db):
+        """Executed trades get P&L from size and price; skipped ones get none."""
+        winner = _executed_prediction(db, "m1")
+        skipped = db.store_prediction(
+            "m1", "Will BTC close above $100k?", "NO", 0.4, 0.6, "test", "test"
+        )
+
+        db.record_outcome("m1", "YES")
+
+        assert _resolution(db, winner) == ("YES", 1, pytest.approx(10.0))
+        assert _resolution(db, skipped) == ("YES", 0, None)
+
+    def test_losing_trade_loses_its_stake(self, db):
+        """A wrong executed prediction loses the whole trade size."""
+        loser = _executed_prediction(db, "m1")
+
+        db.record_outcome("m1", "NO")
+
+        assert _resolution(db, loser) == ("NO", 0, pytest.approx(-10.0))
+
+    def test_resolved_rows_are_not_overwritten(self, db):
+        """A second resolution leaves already-resolved rows and their P&L alone."""
+        first = _executed_prediction(db, "m1")
+        db.record_outcome("m1", "YES")
+        second = _executed_prediction(db, "m1")
+
+        db.record_outcomes_bulk([("m1", "NO")])
+
+        assert _resolution(db, first) == ("YES", 1, pytest.approx(10.0))
+        assert _resolution(db, second) == ("NO", 0, pytest.approx(-10.0))
+
+    def test_existing_pnl_of_unexecuted_row_is_kept(self, db):
+        """P&L already set on a row without an executed trade survives resolution."""
+        prediction_id = db.store_prediction(
+            "m1", "Will BTC close above $100k?", "YES", 0.7, 0.7, "test", "test"
+        )
+        db.conn.execute(
+            "UPDATE predictions SET profit_loss_usdc = 3.5 WHERE id = ?",
+            (prediction_id,),
+        )
+
+        db.record_outcome("m1", "YES")
+
+        assert _resolution(db, prediction_id) == ("YES", 1, pytest.approx(3.5))